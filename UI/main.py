@@ -6,18 +6,29 @@ import json
 import time
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QPushButton, QLabel, QComboBox,
-                               QMenuBar, QMenu, QStatusBar, QGroupBox, QDialog)
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QAction
+                               QMenuBar, QMenu, QStatusBar, QGroupBox, QDialog, QTabWidget)
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QFont, QAction, QActionGroup
 
-from src.core.video_thread import VideoThread
+from src.core.video_thread import VideoThread, PLAYBACK_PACED, PLAYBACK_MAX_THROUGHPUT, parse_timestamp
+from src.core.detection_channel import DetectionChannel
+from src.core.detection_pool import DetectionPool
 from src.core.detection_engine import DetectionEngine
+from src.core.motion_gate import MotionGate
+from src.core.best_frame_selector import BestFrameSelector
+from src.core.frame_ring import FrameRingBuffer
+from src.core.sensor_listener import SensorListener
+from src.core.shm_pipeline import SharedMemoryPipeline
+from src.config.detection_profile import profile_from_engine
 from src.ui.video_widget import VideoWidget
 from src.ui.dialogs import (CameraSettingsDialog, DetectionSettingsDialog, 
-                           SocketSetupDialog, PalletSetupDialog, DefectsWindow)
+                           SocketSetupDialog, PlcSetupDialog, PalletSetupDialog, DefectsWindow)
 from src.utils.database_manager import DatabaseManager
 from src.utils.camera_manager import CameraManager
 from src.utils.template_manager import TemplateManager
+from src.utils.metrics import metrics, MetricsServer
+from src.utils.plc_publisher import DefectPublisher
+from src.utils.clip_exporter import ClipExporter
 
 class VideoApp(QMainWindow):
     def __init__(self):
@@ -25,15 +36,22 @@ class VideoApp(QMainWindow):
         self.setWindowTitle("Misaligned Boards Application")
         self.setGeometry(100, 100, 1600, 900)
         
-        self.video_thread = None
+        self.sources = []
+        self.next_source_index = 1
+        self.fast_scaling = False
+        self.playback_mode = PLAYBACK_PACED
+        self.multiprocess_pipeline = False
         self.camera_index = None
-        self.defects = []
+        self.defect_count = 0
         self.defects_window = None
         
-        self.detection_engine = DetectionEngine()
         self.database_manager = DatabaseManager()
+        self.detection_pool = DetectionPool()
         self.camera_manager = CameraManager()
+        self.camera_manager.start_discovery()
         self.template_manager = TemplateManager()
+        self.template_manager.watch(self)
+        self.active_template = None
         
         self.camera_settings = {
             'exposure': -4,
@@ -43,11 +61,44 @@ class VideoApp(QMainWindow):
             'global_shutter': True
         }
         
+        self.pipeline_settings = {
+            'queue_size': 4,
+            'drop_policy': 'drop_oldest',
+            'target_rate': 0.0,
+            'latency_budget_ms': 250,
+            'motion_gate': False,
+            'motion_sensitivity': 1.0,
+            'motion_hold_frames': 15,
+            'clip_export': False,
+            'clip_pre_seconds': 2.0,
+            'clip_post_seconds': 1.0
+        }
+        
+        self.timing_stages = ('capture', 'detection', 'display', 'end_to_end', 'sensor')
+        self.metrics_server = MetricsServer(port=9108)
+        try:
+            self.metrics_server.start()
+        except OSError as e:
+            print(f"Error starting metrics endpoint: {str(e)}")
+        
         self.board_count = 0
         self.pallet_count = 0
         self.last_signal_time = time.time()
         self.low_signal_duration = 1.0
         self.target_board_count = 5
+        self.best_frame_selection = False
+        self.frames_per_board = 3
+        self.sensor_listener = None
+        self.sensor_host = "localhost"
+        self.sensor_port = 12345
+        self.defect_publisher = None
+        self.plc_settings = {
+            'host': "localhost",
+            'port': 5020,
+            'transport': 'tcp',
+            'message_format': 'json',
+            'batch_size': 32
+        }
         
         self.setup_ui()
         self.setup_menu()
@@ -111,6 +162,7 @@ class VideoApp(QMainWindow):
         
         self.template_combo = QComboBox()
         self.template_manager.update_template_combo(self.template_combo)
+        self.template_combo.currentTextChanged.connect(self.apply_template)
         template_layout.addWidget(self.template_combo)
         
         template_group.setLayout(template_layout)
@@ -119,14 +171,100 @@ class VideoApp(QMainWindow):
         toolbar_layout.addStretch()
         main_layout.addWidget(toolbar)
         
-        self.video_widget = VideoWidget()
-        self.video_widget.roi_selected_signal.connect(self.on_roi_selected)
-        main_layout.addWidget(self.video_widget)
+        self.video_tabs = QTabWidget()
+        main_layout.addWidget(self.video_tabs)
+        self.add_source()
+        self.video_tabs.currentChanged.connect(self.on_source_changed)
         
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready")
         
+        self.pipeline_stats_label = QLabel("Processed: 0 | Dropped: 0")
+        self.status_bar.addPermanentWidget(self.pipeline_stats_label)
+        
+        self.timing_label = QLabel("Timing: waiting for frames")
+        self.status_bar.addPermanentWidget(self.timing_label)
+        
+        self.playback_label = QLabel("")
+        self.status_bar.addPermanentWidget(self.playback_label)
+        
+        self.timing_timer = QTimer(self)
+        self.timing_timer.timeout.connect(self.update_pipeline_stats)
+        self.timing_timer.timeout.connect(self.update_timing_stats)
+        self.timing_timer.timeout.connect(self.check_templates)
+        self.timing_timer.start(1000)
+        
+    @property
+    def current_source(self):
+        return self.sources[max(0, self.video_tabs.currentIndex())]
+        
+    @property
+    def video_widget(self):
+        return self.current_source['widget']
+        
+    @property
+    def detection_engine(self):
+        return self.current_source['engine']
+        
+    @property
+    def video_thread(self):
+        return self.current_source['video_thread']
+        
+    def add_source(self):
+        index = self.next_source_index
+        self.next_source_index += 1
+        
+        engine = DetectionEngine()
+        engine.database_manager = self.database_manager
+        if index > 1:
+            engine.image_writer.name_prefix = f"defect_cam{index}"
+            
+        widget = VideoWidget()
+        widget.set_fast_scaling(self.fast_scaling)
+        widget.roi_selected_signal.connect(self.on_roi_selected)
+        widget.roi_changed.connect(self.update_detection_roi)
+        
+        source = {
+            'name': f"Camera {index}",
+            'index': index,
+            'widget': widget,
+            'engine': engine,
+            'video_thread': None,
+            'channel': None,
+            'shm_pipeline': None
+        }
+        self.sources.append(source)
+        self.video_tabs.addTab(widget, source['name'])
+        self.video_tabs.setCurrentWidget(widget)
+        return source
+        
+    def close_source(self):
+        source = self.current_source
+        self.stop_video_pipeline(source)
+        if len(self.sources) == 1:
+            return
+        source['engine'].image_writer.stop()
+        self.sources.remove(source)
+        self.video_tabs.removeTab(self.video_tabs.indexOf(source['widget']))
+        source['widget'].deleteLater()
+        
+    def find_source(self, channel):
+        for source in self.sources:
+            if source['channel'] is channel or source['shm_pipeline'] is channel:
+                return source
+        return None
+        
+    def on_source_changed(self, index):
+        if 0 <= index < len(self.sources):
+            self.playback_label.setText("")
+            self.update_pipeline_stats()
+            
+    def set_fast_scaling(self, enabled):
+        self.fast_scaling = enabled
+        for source in self.sources:
+            source['widget'].set_fast_scaling(enabled)
+            
     def setup_menu(self):
         menubar = self.menuBar()
         
@@ -140,6 +278,26 @@ class VideoApp(QMainWindow):
         select_camera_action.triggered.connect(self.select_camera)
         file_menu.addAction(select_camera_action)
         
+        add_video_source_action = QAction("Add Video Source", self)
+        add_video_source_action.triggered.connect(self.add_video_source)
+        file_menu.addAction(add_video_source_action)
+        
+        add_camera_source_action = QAction("Add Camera Source", self)
+        add_camera_source_action.triggered.connect(self.add_camera_source)
+        file_menu.addAction(add_camera_source_action)
+        
+        close_source_action = QAction("Close Source", self)
+        close_source_action.triggered.connect(self.close_source)
+        file_menu.addAction(close_source_action)
+        
+        multiprocess_action = QAction("Use Multiprocess Pipeline", self)
+        multiprocess_action.setCheckable(True)
+        multiprocess_action.setChecked(self.multiprocess_pipeline)
+        multiprocess_action.toggled.connect(self.set_multiprocess_pipeline)
+        file_menu.addAction(multiprocess_action)
+        
+        file_menu.addSeparator()
+        
         upload_image_action = QAction("Upload Image", self)
         upload_image_action.triggered.connect(self.upload_image)
         file_menu.addAction(upload_image_action)
@@ -172,12 +330,48 @@ class VideoApp(QMainWindow):
         view_defects_action.triggered.connect(self.open_defects_window)
         view_menu.addAction(view_defects_action)
         
+        fast_scaling_action = QAction("Fast Preview Scaling", self)
+        fast_scaling_action.setCheckable(True)
+        fast_scaling_action.toggled.connect(self.set_fast_scaling)
+        view_menu.addAction(fast_scaling_action)
+        
+        playback_menu = menubar.addMenu("Playback")
+        
+        playback_group = QActionGroup(self)
+        for label, mode in (("Paced (source FPS)", PLAYBACK_PACED), ("Max Throughput", PLAYBACK_MAX_THROUGHPUT)):
+            playback_action = QAction(label, self)
+            playback_action.setCheckable(True)
+            playback_action.setChecked(mode == self.playback_mode)
+            playback_action.triggered.connect(lambda checked, mode=mode: self.set_playback_mode(mode))
+            playback_group.addAction(playback_action)
+            playback_menu.addAction(playback_action)
+            
+        playback_menu.addSeparator()
+        
+        seek_action = QAction("Seek to Time...", self)
+        seek_action.triggered.connect(self.seek_video)
+        playback_menu.addAction(seek_action)
+        
         sensor_menu = menubar.addMenu("Sensor")
         
         setup_socket_action = QAction("Setup Socket", self)
         setup_socket_action.triggered.connect(self.open_socket_setup)
         sensor_menu.addAction(setup_socket_action)
         
+        disconnect_sensor_action = QAction("Disconnect Sensor", self)
+        disconnect_sensor_action.triggered.connect(self.stop_sensor_listener)
+        sensor_menu.addAction(disconnect_sensor_action)
+        
+        plc_menu = menubar.addMenu("PLC")
+        
+        setup_plc_action = QAction("Setup PLC Output", self)
+        setup_plc_action.triggered.connect(self.open_plc_setup)
+        plc_menu.addAction(setup_plc_action)
+        
+        disconnect_plc_action = QAction("Disconnect PLC Output", self)
+        disconnect_plc_action.triggered.connect(self.stop_defect_publisher)
+        plc_menu.addAction(disconnect_plc_action)
+        
         pallet_menu = menubar.addMenu("Pallet")
         
         setup_pallet_action = QAction("Setup Pallet Detection", self)
@@ -189,37 +383,56 @@ class VideoApp(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(self, "Select Video File", "", "Video Files (*.mp4 *.avi *.mov)")
         if file_path:
             try:
-                if self.video_thread is not None:
-                    self.video_thread.stop()
-                    self.video_thread.wait()
+                self.stop_video_pipeline()
                 
-                self.video_thread = VideoThread()
-                self.video_thread.set_video_file(file_path)
-                self.video_thread.frame_ready.connect(self.process_frame)
-                self.video_thread.error_occurred.connect(self.handle_camera_error)
-                self.video_thread.start()
+                if self.multiprocess_pipeline:
+                    self.start_shm_pipeline(video_file=file_path)
+                else:
+                    video_thread = VideoThread()
+                    video_thread.set_video_file(file_path)
+                    self.start_video_pipeline(video_thread)
                 
                 self.status_bar.showMessage(f"Playing video: {file_path}")
                 
             except Exception as e:
                 QMessageBox.critical(self, "Video Error", f"Error opening video: {str(e)}")
                 
+    def active_camera_indices(self):
+        indices = []
+        for source in self.sources:
+            if source['video_thread'] is not None and source['video_thread'].camera_index is not None:
+                indices.append(source['video_thread'].camera_index)
+            if source['shm_pipeline'] is not None and source['shm_pipeline'].camera_index is not None:
+                indices.append(source['shm_pipeline'].camera_index)
+        return indices
+        
     def select_camera(self):
-        camera_index = self.camera_manager.select_camera_dialog(self)
+        camera_index = self.camera_manager.select_camera_dialog(self, self.active_camera_indices())
         if camera_index is not None:
             self.start_camera(camera_index)
             
+    def add_video_source(self):
+        source = self.add_source()
+        self.select_video()
+        if source['video_thread'] is None and source['shm_pipeline'] is None:
+            self.close_source()
+            
+    def add_camera_source(self):
+        camera_index = self.camera_manager.select_camera_dialog(self, self.active_camera_indices())
+        if camera_index is not None:
+            self.add_source()
+            self.start_camera(camera_index)
+            
     def start_camera(self, camera_index):
         try:
-            if self.video_thread is not None:
-                self.video_thread.stop()
-                self.video_thread.wait()
+            self.stop_video_pipeline()
                 
-            self.video_thread = VideoThread(camera_index)
-            self.video_thread.set_camera_settings(self.camera_settings)
-            self.video_thread.frame_ready.connect(self.process_frame)
-            self.video_thread.error_occurred.connect(self.handle_camera_error)
-            self.video_thread.start()
+            if self.multiprocess_pipeline:
+                self.start_shm_pipeline(camera_index=camera_index)
+            else:
+                video_thread = VideoThread(camera_index)
+                video_thread.set_camera_settings(self.camera_settings)
+                self.start_video_pipeline(video_thread)
             
             self.camera_index = camera_index
             self.status_bar.showMessage(f"Connected to Camera {camera_index}")
@@ -228,35 +441,229 @@ class VideoApp(QMainWindow):
             from PySide6.QtWidgets import QMessageBox
             QMessageBox.critical(self, "Camera Error", f"Error starting camera: {str(e)}")
             
-    def process_frame(self, frame):
-        if self.video_widget.roi_selected and self.video_widget.roi_start and self.video_widget.roi_end:
-            x1, y1 = self.video_widget.roi_start.x(), self.video_widget.roi_start.y()
-            x2, y2 = self.video_widget.roi_end.x(), self.video_widget.roi_end.y()
-            
-            x1 = max(0, min(x1, frame.shape[1]))
-            y1 = max(0, min(y1, frame.shape[0]))
-            x2 = max(0, min(x2, frame.shape[1]))
-            y2 = max(0, min(y2, frame.shape[0]))
+    def start_video_pipeline(self, video_thread, source=None):
+        source = source or self.current_source
+        channel = DetectionChannel(
+            source['name'],
+            source['engine'],
+            self.database_manager,
+            queue_size=self.pipeline_settings['queue_size'],
+            drop_policy=self.pipeline_settings['drop_policy'],
+            target_rate=self.pipeline_settings['target_rate'],
+            latency_budget=self.pipeline_settings['latency_budget_ms'] / 1000.0,
+            motion_gate=self.create_motion_gate(),
+            source_index=source['index']
+        )
+        channel.set_roi(source['widget'].get_roi())
+        channel.set_frame_selector(self.create_frame_selector())
+        channel.publisher = self.defect_publisher
+        self.configure_clip_export(channel, video_thread.source_fps(), video_thread.video_file is not None)
+        channel.frame_processed.connect(self.process_frame)
+        channel.defects_detected.connect(self.handle_defects)
+        self.detection_pool.add_channel(channel)
+        source['channel'] = channel
+        
+        source['video_thread'] = video_thread
+        if video_thread.video_file is not None:
+            video_thread.set_playback_mode(self.playback_mode)
+            channel.block_when_full = self.playback_mode == PLAYBACK_MAX_THROUGHPUT
+            video_thread.position_changed.connect(self.on_playback_position)
+        video_thread.frame_ready.connect(channel.submit_frame, Qt.ConnectionType.DirectConnection)
+        video_thread.error_occurred.connect(self.handle_camera_error)
+        video_thread.start()
+        
+    def shm_pipeline_running(self):
+        return any(source['shm_pipeline'] is not None for source in self.sources)
+        
+    def set_multiprocess_pipeline(self, enabled):
+        self.multiprocess_pipeline = enabled
+        
+    def start_shm_pipeline(self, video_file=None, camera_index=None, source=None):
+        source = source or self.current_source
+        if video_file is not None:
+            cap = cv2.VideoCapture(video_file)
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            cap.release()
+            if width <= 0 or height <= 0:
+                raise ValueError(f"Cannot read frame size from {video_file}")
+        else:
+            width, height = self.camera_settings['resolution']
             
-            if x1 < x2 and y1 < y2:
-                roi = frame[y1:y2, x1:x2]
-                processed_roi, defects = self.detection_engine.detect_and_draw_lines_with_angles(roi)
-                frame[y1:y2, x1:x2] = processed_roi
+        pipeline = SharedMemoryPipeline(
+            source['name'],
+            source['engine'],
+            (height, width, 3),
+            video_file=video_file,
+            camera_index=camera_index,
+            camera_settings=self.camera_settings,
+            paced=self.playback_mode == PLAYBACK_PACED,
+            db_path=self.database_manager.db_path,
+            source_index=source['index'],
+            pipeline_settings=self.pipeline_settings
+        )
+        if self.best_frame_selection or self.pipeline_settings['clip_export']:
+            self.status_bar.showMessage("Best-frame selection and clip export are not available in the multiprocess pipeline")
+        pipeline.set_roi(source['widget'].get_roi())
+        pipeline.publisher = self.defect_publisher
+        pipeline.frame_processed.connect(self.process_frame)
+        pipeline.defects_detected.connect(self.handle_defects)
+        source['shm_pipeline'] = pipeline
+        pipeline.start_workers()
+        
+    def set_playback_mode(self, mode):
+        self.playback_mode = mode
+        for source in self.sources:
+            video_thread = source['video_thread']
+            if video_thread is None or video_thread.video_file is None:
+                continue
+            video_thread.set_playback_mode(mode)
+            if source['channel'] is not None:
+                source['channel'].block_when_full = mode == PLAYBACK_MAX_THROUGHPUT
                 
-                for defect in defects:
-                    self.database_manager.log_fault(
-                        fault_type="Board Alignment",
-                        image_index=1,
-                        details=defect['details'],
-                        measurement=defect['angle']
-                    )
-                    self.defects.append((defect['timestamp'], defect['angle'], defect['image_path']))
-                    
-                    if self.defects_window is not None:
-                        self.defects_window.update_defects(self.defects)
-                
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        self.video_widget.set_frame(frame_rgb)
+    def seek_video(self):
+        from PySide6.QtWidgets import QInputDialog, QMessageBox
+        video_thread = self.video_thread
+        if video_thread is None or video_thread.video_file is None:
+            QMessageBox.information(self, "Seek", "Seeking is only available when playing a video file")
+            return
+        text, ok = QInputDialog.getText(self, "Seek to Time", "Time (seconds or HH:MM:SS.mmm):")
+        if not ok or not text:
+            return
+        try:
+            seconds = parse_timestamp(text)
+        except ValueError:
+            QMessageBox.warning(self, "Seek", f"Invalid time: {text}")
+            return
+        video_thread.seek(seconds)
+        self.status_bar.showMessage(f"Seeking to {seconds:.3f}s")
+        
+    def on_playback_position(self, position, duration):
+        if self.sender() is not self.video_thread:
+            return
+        self.playback_label.setText(f"{self.format_position(position)} / {self.format_position(duration)}")
+        
+    def format_position(self, seconds):
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(int(minutes), 60)
+        return f"{hours:d}:{minutes:02d}:{seconds:06.3f}"
+        
+    def create_motion_gate(self):
+        if not self.pipeline_settings['motion_gate']:
+            return None
+        return MotionGate(self.pipeline_settings['motion_sensitivity'], self.pipeline_settings['motion_hold_frames'])
+        
+    def configure_clip_export(self, channel, fps, source_clock=False):
+        frame_ring = None
+        clip_exporter = None
+        if self.pipeline_settings['clip_export']:
+            pre_seconds = self.pipeline_settings['clip_pre_seconds']
+            post_seconds = self.pipeline_settings['clip_post_seconds']
+            frame_ring = FrameRingBuffer(pre_seconds + post_seconds + 1.0, fps, source_clock=source_clock)
+            clip_exporter = ClipExporter(frame_ring, pre_seconds=pre_seconds, post_seconds=post_seconds)
+            clip_exporter.name_prefix = f"clip_cam{channel.source_index}"
+        previous = channel.set_clip_export(frame_ring, clip_exporter)
+        if previous is not None:
+            previous.stop()
+            
+    def create_frame_selector(self):
+        if not self.best_frame_selection:
+            return None
+        return BestFrameSelector(self.frames_per_board)
+        
+    def stop_video_pipeline(self, source=None):
+        source = source or self.current_source
+        if source['video_thread'] is not None:
+            source['video_thread'].stop()
+            source['video_thread'].wait()
+            source['video_thread'] = None
+        if source['channel'] is not None:
+            self.detection_pool.remove_channel(source['channel'])
+            clip_exporter = source['channel'].set_clip_export(None, None)
+            if clip_exporter is not None:
+                clip_exporter.stop()
+            source['channel'] = None
+        if source['shm_pipeline'] is not None:
+            source['shm_pipeline'].stop()
+            source['shm_pipeline'] = None
+            
+    def update_detection_roi(self):
+        channel = self.current_source['channel'] or self.current_source['shm_pipeline']
+        if channel is not None:
+            channel.set_roi(self.video_widget.get_roi())
+            
+    def process_frame(self, frame, captured_at):
+        channel = self.sender()
+        source = self.find_source(channel) if channel is not None else None
+        if source is None:
+            return
+        source['widget'].set_frame(frame)
+        metrics.observe('end_to_end', time.monotonic() - captured_at)
+        channel.display_done()
+        
+    def handle_defects(self, defects):
+        self.defect_count += len(defects)
+        
+    def update_pipeline_stats(self):
+        current = self.current_source
+        self.pipeline_stats_label.setText(f"{current['name']}: not running")
+        for index, source in enumerate(self.sources):
+            channel = source['channel'] or source['shm_pipeline']
+            if channel is None:
+                self.video_tabs.setTabToolTip(index, "Not running")
+                continue
+            stats = channel.get_stats()
+            for name, value in stats.items():
+                if value is not None:
+                    metrics.set_gauge(name, value, {'source': source['name']})
+            self.video_tabs.setTabToolTip(
+                index,
+                f"{stats['detection_fps']:.1f} fps analysed | {stats['unanalysed']} unanalysed | "
+                f"{stats['dropped']} dropped"
+            )
+            if source is current:
+                text = (
+                    f"{source['name']}: {stats['detection_fps']:.1f} fps | "
+                    f"Processed: {stats['processed']} | Unanalysed: {stats['unanalysed']} "
+                    f"({stats['skipped']} skipped, {stats['dropped']} dropped) | Idle: {stats['idle']} | "
+                    f"Queue: {stats['queue_depth']}/{stats['queue_size']} | "
+                    f"Images: {stats['images_written']} written, {stats['images_dropped']} dropped, "
+                    f"{stats['image_queue_depth']} queued | Workers: {self.detection_pool.worker_count}"
+                )
+                if stats['frames_scored'] is None:
+                    text += " | Best frames: n/a | Clips: n/a"
+                elif channel.frame_selector is not None:
+                    text += f" | Best frames: {stats['best_frames']} of {stats['frames_scored']} scored"
+                if self.defect_publisher is not None:
+                    plc_stats = self.defect_publisher.get_stats()
+                    text += (f" | PLC: {plc_stats['sent']} sent, {plc_stats['dropped']} dropped, "
+                             f"{plc_stats['avg_latency_ms']:.1f} ms avg")
+                self.pipeline_stats_label.setText(text)
+            
+    def update_timing_stats(self):
+        snapshot = metrics.snapshot()
+        if not snapshot:
+            return
+        budget_ms = 1000.0 / max(1, self.camera_settings['fps'])
+        parts = []
+        for stage in self.timing_stages:
+            if stage in snapshot:
+                parts.append(f"{stage} {snapshot[stage]['p50_ms']:.1f}/{snapshot[stage]['p99_ms']:.1f}")
+        over_budget = [stage for stage in self.timing_stages
+                       if stage != 'end_to_end' and stage in snapshot and snapshot[stage]['p99_ms'] > budget_ms]
+                       
+        text = "p50/p99 ms: " + " | ".join(parts)
+        if over_budget:
+            text += f" | Over {budget_ms:.0f} ms budget: {', '.join(over_budget)}"
+            self.timing_label.setStyleSheet("color: red;")
+        else:
+            self.timing_label.setStyleSheet("")
+        self.timing_label.setText(text)
+        self.timing_label.setToolTip("\n".join(
+            f"{stage}: p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, "
+            f"mean {stats['mean_ms']:.2f} ms ({stats['count']} samples)"
+            for stage, stats in sorted(snapshot.items())
+        ))
         
     def handle_camera_error(self, error_message):
         self.status_bar.showMessage(error_message)
@@ -266,6 +673,7 @@ class VideoApp(QMainWindow):
         self.video_widget.roi_start = None
         self.video_widget.roi_end = None
         self.video_widget.roi_selected = False
+        self.update_detection_roi()
         self.status_bar.showMessage("Click and drag to select ROI")
         self.btn_select_roi.setText("ROI Selection Active")
         self.btn_select_roi.setStyleSheet("background-color: yellow;")
@@ -290,8 +698,7 @@ class VideoApp(QMainWindow):
         if self.video_widget.current_frame is not None:
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
             filename = f"frame_{timestamp}.png"
-            frame_bgr = cv2.cvtColor(self.video_widget.current_frame, cv2.COLOR_RGB2BGR)
-            cv2.imwrite(filename, frame_bgr)
+            cv2.imwrite(filename, self.video_widget.current_frame)
             self.status_bar.showMessage(f"Frame saved as {filename}")
             
     def toggle_grid(self):
@@ -303,8 +710,7 @@ class VideoApp(QMainWindow):
         if file_path:
             image = cv2.imread(file_path)
             if image is not None:
-                image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                self.video_widget.set_frame(image_rgb)
+                self.video_widget.set_frame(image)
                 self.status_bar.showMessage(f"Image loaded: {file_path}")
                 
     def open_camera_settings(self):
@@ -327,6 +733,28 @@ class VideoApp(QMainWindow):
         dialog.tolerance_spin.setValue(self.detection_engine.tolerance)
         dialog.min_defect_angle_spin.setValue(self.detection_engine.min_defect_angle)
         dialog.max_defect_angle_spin.setValue(self.detection_engine.max_defect_angle)
+        dialog.overlay_check.setChecked(self.detection_engine.overlay_enabled)
+        dialog.multiscale_check.setChecked(self.detection_engine.multiscale_enabled)
+        dialog.pyramid_levels_spin.setValue(self.detection_engine.pyramid_levels)
+        dialog.board_tracking_check.setChecked(self.detection_engine.board_tracking_enabled)
+        dialog.board_width_spin.setValue(int(self.detection_engine.board_tracker.board_width))
+        dialog.queue_size_spin.setValue(self.pipeline_settings['queue_size'])
+        dialog.drop_policy_combo.setCurrentIndex(dialog.drop_policy_combo.findData(self.pipeline_settings['drop_policy']))
+        dialog.target_rate_spin.setValue(self.pipeline_settings['target_rate'])
+        dialog.latency_budget_spin.setValue(self.pipeline_settings['latency_budget_ms'])
+        dialog.motion_gate_check.setChecked(self.pipeline_settings['motion_gate'])
+        dialog.motion_sensitivity_spin.setValue(self.pipeline_settings['motion_sensitivity'])
+        dialog.motion_hold_spin.setValue(self.pipeline_settings['motion_hold_frames'])
+        dialog.clip_export_check.setChecked(self.pipeline_settings['clip_export'])
+        dialog.clip_pre_spin.setValue(self.pipeline_settings['clip_pre_seconds'])
+        dialog.clip_post_spin.setValue(self.pipeline_settings['clip_post_seconds'])
+        if self.shm_pipeline_running():
+            dialog.clip_export_check.setEnabled(False)
+            dialog.clip_export_check.setToolTip("Not available in the multiprocess pipeline")
+        image_writer = self.detection_engine.image_writer
+        dialog.image_format_combo.setCurrentIndex(dialog.image_format_combo.findData(image_writer.image_format))
+        dialog.image_quality_spin.setValue(image_writer.quality)
+        dialog.png_compression_spin.setValue(image_writer.png_compression)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.detection_engine.set_detection_settings(
@@ -335,31 +763,240 @@ class VideoApp(QMainWindow):
                 dialog.min_defect_angle_spin.value(),
                 dialog.max_defect_angle_spin.value()
             )
+            self.detection_engine.overlay_enabled = dialog.overlay_check.isChecked()
+            self.detection_engine.multiscale_enabled = dialog.multiscale_check.isChecked()
+            self.detection_engine.pyramid_levels = dialog.pyramid_levels_spin.value()
+            self.detection_engine.set_board_tracking(dialog.board_tracking_check.isChecked(),
+                                                     dialog.board_width_spin.value())
+            self.pipeline_settings['queue_size'] = dialog.queue_size_spin.value()
+            self.pipeline_settings['drop_policy'] = dialog.drop_policy_combo.currentData()
+            self.pipeline_settings['target_rate'] = dialog.target_rate_spin.value()
+            self.pipeline_settings['latency_budget_ms'] = dialog.latency_budget_spin.value()
+            self.pipeline_settings['motion_gate'] = dialog.motion_gate_check.isChecked()
+            self.pipeline_settings['motion_sensitivity'] = dialog.motion_sensitivity_spin.value()
+            self.pipeline_settings['motion_hold_frames'] = dialog.motion_hold_spin.value()
+            clip_settings_changed = (
+                dialog.clip_export_check.isChecked() != self.pipeline_settings['clip_export'] or
+                dialog.clip_pre_spin.value() != self.pipeline_settings['clip_pre_seconds'] or
+                dialog.clip_post_spin.value() != self.pipeline_settings['clip_post_seconds']
+            )
+            self.pipeline_settings['clip_export'] = dialog.clip_export_check.isChecked()
+            self.pipeline_settings['clip_pre_seconds'] = dialog.clip_pre_spin.value()
+            self.pipeline_settings['clip_post_seconds'] = dialog.clip_post_spin.value()
+            image_writer.set_format(
+                dialog.image_format_combo.currentData(),
+                dialog.image_quality_spin.value(),
+                dialog.png_compression_spin.value()
+            )
+            
+            for source in self.sources:
+                if source['shm_pipeline'] is not None:
+                    source['shm_pipeline'].update_settings(source['engine'])
+                    source['shm_pipeline'].update_pipeline_settings(self.pipeline_settings)
+                channel = source['channel']
+                if channel is None:
+                    continue
+                channel.frame_buffer.set_capacity(self.pipeline_settings['queue_size'])
+                channel.frame_buffer.set_drop_policy(self.pipeline_settings['drop_policy'])
+                channel.rate_controller.configure(
+                    self.pipeline_settings['target_rate'],
+                    self.pipeline_settings['latency_budget_ms'] / 1000.0
+                )
+                channel.set_motion_gate(self.create_motion_gate())
+                if clip_settings_changed:
+                    video_thread = source['video_thread']
+                    self.configure_clip_export(channel, video_thread.source_fps(), video_thread.video_file is not None)
             
     def open_socket_setup(self):
         dialog = SocketSetupDialog(self)
-        dialog.exec()
+        dialog.host_entry.setText(self.sensor_host)
+        dialog.port_entry.setText(str(self.sensor_port))
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.sensor_host = dialog.host_entry.text().strip()
+            self.sensor_port = int(dialog.port_entry.text())
+            self.start_sensor_listener()
+            self.status_bar.showMessage(f"Connecting to sensor {self.sensor_host}:{self.sensor_port}")
+            
+    def start_sensor_listener(self):
+        self.stop_sensor_listener()
+        self.sensor_listener = SensorListener(self.sensor_host, self.sensor_port, self.low_signal_duration)
+        self.sensor_listener.board_detected.connect(self.on_board_detected)
+        self.sensor_listener.pallet_completed.connect(self.on_pallet_completed)
+        self.sensor_listener.board_cleared.connect(self.on_board_cleared)
+        self.sensor_listener.connection_changed.connect(self.on_sensor_connection_changed)
+        self.sensor_listener.error_occurred.connect(self.handle_camera_error)
+        self.sensor_listener.start()
+        
+    def stop_sensor_listener(self):
+        if self.sensor_listener is not None:
+            self.sensor_listener.stop()
+            self.sensor_listener = None
+            
+    def open_plc_setup(self):
+        dialog = PlcSetupDialog(self)
+        dialog.host_entry.setText(self.plc_settings['host'])
+        dialog.port_spin.setValue(self.plc_settings['port'])
+        dialog.transport_combo.setCurrentIndex(dialog.transport_combo.findData(self.plc_settings['transport']))
+        dialog.format_combo.setCurrentIndex(dialog.format_combo.findData(self.plc_settings['message_format']))
+        dialog.batch_size_spin.setValue(self.plc_settings['batch_size'])
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.plc_settings['host'] = dialog.host_entry.text()
+            self.plc_settings['port'] = dialog.port_spin.value()
+            self.plc_settings['transport'] = dialog.transport_combo.currentData()
+            self.plc_settings['message_format'] = dialog.format_combo.currentData()
+            self.plc_settings['batch_size'] = dialog.batch_size_spin.value()
+            self.start_defect_publisher()
+            
+    def start_defect_publisher(self):
+        self.stop_defect_publisher()
+        self.defect_publisher = DefectPublisher(**self.plc_settings)
+        self.defect_publisher.start()
+        self.set_channel_publishers(self.defect_publisher)
+        self.status_bar.showMessage(
+            f"Publishing defects to {self.plc_settings['transport']}://"
+            f"{self.plc_settings['host']}:{self.plc_settings['port']}"
+        )
+        
+    def stop_defect_publisher(self):
+        if self.defect_publisher is not None:
+            self.set_channel_publishers(None)
+            self.defect_publisher.stop()
+            self.defect_publisher = None
+            
+    def set_channel_publishers(self, publisher):
+        for source in self.sources:
+            if source['channel'] is not None:
+                source['channel'].publisher = publisher
+            if source['shm_pipeline'] is not None:
+                source['shm_pipeline'].publisher = publisher
+                
+    def on_sensor_connection_changed(self, connected, address):
+        if connected:
+            self.status_bar.showMessage(f"Sensor connected: {address}")
+        else:
+            self.status_bar.showMessage(f"Sensor not connected: {address}, retrying")
+            
+    def on_board_detected(self, board_count, received_at):
+        self.board_count = board_count
+        self.last_signal_time = time.time()
+        self.board_count_label.setText(f"Board Count: {self.board_count}")
+        self.board_count_label.setStyleSheet("")
+        for source in self.sources:
+            if source['channel'] is not None:
+                source['channel'].begin_board_window()
+        metrics.observe('sensor', time.perf_counter() - received_at)
+        
+    def on_board_cleared(self, board_count, received_at):
+        for source in self.sources:
+            if source['channel'] is not None:
+                source['channel'].end_board_window()
+        
+    def on_pallet_completed(self, pallet_count, board_count, received_at):
+        self.pallet_count = pallet_count
+        self.board_count = 0
+        self.pallet_count_label.setText(f"Pallet Count: {self.pallet_count}")
+        self.board_count_label.setText(f"Board Count: {board_count} (last pallet)")
+        if board_count != self.target_board_count:
+            self.board_count_label.setStyleSheet("color: red;")
+            self.database_manager.log_fault(
+                fault_type="Board Count",
+                image_index=0,
+                details=f"Pallet {pallet_count} had {board_count} boards, expected {self.target_board_count}",
+                measurement=board_count
+            )
+        metrics.observe('sensor', time.perf_counter() - received_at)
         
     def open_pallet_setup(self):
         dialog = PalletSetupDialog(self)
         dialog.low_signal_duration_spin.setValue(self.low_signal_duration)
         dialog.target_board_count_spin.setValue(self.target_board_count)
+        dialog.best_frame_check.setChecked(self.best_frame_selection)
+        dialog.frames_per_board_spin.setValue(self.frames_per_board)
+        if self.shm_pipeline_running():
+            dialog.best_frame_check.setEnabled(False)
+            dialog.best_frame_check.setToolTip("Not available in the multiprocess pipeline")
+        dialog.template_manager = self.template_manager
+        dialog.base_profile = self.current_profile()
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.low_signal_duration = dialog.low_signal_duration_spin.value()
             self.target_board_count = dialog.target_board_count_spin.value()
+            self.best_frame_selection = dialog.best_frame_check.isChecked()
+            self.frames_per_board = dialog.frames_per_board_spin.value()
+            if self.sensor_listener is not None:
+                self.sensor_listener.set_low_signal_duration(self.low_signal_duration)
+            for source in self.sources:
+                if source['channel'] is not None:
+                    source['channel'].set_frame_selector(self.create_frame_selector())
             
+    def current_profile(self):
+        profile = profile_from_engine(self.detection_engine, self.video_widget.get_roi())
+        profile['low_signal_duration'] = self.low_signal_duration
+        profile['target_board_count'] = self.target_board_count
+        profile['best_frame_selection'] = self.best_frame_selection
+        profile['frames_per_board'] = self.frames_per_board
+        return profile
+        
+    def apply_template(self, template_name):
+        profile = self.template_manager.load_template(template_name)
+        if profile is None:
+            self.active_template = None
+            return
+        self.apply_profile(profile)
+        self.active_template = template_name
+        self.status_bar.showMessage(f"Applied template: {template_name}")
+        
+    def apply_profile(self, profile):
+        source = self.current_source
+        source['engine'].apply_profile(profile)
+        if profile['roi'] is not None:
+            source['widget'].set_roi(profile['roi'])
+        if source['shm_pipeline'] is not None:
+            source['shm_pipeline'].update_settings(source['engine'])
+            
+        self.low_signal_duration = profile['low_signal_duration']
+        self.target_board_count = profile['target_board_count']
+        if self.sensor_listener is not None:
+            self.sensor_listener.set_low_signal_duration(self.low_signal_duration)
+        if (profile['best_frame_selection'] != self.best_frame_selection or
+                profile['frames_per_board'] != self.frames_per_board):
+            self.best_frame_selection = profile['best_frame_selection']
+            self.frames_per_board = profile['frames_per_board']
+            for source in self.sources:
+                if source['channel'] is not None:
+                    source['channel'].set_frame_selector(self.create_frame_selector())
+                    
+    def check_templates(self):
+        changed = self.template_manager.take_changes(self)
+        if not changed:
+            return
+        self.template_manager.update_template_combo(self.template_combo)
+        if self.active_template is not None and self.template_combo.currentText() != self.active_template:
+            self.active_template = None
+        elif self.active_template in changed:
+            profile = self.template_manager.load_template(self.active_template)
+            if profile is not None:
+                self.apply_profile(profile)
+                self.status_bar.showMessage(f"Reloaded template: {self.active_template}")
+                
     def open_defects_window(self):
         if self.defects_window is None or not self.defects_window.isVisible():
-            self.defects_window = DefectsWindow(self)
-            self.defects_window.update_defects(self.defects)
+            self.defects_window = DefectsWindow(self.database_manager, self)
         self.defects_window.show()
         self.defects_window.raise_()
         
     def closeEvent(self, event):
-        if self.video_thread is not None:
-            self.video_thread.stop()
-            self.video_thread.wait()
+        for source in self.sources:
+            self.stop_video_pipeline(source)
+        self.detection_pool.stop()
+        self.stop_sensor_listener()
+        self.stop_defect_publisher()
+        QApplication.processEvents()
+        for source in self.sources:
+            source['engine'].image_writer.stop()
+        self.database_manager.close()
+        self.camera_manager.shutdown()
+        self.metrics_server.stop()
         event.accept()
 
 def main():
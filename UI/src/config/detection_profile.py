@@ -0,0 +1,107 @@
+import json
+import math
+import os
+
+PROFILE_FIELDS = {
+    'standard_angle': (float, 0, 180, 90.0),
+    'tolerance': (float, 0, 90, 5.0),
+    'min_defect_angle': (float, 0, 180, 80.0),
+    'max_defect_angle': (float, 0, 180, 100.0),
+    'blur_kernel': (int, 1, 31, 5),
+    'canny_low': (int, 0, 255, 50),
+    'canny_high': (int, 0, 255, 150),
+    'hough_threshold': (int, 1, 1000, 100),
+    'min_line_length': (int, 1, 10000, 100),
+    'max_line_gap': (int, 0, 1000, 10),
+    'multiscale_enabled': (bool, None, None, False),
+    'pyramid_levels': (int, 1, 3, 1),
+    'board_tracking': (bool, None, None, True),
+    'board_width': (float, 0, 2000, 0.0),
+    'overlay_enabled': (bool, None, None, True),
+    'roi': (list, None, None, None),
+    'low_signal_duration': (float, 0.1, 10, 1.0),
+    'target_board_count': (int, 1, 100, 5),
+    'best_frame_selection': (bool, None, None, False),
+    'frames_per_board': (int, 1, 10, 3)
+}
+ENGINE_FIELDS = ('standard_angle', 'tolerance', 'min_defect_angle', 'max_defect_angle', 'blur_kernel', 'canny_low',
+                 'canny_high', 'hough_threshold', 'min_line_length', 'max_line_gap', 'multiscale_enabled',
+                 'pyramid_levels', 'overlay_enabled')
+
+def default_profile():
+    return {name: field[3] for name, field in PROFILE_FIELDS.items()}
+
+def validate_roi(value):
+    if value is None:
+        return None
+    if not isinstance(value, (list, tuple)) or len(value) != 4:
+        raise ValueError("roi must be null or [x1, y1, x2, y2]")
+    if any(isinstance(part, bool) or not isinstance(part, (int, float)) or not math.isfinite(part) or
+           part != int(part) for part in value):
+        raise ValueError("roi coordinates must be integers")
+    x1, y1, x2, y2 = (int(part) for part in value)
+    if x1 < 0 or y1 < 0 or x1 >= x2 or y1 >= y2:
+        raise ValueError("roi must satisfy 0 <= x1 < x2 and 0 <= y1 < y2")
+    return [x1, y1, x2, y2]
+
+def validate_value(name, value):
+    field_type, minimum, maximum, _ = PROFILE_FIELDS[name]
+    if field_type is list:
+        return validate_roi(value)
+    if field_type is bool:
+        if not isinstance(value, bool):
+            raise ValueError(f"{name} must be true or false")
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number")
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number")
+    if field_type is int:
+        if value != int(value):
+            raise ValueError(f"{name} must be a whole number")
+        value = int(value)
+    else:
+        value = float(value)
+    if not minimum <= value <= maximum:
+        raise ValueError(f"{name} must be between {minimum} and {maximum}")
+    return value
+
+def validate_profile(data):
+    if not isinstance(data, dict):
+        raise ValueError("Profile must be a JSON object")
+    unknown = sorted(set(data) - set(PROFILE_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown profile field(s): {', '.join(unknown)}")
+        
+    profile = default_profile()
+    for name, value in data.items():
+        profile[name] = validate_value(name, value)
+    if profile['min_defect_angle'] > profile['max_defect_angle']:
+        raise ValueError("min_defect_angle must not exceed max_defect_angle")
+    if profile['canny_low'] > profile['canny_high']:
+        raise ValueError("canny_low must not exceed canny_high")
+    if profile['blur_kernel'] % 2 == 0:
+        raise ValueError("blur_kernel must be odd")
+    return profile
+
+def load_profile(path):
+    with open(path, "r") as file:
+        data = json.load(file)
+    return validate_profile(data)
+
+def save_profile(path, profile):
+    profile = validate_profile(profile)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(profile, file, indent=2)
+    os.replace(temp_path, path)
+    return profile
+
+def profile_from_engine(engine, roi=None):
+    profile = default_profile()
+    for name in ENGINE_FIELDS:
+        profile[name] = getattr(engine, name)
+    profile['board_tracking'] = engine.board_tracking_enabled
+    profile['board_width'] = engine.board_tracker.board_width
+    profile['roi'] = None if roi is None else list(roi)
+    return validate_profile(profile)
\ No newline at end of file
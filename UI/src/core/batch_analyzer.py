@@ -0,0 +1,347 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+from src.config.detection_profile import load_profile
+from src.core.detection_engine import DetectionEngine
+from src.core.motion_gate import MotionGate
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov')
+
+_worker_engine = None
+_worker_settings = None
+
+def create_engine(settings, save_images):
+    engine = DetectionEngine()
+    if settings.get('profile') is not None:
+        engine.apply_profile(settings['profile'])
+    engine.set_detection_settings(
+        settings['standard_angle'],
+        settings['tolerance'],
+        settings['min_defect_angle'],
+        settings['max_defect_angle']
+    )
+    engine.multiscale_enabled = bool(settings.get('pyramid_levels'))
+    engine.pyramid_levels = settings.get('pyramid_levels') or 1
+    engine.set_board_tracking(settings.get('board_tracking', True), settings.get('board_width'))
+    engine.save_defect_images = save_images
+    engine.overlay_enabled = False
+    engine.image_writer.drop_when_full = False
+    engine.image_writer.name_prefix = f"defect_{os.getpid()}"
+    return engine
+
+def _init_worker(settings, save_images):
+    global _worker_engine, _worker_settings
+    cv2.setNumThreads(1)
+    _worker_settings = settings
+    _worker_engine = create_engine(settings, save_images)
+
+def analyze_range(video_path, start_frame, end_frame, roi=None):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video file: {video_path}")
+        
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    motion_gate = None
+    read_start = start_frame
+    if _worker_settings.get('motion_sensitivity'):
+        motion_gate = MotionGate(_worker_settings['motion_sensitivity'], _worker_settings.get('motion_hold_frames', 15))
+        read_start = max(0, start_frame - (motion_gate.hold_frames + 2))
+    results = []
+    try:
+        if read_start > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, read_start)
+            
+        frame_index = read_start
+        while frame_index < end_frame:
+            ret, frame = cap.read()
+            if not ret:
+                break
+                
+            if roi is not None:
+                x1, y1, x2, y2 = roi
+                frame = frame[y1:y2, x1:x2]
+                
+            if frame_index < start_frame:
+                motion_gate.should_detect(frame)
+                frame_index += 1
+                continue
+                
+            result = {
+                'source': video_path,
+                'frame_index': frame_index,
+                'position_ms': frame_index * 1000.0 / fps if fps > 0 else None,
+                'gated': False,
+                'line_count': 0,
+                'angles': [],
+                'defects': []
+            }
+            if motion_gate is not None and not motion_gate.should_detect(frame):
+                result['gated'] = True
+                results.append(result)
+                frame_index += 1
+                continue
+                
+            lines, angles, deviations, defect_mask = _worker_engine.measure_frame(frame)
+            result['line_count'] = len(angles)
+            result['angles'] = [round(angle, 3) for angle in _worker_engine.last_angles]
+            result['measurement'] = (lines, angles, deviations, defect_mask)
+            if _worker_engine.save_defect_images and defect_mask.any():
+                result['candidate_image'] = _worker_engine.save_annotated_frame(frame, lines)
+            results.append(result)
+            frame_index += 1
+    finally:
+        cap.release()
+        _worker_engine.image_writer.flush()
+        
+    return results
+
+def track_results(engine, results):
+    for result in results:
+        measurement = result.pop('measurement', None)
+        candidate_image = result.pop('candidate_image', None)
+        if measurement is None:
+            continue
+        lines, angles, deviations, defect_mask = measurement
+        defect_indices, board_ids = engine.find_defects(lines, angles, deviations, defect_mask)
+        if candidate_image is not None and not len(defect_indices):
+            try:
+                os.remove(candidate_image)
+            except OSError as e:
+                print(f"Error removing unused defect image: {str(e)}")
+            candidate_image = None
+        result['defects'] = [
+            {
+                'angle': round(defect['angle'], 3),
+                'details': defect['details'],
+                'board_id': defect['board_id'],
+                'image_path': defect['image_path']
+            }
+            for defect in engine.describe_defects(defect_indices, board_ids, angles, deviations, candidate_image)
+        ]
+    return results
+
+def split_frame_ranges(frame_count, chunk_size):
+    return [(start, min(start + chunk_size, frame_count)) for start in range(0, frame_count, chunk_size)]
+
+def get_frame_count(video_path):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return 0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return max(frame_count, 0)
+
+def collect_video_files(paths):
+    video_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    video_files.append(os.path.join(path, name))
+        elif path.lower().endswith(VIDEO_EXTENSIONS):
+            video_files.append(path)
+        else:
+            print(f"Skipping unsupported file: {path}")
+    return video_files
+
+class JsonlResultWriter:
+    def __init__(self, output_path):
+        self.file = open(output_path, "w", encoding="utf-8")
+        
+    def write(self, results):
+        for result in results:
+            self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
+        
+    def close(self):
+        self.file.close()
+
+class SqliteResultWriter:
+    def __init__(self, output_path):
+        self.conn = sqlite3.connect(output_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS frame_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT,
+                frame_index INTEGER,
+                position_ms REAL,
+                line_count INTEGER,
+                angles TEXT,
+                defect_count INTEGER,
+                defects TEXT
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_frame_results_source ON frame_results (source, frame_index)')
+        self.conn.commit()
+        
+    def write(self, results):
+        self.conn.executemany('''
+            INSERT INTO frame_results (source, frame_index, position_ms, line_count, angles, defect_count, defects)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(result['source'], result['frame_index'], result['position_ms'], result['line_count'],
+               json.dumps(result['angles']), len(result['defects']), json.dumps(result['defects']))
+              for result in results])
+        self.conn.commit()
+        
+    def close(self):
+        self.conn.close()
+
+def create_result_writer(output_path, output_format=None):
+    if output_format is None:
+        output_format = 'sqlite' if output_path.lower().endswith(('.db', '.sqlite', '.sqlite3')) else 'jsonl'
+    if output_format == 'sqlite':
+        return SqliteResultWriter(output_path)
+    return JsonlResultWriter(output_path)
+
+def run_batch(video_files, writer, settings, workers=None, chunk_size=300, roi=None, save_images=False):
+    workers = workers or os.cpu_count() or 1
+    jobs = []
+    for video_path in video_files:
+        frame_count = get_frame_count(video_path)
+        if frame_count == 0:
+            print(f"Skipping unreadable video: {video_path}")
+            continue
+        for start, end in split_frame_ranges(frame_count, chunk_size):
+            jobs.append((video_path, start, end))
+            
+    total_frames = 0
+    total_defects = 0
+    total_gated = 0
+    trackers = {}
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(settings, save_images)) as executor:
+        pending = []
+        job_iter = iter(jobs)
+        
+        def submit_next():
+            job = next(job_iter, None)
+            if job is not None:
+                pending.append(executor.submit(analyze_range, job[0], job[1], job[2], roi))
+                
+        for _ in range(workers * 2):
+            submit_next()
+            
+        while pending:
+            results = pending.pop(0).result()
+            submit_next()
+            if results:
+                source = results[0]['source']
+                if source not in trackers:
+                    trackers.clear()
+                    trackers[source] = create_engine(settings, False)
+                track_results(trackers[source], results)
+            writer.write(results)
+            total_frames += len(results)
+            total_defects += sum(len(result['defects']) for result in results)
+            total_gated += sum(1 for result in results if result['gated'])
+            
+    elapsed = time.time() - start_time
+    return {
+        'files': len(video_files),
+        'frames': total_frames,
+        'defects': total_defects,
+        'gated': total_gated,
+        'elapsed': elapsed,
+        'fps': total_frames / elapsed if elapsed > 0 else 0.0
+    }
+
+def parse_roi(value):
+    try:
+        x1, y1, x2, y2 = (int(part) for part in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError("ROI must be x1,y1,x2,y2")
+    if x1 >= x2 or y1 >= y2:
+        raise argparse.ArgumentTypeError("ROI must satisfy x1 < x2 and y1 < y2")
+    return (x1, y1, x2, y2)
+
+def template_defaults(profile):
+    return {
+        'roi': None if profile['roi'] is None else tuple(profile['roi']),
+        'standard_angle': profile['standard_angle'],
+        'tolerance': profile['tolerance'],
+        'min_defect_angle': profile['min_defect_angle'],
+        'max_defect_angle': profile['max_defect_angle'],
+        'multiscale': profile['pyramid_levels'] if profile['multiscale_enabled'] else None,
+        'board_tracking': profile['board_tracking'],
+        'board_width': profile['board_width']
+    }
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Analyse recorded pallet videos for misaligned boards without the GUI.")
+    parser.add_argument('inputs', nargs='+', help="Video files (.mp4, .avi, .mov) or directories containing them")
+    parser.add_argument('-o', '--output', required=True, help="Output file (.jsonl, or .db/.sqlite for SQLite)")
+    parser.add_argument('--format', choices=['jsonl', 'sqlite'], help="Output format (default: from output extension)")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument('--chunk-size', type=int, default=300, help="Frames per work unit")
+    parser.add_argument('--template', metavar='JSON',
+                        help="Detection template to start from; other options override its values")
+    parser.add_argument('--roi', type=parse_roi, help="Region of interest in frame pixels: x1,y1,x2,y2")
+    parser.add_argument('--standard-angle', type=float, default=90)
+    parser.add_argument('--tolerance', type=float, default=5)
+    parser.add_argument('--min-defect-angle', type=float, default=80)
+    parser.add_argument('--max-defect-angle', type=float, default=100)
+    parser.add_argument('--save-images', action='store_true', help="Write annotated defect images to defect_images/")
+    parser.add_argument('--multiscale', type=int, metavar='LEVELS',
+                        help="Find candidate lines LEVELS pyramid levels down and refine them at full resolution")
+    parser.add_argument('--no-board-tracking', dest='board_tracking', action='store_false',
+                        help="Report every out-of-tolerance segment in every frame instead of once per tracked board")
+    parser.add_argument('--board-width', type=float, default=0,
+                        help="Treat parallel edges within this many pixels as the same board (0 to track edges separately)")
+    parser.add_argument('--motion-gate', type=float, metavar='PERCENT',
+                        help="Skip frames where less than PERCENT of the ROI changed since the previous frame")
+    parser.add_argument('--motion-hold', type=int, default=15,
+                        help="Quiet frames to keep detecting after motion stops (with --motion-gate)")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    profile = None
+    if args.template is not None:
+        try:
+            profile = load_profile(args.template)
+        except (OSError, ValueError) as e:
+            print(f"Error loading template {args.template}: {str(e)}")
+            return 1
+        parser.set_defaults(**template_defaults(profile))
+        args = parser.parse_args(argv)
+        
+    video_files = collect_video_files(args.inputs)
+    if not video_files:
+        print("No video files to analyse")
+        return 1
+        
+    settings = {
+        'standard_angle': args.standard_angle,
+        'tolerance': args.tolerance,
+        'min_defect_angle': args.min_defect_angle,
+        'max_defect_angle': args.max_defect_angle,
+        'pyramid_levels': args.multiscale,
+        'board_tracking': args.board_tracking,
+        'board_width': args.board_width,
+        'motion_sensitivity': args.motion_gate,
+        'motion_hold_frames': args.motion_hold,
+        'profile': profile
+    }
+    
+    writer = create_result_writer(args.output, args.format)
+    try:
+        summary = run_batch(video_files, writer, settings, workers=args.workers, chunk_size=args.chunk_size,
+                            roi=args.roi, save_images=args.save_images)
+    finally:
+        writer.close()
+        
+    print(f"Analysed {summary['frames']} frames from {summary['files']} file(s) in {summary['elapsed']:.1f}s "
+          f"({summary['fps']:.1f} fps), {summary['defects']} defects, {summary['gated']} idle frames skipped "
+          f"-> {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
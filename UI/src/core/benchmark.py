@@ -0,0 +1,158 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+import numpy as np
+from src.core.detection_engine import DetectionEngine
+from src.utils.database_manager import DatabaseManager
+from src.utils.synthetic_pallet import generate_pallet_frames, save_dataset
+
+STAGES = ('grayscale', 'blur', 'canny', 'hough', 'scoring', 'drawing', 'coarse_to_fine', 'full')
+
+def parse_resolution(value):
+    try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Resolution must be WIDTHxHEIGHT")
+    return (width, height)
+
+def summarize(samples):
+    samples = np.asarray(samples, dtype=np.float64) * 1000.0
+    mean = float(samples.mean())
+    return {
+        'samples': int(samples.size),
+        'mean_ms': mean,
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'max_ms': float(samples.max()),
+        'fps': 1000.0 / mean if mean > 0 else 0.0
+    }
+
+def full_frame_roi(frame):
+    height, width = frame.shape[:2]
+    return (width // 10, height // 10, width - width // 10, height - height // 10)
+
+def process_frame_equivalent(engine, database_manager, frame, roi):
+    x1, y1, x2, y2 = roi
+    roi_frame = frame[y1:y2, x1:x2]
+    processed_roi, defects = engine.detect_and_draw_lines_with_angles(roi_frame)
+    frame[y1:y2, x1:x2] = processed_roi
+    for defect in defects:
+        database_manager.log_fault(
+            fault_type="Board Alignment",
+            image_index=1,
+            details=defect['details'],
+            measurement=defect['angle'],
+            image_path=defect['image_path']
+        )
+    return defects
+
+def benchmark_resolution(resolution, frame_count, warmup=5, seed=0, save_images=True, pyramid_levels=1):
+    width, height = resolution
+    frames = [frame for frame, _ in generate_pallet_frames(frame_count + warmup, width, height, seed=seed)]
+    timings = {stage: [] for stage in STAGES}
+    timer = time.perf_counter
+    
+    engine = DetectionEngine()
+    multiscale_engine = DetectionEngine()
+    multiscale_engine.pyramid_levels = pyramid_levels
+    for index, source in enumerate(frames):
+        frame = source.copy()
+        start = timer()
+        gray = engine.to_grayscale(frame)
+        after_gray = timer()
+        blurred = engine.blur(gray)
+        after_blur = timer()
+        edges = engine.detect_edges(blurred)
+        after_canny = timer()
+        lines = engine.find_lines(edges)
+        after_hough = timer()
+        engine.score_lines(lines)
+        after_scoring = timer()
+        engine.draw_overlay(frame, lines)
+        after_drawing = timer()
+        multiscale_engine.detect_lines_multiscale(source)
+        after_multiscale = timer()
+        if index >= warmup:
+            timings['grayscale'].append(after_gray - start)
+            timings['blur'].append(after_blur - after_gray)
+            timings['canny'].append(after_canny - after_blur)
+            timings['hough'].append(after_hough - after_canny)
+            timings['scoring'].append(after_scoring - after_hough)
+            timings['drawing'].append(after_drawing - after_scoring)
+            timings['coarse_to_fine'].append(after_multiscale - after_drawing)
+            
+    with tempfile.TemporaryDirectory() as work_dir:
+        engine = DetectionEngine()
+        engine.save_defect_images = save_images
+        engine.image_writer.output_dir = work_dir
+        database_manager = DatabaseManager(f"{work_dir}/faults.db")
+        defect_count = 0
+        try:
+            for index, source in enumerate(frames):
+                frame = source.copy()
+                start = timer()
+                defects = process_frame_equivalent(engine, database_manager, frame, full_frame_roi(frame))
+                elapsed = timer() - start
+                if index >= warmup:
+                    timings['full'].append(elapsed)
+                    defect_count += len(defects)
+        finally:
+            engine.image_writer.stop()
+            database_manager.close()
+        image_stats = engine.image_writer.get_stats()
+        
+    return {
+        'resolution': f"{width}x{height}",
+        'frames': frame_count,
+        'defects': defect_count,
+        'images_dropped': image_stats['dropped'],
+        'stages': {stage: summarize(samples) for stage, samples in timings.items()}
+    }
+
+def format_report(results):
+    lines = []
+    for result in results:
+        lines.append(f"Resolution {result['resolution']} ({result['frames']} frames, "
+                     f"{result['defects']} defects, {result['images_dropped']} images dropped)")
+        lines.append(f"  {'stage':<14} {'fps':>10} {'mean ms':>10} {'p50 ms':>10} {'p99 ms':>10}")
+        for stage in STAGES:
+            stats = result['stages'][stage]
+            lines.append(f"  {stage:<14} {stats['fps']:>10.1f} {stats['mean_ms']:>10.3f} "
+                         f"{stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f}")
+    return "\n".join(lines)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark DetectionEngine stages on synthetic pallet frames.")
+    parser.add_argument('--resolutions', type=parse_resolution, nargs='+',
+                        default=[(1280, 720), (1920, 1080)], help="Frame sizes as WIDTHxHEIGHT")
+    parser.add_argument('-n', '--frames', type=int, default=200, help="Measured frames per resolution")
+    parser.add_argument('--warmup', type=int, default=5, help="Frames to run before measuring")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the frame generator")
+    parser.add_argument('--no-images', action='store_true', help="Skip defect image writes in the full run")
+    parser.add_argument('--pyramid-levels', type=int, default=1, help="Pyramid levels for the coarse_to_fine stage")
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+    parser.add_argument('--save-frames', metavar='DIR',
+                        help="Write a labelled synthetic frame set (PNGs + labels.json) to DIR and exit")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.save_frames:
+        width, height = args.resolutions[0]
+        labels = save_dataset(args.save_frames, args.frames, width=width, height=height, seed=args.seed)
+        print(f"Wrote {len(labels)} labelled {width}x{height} frames to {args.save_frames}")
+        return 0
+        
+    results = [benchmark_resolution(resolution, args.frames, args.warmup, args.seed, not args.no_images,
+                                    args.pyramid_levels)
+               for resolution in args.resolutions]
+    print(format_report(results))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,96 @@
+import heapq
+import itertools
+import threading
+from collections import deque
+import cv2
+import numpy as np
+
+class BestFrameSelector:
+    def __init__(self, frames_per_board=3, centring_weight=0.5, sample_width=160, max_window_frames=300):
+        self.frames_per_board = frames_per_board
+        self.centring_weight = centring_weight
+        self.sample_width = sample_width
+        self.max_window_frames = max_window_frames
+        self.lock = threading.Lock()
+        self.window_open = False
+        self.window_frames = 0
+        self.candidates = []
+        self.completed = deque()
+        self.sequence = itertools.count()
+        self.scored_count = 0
+        self.selected_count = 0
+        self.window_count = 0
+        
+    def score(self, region):
+        height, width = region.shape[:2]
+        sample_height = max(1, int(round(height * self.sample_width / max(1, width))))
+        small = cv2.resize(region, (self.sample_width, sample_height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        laplacian = cv2.Laplacian(small, cv2.CV_32F)
+        sharpness = float(laplacian.var())
+        if not self.centring_weight:
+            return sharpness
+            
+        energy = np.abs(laplacian)
+        total = float(energy.sum())
+        if total == 0:
+            return 0.0
+        rows, columns = np.indices(energy.shape, dtype=np.float32)
+        centre_x = float((columns * energy).sum()) / total / max(1, energy.shape[1] - 1)
+        centre_y = float((rows * energy).sum()) / total / max(1, energy.shape[0] - 1)
+        offset = min(1.0, 2 * np.hypot(centre_x - 0.5, centre_y - 0.5))
+        return sharpness * (1 - self.centring_weight * offset)
+        
+    def open_window(self):
+        with self.lock:
+            self.finish_window()
+            self.window_open = True
+            self.window_count += 1
+            
+    def close_window(self):
+        with self.lock:
+            self.finish_window()
+            
+    def finish_window(self):
+        if self.candidates:
+            selected = sorted(self.candidates, key=lambda candidate: candidate[1])
+            self.completed.append([frame for _, _, frame in selected])
+            self.selected_count += len(selected)
+        self.candidates = []
+        self.window_frames = 0
+        self.window_open = False
+        
+    def add(self, frame, region):
+        if not self.window_open:
+            return False
+        score = self.score(region)
+        with self.lock:
+            if not self.window_open:
+                return False
+            self.scored_count += 1
+            self.window_frames += 1
+            entry = None
+            if len(self.candidates) < self.frames_per_board:
+                entry = (score, next(self.sequence), frame.copy())
+                heapq.heappush(self.candidates, entry)
+            elif score > self.candidates[0][0]:
+                entry = (score, next(self.sequence), frame.copy())
+                heapq.heapreplace(self.candidates, entry)
+            if self.window_frames >= self.max_window_frames:
+                self.finish_window()
+            return entry is not None
+            
+    def take_completed(self):
+        with self.lock:
+            windows = list(self.completed)
+            self.completed.clear()
+        return windows
+        
+    def get_stats(self):
+        return {
+            'windows': self.window_count,
+            'scored': self.scored_count,
+            'selected': self.selected_count,
+            'open': self.window_open
+        }
\ No newline at end of file
@@ -0,0 +1,136 @@
+import itertools
+import numpy as np
+
+def merge_segments(lines, angle_tolerance=2.0, distance_tolerance=8.0):
+    lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+    if len(lines) < 2:
+        return lines.astype(np.float32)
+        
+    starts = lines[:, :2]
+    ends = lines[:, 2:]
+    directions = ends - starts
+    lengths = np.maximum(np.hypot(directions[:, 0], directions[:, 1]), 1e-6)
+    directions = directions / lengths[:, np.newaxis]
+    midpoints = (starts + ends) / 2
+    
+    parallel = np.abs(directions @ directions.T) >= np.cos(np.radians(angle_tolerance))
+    offsets = midpoints[np.newaxis, :, :] - starts[:, np.newaxis, :]
+    distances = np.abs(offsets[:, :, 0] * directions[:, np.newaxis, 1] - offsets[:, :, 1] * directions[:, np.newaxis, 0])
+    collinear = parallel & (distances <= distance_tolerance)
+    
+    merged = []
+    assigned = np.zeros(len(lines), dtype=bool)
+    for index in np.argsort(-lengths):
+        if assigned[index]:
+            continue
+        members = np.flatnonzero(collinear[index] & ~assigned)
+        assigned[members] = True
+        
+        direction = directions[index]
+        aligned = np.where((directions[members] @ direction)[:, np.newaxis] < 0, -directions[members], directions[members])
+        direction = (aligned * lengths[members, np.newaxis]).sum(axis=0)
+        direction /= np.hypot(*direction)
+        
+        weights = lengths[members] / lengths[members].sum()
+        center = (midpoints[members] * weights[:, np.newaxis]).sum(axis=0)
+        points = np.concatenate((starts[members], ends[members])) - center
+        along = points @ direction
+        merged.append(np.concatenate((center + along.min() * direction, center + along.max() * direction)))
+    return np.array(merged, dtype=np.float32)
+
+class BoardTracker:
+    def __init__(self, max_distance=80.0, max_angle_change=5.0, max_missed=10, min_hits=2, board_width=0.0):
+        self.max_distance = max_distance
+        self.max_angle_change = max_angle_change
+        self.max_missed = max_missed
+        self.min_hits = min_hits
+        self.board_width = board_width
+        self.tracks = []
+        self.reported_boards = set()
+        self.track_ids = itertools.count(1)
+        self.event_count = 0
+        
+    def reset(self):
+        self.tracks = []
+        self.reported_boards = set()
+        
+    def find_board(self, center, angle):
+        if not self.board_width:
+            return None
+        theta = np.radians(angle)
+        for track in self.tracks:
+            if abs(track['angle'] - angle) > self.max_angle_change:
+                continue
+            offset = center - track['center']
+            separation = abs(offset[0] * np.sin(theta) - offset[1] * np.cos(theta))
+            if separation <= self.board_width and np.hypot(*offset) <= self.board_width * 2:
+                return track['board_id']
+        return None
+        
+    def update(self, lines, angles, deviations, defect_mask, min_hits=None):
+        if min_hits is None:
+            min_hits = self.min_hits
+        lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+        centers = (lines[:, :2] + lines[:, 2:]) / 2
+        predicted = [track['center'] + track['velocity'] for track in self.tracks]
+        
+        pairs = []
+        for track_index, prediction in enumerate(predicted):
+            distances = np.hypot(*(centers - prediction).T)
+            for line_index in np.flatnonzero(distances <= self.max_distance):
+                if abs(self.tracks[track_index]['angle'] - angles[line_index]) <= self.max_angle_change:
+                    pairs.append((distances[line_index], track_index, line_index))
+        pairs.sort()
+        
+        matched_tracks = set()
+        line_tracks = {}
+        for _, track_index, line_index in pairs:
+            if track_index in matched_tracks or line_index in line_tracks:
+                continue
+            matched_tracks.add(track_index)
+            line_tracks[line_index] = self.tracks[track_index]
+            
+        for track_index, track in enumerate(self.tracks):
+            if track_index not in matched_tracks:
+                track['missed'] += 1
+                track['center'] = track['center'] + track['velocity']
+                
+        for line_index in range(len(lines)):
+            track = line_tracks.get(line_index)
+            center = centers[line_index]
+            if track is None:
+                track_id = next(self.track_ids)
+                board_id = self.find_board(center, angles[line_index])
+                track = {
+                    'id': track_id,
+                    'board_id': board_id if board_id is not None else track_id,
+                    'center': center,
+                    'velocity': np.zeros(2),
+                    'hits': 0,
+                    'missed': 0,
+                    'max_deviation': 0.0
+                }
+                self.tracks.append(track)
+                line_tracks[line_index] = track
+            else:
+                track['velocity'] = 0.5 * track['velocity'] + 0.5 * (center - track['center'])
+                track['center'] = center
+            track['angle'] = float(angles[line_index])
+            track['hits'] += 1
+            track['missed'] = 0
+            track['max_deviation'] = max(track['max_deviation'], float(deviations[line_index]))
+            
+        events = []
+        for line_index, track in line_tracks.items():
+            if not defect_mask[line_index] or track['hits'] < min_hits:
+                continue
+            if track['board_id'] in self.reported_boards:
+                continue
+            self.reported_boards.add(track['board_id'])
+            self.event_count += 1
+            events.append((line_index, track))
+            
+        self.tracks = [track for track in self.tracks if track['missed'] <= self.max_missed]
+        live_boards = {track['board_id'] for track in self.tracks}
+        self.reported_boards &= live_boards
+        return sorted(events, key=lambda event: event[0])
\ No newline at end of file
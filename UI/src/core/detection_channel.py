@@ -0,0 +1,250 @@
+import threading
+import time
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+from src.core.frame_buffer import FrameBuffer, DROP_OLDEST
+from src.core.rate_controller import DetectionRateController
+from src.utils.metrics import metrics
+
+class DetectionChannel(QObject):
+    frame_processed = Signal(np.ndarray, float)
+    defects_detected = Signal(list)
+    
+    def __init__(self, name, detection_engine, database_manager, queue_size=4, drop_policy=DROP_OLDEST,
+                 target_rate=0.0, latency_budget=0.25, motion_gate=None, source_index=1):
+        super().__init__()
+        self.name = name
+        self.source_index = source_index
+        self.detection_engine = detection_engine
+        self.database_manager = database_manager
+        self.frame_buffer = FrameBuffer(queue_size, drop_policy)
+        self.rate_controller = DetectionRateController(target_rate, latency_budget)
+        self.motion_gate = motion_gate
+        self.frame_selector = None
+        self.publisher = None
+        self.frame_ring = None
+        self.clip_exporter = None
+        self.block_when_full = False
+        self.pool = None
+        self.busy = False
+        self.roi = None
+        self.processed_count = 0
+        self.idle_count = 0
+        self.display_dropped_count = 0
+        self.max_pending_display = 2
+        self.pending_display = 0
+        self.display_lock = threading.Lock()
+        self.rate_time = time.monotonic()
+        self.rate_processed = 0
+        self.detection_fps = 0.0
+        
+    def submit_frame(self, frame):
+        block = self.block_when_full
+        if block and not self.frame_buffer.wait_for_space():
+            return
+        captured_at = time.monotonic()
+        frame_ring = self.frame_ring
+        if frame_ring is not None:
+            with metrics.time('ring_copy'):
+                frame_ring.push(frame, captured_at)
+        self.frame_buffer.put(frame, captured_at, block)
+        pool = self.pool
+        if pool is not None:
+            pool.notify()
+            
+    def set_roi(self, roi):
+        self.roi = roi
+        self.detection_engine.reset_tracking()
+        motion_gate = self.motion_gate
+        if motion_gate is not None:
+            motion_gate.reset()
+            
+    def set_motion_gate(self, motion_gate):
+        self.motion_gate = motion_gate
+        
+    def set_clip_export(self, frame_ring, clip_exporter):
+        previous = self.clip_exporter
+        self.clip_exporter = clip_exporter
+        self.frame_ring = frame_ring
+        return previous
+        
+    def set_frame_selector(self, frame_selector):
+        self.frame_selector = frame_selector
+        
+    def begin_board_window(self):
+        frame_selector = self.frame_selector
+        if frame_selector is not None:
+            frame_selector.open_window()
+            
+    def end_board_window(self):
+        frame_selector = self.frame_selector
+        if frame_selector is not None:
+            frame_selector.close_window()
+            
+    def display_done(self):
+        with self.display_lock:
+            self.pending_display = max(0, self.pending_display - 1)
+            
+    def get_stats(self):
+        now = time.monotonic()
+        if now - self.rate_time >= 0.5:
+            self.detection_fps = (self.processed_count - self.rate_processed) / (now - self.rate_time)
+            self.rate_time = now
+            self.rate_processed = self.processed_count
+            
+        image_stats = self.detection_engine.image_writer.get_stats()
+        rate_stats = self.rate_controller.get_stats()
+        frame_selector = self.frame_selector
+        selector_stats = frame_selector.get_stats() if frame_selector is not None else {'scored': 0, 'selected': 0}
+        return {
+            'processed': self.processed_count,
+            'detection_fps': self.detection_fps,
+            'dropped': self.frame_buffer.dropped_count,
+            'skipped': rate_stats['skipped'],
+            'idle': self.idle_count,
+            'unanalysed': rate_stats['skipped'] + self.frame_buffer.dropped_count,
+            'detection_ms': rate_stats['detection_ms'],
+            'display_dropped': self.display_dropped_count,
+            'queue_depth': len(self.frame_buffer),
+            'queue_size': self.frame_buffer.capacity,
+            'images_written': image_stats['written'],
+            'images_dropped': image_stats['dropped'],
+            'image_queue_depth': image_stats['queue_depth'],
+            'frames_scored': selector_stats['scored'],
+            'best_frames': selector_stats['selected']
+        }
+        
+    def process_next(self):
+        item = self.frame_buffer.get(timeout=0)
+        if item is None:
+            return
+            
+        frame, captured_at = item
+        metrics.observe('queue_wait', time.monotonic() - captured_at)
+        frame_selector = self.frame_selector
+        if frame_selector is not None:
+            defects = self.process_board_windows(frame_selector)
+            self.select_frame(frame_selector, frame)
+            self.draw_last_overlay(frame)
+        elif not self.block_when_full and not self.rate_controller.should_detect(captured_at, len(self.frame_buffer)):
+            defects = []
+            self.draw_last_overlay(frame)
+        elif self.is_idle(frame):
+            defects = []
+            self.idle_count += 1
+            self.draw_last_overlay(frame)
+        else:
+            try:
+                start = time.perf_counter()
+                defects = self.process_frame(frame, captured_at)
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                print(f"Error in detection ({self.name}): {str(e)}")
+                return
+            metrics.observe('detection', elapsed)
+            self.rate_controller.record(elapsed)
+            self.processed_count += 1
+            
+        if defects:
+            self.defects_detected.emit(defects)
+            
+        with self.display_lock:
+            show_frame = self.pending_display < self.max_pending_display
+            if show_frame:
+                self.pending_display += 1
+            else:
+                self.display_dropped_count += 1
+        if show_frame:
+            self.frame_processed.emit(frame, captured_at)
+            
+    def clamp_roi(self, frame):
+        roi = self.roi
+        if roi is None:
+            return None
+            
+        x1, y1, x2, y2 = roi
+        x1 = max(0, min(x1, frame.shape[1]))
+        y1 = max(0, min(y1, frame.shape[0]))
+        x2 = max(0, min(x2, frame.shape[1]))
+        y2 = max(0, min(y2, frame.shape[0]))
+        if x1 >= x2 or y1 >= y2:
+            return None
+        return x1, y1, x2, y2
+        
+    def is_idle(self, frame):
+        motion_gate = self.motion_gate
+        roi = self.clamp_roi(frame)
+        if motion_gate is None or roi is None:
+            return False
+        x1, y1, x2, y2 = roi
+        with metrics.time('motion_gate'):
+            return not motion_gate.should_detect(frame[y1:y2, x1:x2])
+            
+    def select_frame(self, frame_selector, frame):
+        roi = self.clamp_roi(frame)
+        if roi is None:
+            return
+        x1, y1, x2, y2 = roi
+        with metrics.time('frame_selection'):
+            frame_selector.add(frame, frame[y1:y2, x1:x2])
+            
+    def process_board_windows(self, frame_selector):
+        defects = []
+        engine = self.detection_engine
+        for frames in frame_selector.take_completed():
+            engine.reset_tracking()
+            engine.tracking_min_hits = min(engine.board_tracker.min_hits, len(frames))
+            try:
+                for frame in frames:
+                    start = time.perf_counter()
+                    defects.extend(self.process_frame(frame))
+                    metrics.observe('detection', time.perf_counter() - start)
+                    self.processed_count += 1
+            except Exception as e:
+                print(f"Error in detection ({self.name}): {str(e)}")
+            finally:
+                engine.tracking_min_hits = None
+        return defects
+        
+    def draw_last_overlay(self, frame):
+        lines = self.detection_engine.last_lines
+        roi = self.clamp_roi(frame)
+        if roi is None or lines is None or not self.detection_engine.overlay_enabled:
+            return
+        x1, y1, x2, y2 = roi
+        self.detection_engine.draw_overlay(frame[y1:y2, x1:x2], lines)
+        
+    def process_frame(self, frame, captured_at=None):
+        roi = self.clamp_roi(frame)
+        if roi is None:
+            return []
+            
+        x1, y1, x2, y2 = roi
+        roi_frame = frame[y1:y2, x1:x2]
+        processed_roi, defects = self.detection_engine.detect_and_draw_lines_with_angles(roi_frame)
+        frame[y1:y2, x1:x2] = processed_roi
+        
+        clip_path = None
+        clip_exporter = self.clip_exporter
+        if defects and clip_exporter is not None:
+            clip_path = clip_exporter.request(time.monotonic() if captured_at is None else captured_at)
+            
+        with metrics.time('db_log'):
+            for defect in defects:
+                self.database_manager.log_fault(
+                    fault_type="Board Alignment",
+                    image_index=self.source_index,
+                    details=defect['details'],
+                    measurement=defect['angle'],
+                    image_path=defect['image_path'],
+                    clip_path=clip_path
+                )
+        publisher = self.publisher
+        if publisher is not None:
+            for defect in defects:
+                publisher.publish(self.source_index, defect['angle'], defect.get('board_id'),
+                                  defect['details'], defect['image_path'])
+        return defects
+        
+    def close(self):
+        self.frame_buffer.close()
\ No newline at end of file
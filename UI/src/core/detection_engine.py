@@ -1,8 +1,12 @@
 import cv2
 import numpy as np
 import datetime
-import os
-import sqlite3
+import threading
+from src.config.detection_profile import ENGINE_FIELDS, validate_profile
+from src.core.board_tracker import BoardTracker, merge_segments
+from src.utils.database_manager import DatabaseManager
+from src.utils.image_writer import DefectImageWriter
+from src.utils.metrics import metrics
 
 class DetectionEngine:
     def __init__(self):
@@ -10,6 +14,26 @@ class DetectionEngine:
         self.tolerance = 5
         self.min_defect_angle = 80
         self.max_defect_angle = 100
+        self.blur_kernel = 5
+        self.canny_low = 50
+        self.canny_high = 150
+        self.hough_threshold = 100
+        self.min_line_length = 100
+        self.max_line_gap = 10
+        self.multiscale_enabled = False
+        self.pyramid_levels = 1
+        self.refine_margin = 3
+        self.board_tracking_enabled = True
+        self.board_tracker = BoardTracker()
+        self.tracking_reset_pending = False
+        self.tracking_min_hits = None
+        self.save_defect_images = True
+        self.overlay_enabled = True
+        self.settings_lock = threading.Lock()
+        self.image_writer = DefectImageWriter()
+        self.database_manager = None
+        self.last_lines = None
+        self.last_angles = []
         
     def set_detection_settings(self, standard_angle, tolerance, min_defect_angle, max_defect_angle):
         self.standard_angle = standard_angle
@@ -17,51 +41,224 @@ class DetectionEngine:
         self.min_defect_angle = min_defect_angle
         self.max_defect_angle = max_defect_angle
         
+    def set_board_tracking(self, enabled, board_width=None):
+        if enabled and not self.board_tracking_enabled:
+            self.reset_tracking()
+        self.board_tracking_enabled = enabled
+        if board_width is not None:
+            self.board_tracker.board_width = board_width
+            
+    def reset_tracking(self):
+        self.tracking_reset_pending = True
+        
+    def apply_profile(self, profile):
+        profile = validate_profile(profile)
+        with self.settings_lock:
+            for name in ENGINE_FIELDS:
+                setattr(self, name, profile[name])
+            self.set_board_tracking(profile['board_tracking'], profile['board_width'])
+            self.reset_tracking()
+        
+    def to_grayscale(self, frame):
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+    def blur(self, gray):
+        return cv2.GaussianBlur(gray, (self.blur_kernel, self.blur_kernel), 0)
+        
+    def detect_edges(self, blurred):
+        return cv2.Canny(blurred, self.canny_low, self.canny_high)
+        
+    def find_lines(self, edges, scale=1):
+        lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=max(10, int(self.hough_threshold / scale)),
+                                minLineLength=max(10, self.min_line_length / scale),
+                                maxLineGap=max(1, self.max_line_gap / scale))
+        if lines is None:
+            return np.empty((0, 4), dtype=np.int32)
+        return lines.reshape(-1, 4)
+        
+    def refine_line(self, gray, line, margin):
+        x1, y1, x2, y2 = (float(value) for value in line)
+        length = np.hypot(x2 - x1, y2 - y1)
+        if length < 2:
+            return line
+            
+        direction_x, direction_y = (x2 - x1) / length, (y2 - y1) / length
+        normal_x, normal_y = -direction_y, direction_x
+        band_to_frame = np.array([
+            [direction_x, normal_x, x1 - margin * normal_x],
+            [direction_y, normal_y, y1 - margin * normal_y]
+        ], dtype=np.float64)
+        band = cv2.warpAffine(gray, band_to_frame, (int(np.ceil(length)) + 1, 2 * margin + 1),
+                              flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE)
+        band = cv2.blur(band, (5, 1)).astype(np.int16)
+        gradient = np.abs(band[2:-1] - band[1:-2])
+        peaks = gradient.argmax(axis=0)
+        strength = gradient.max(axis=0)
+        valid = strength >= max(self.canny_low / 4, strength.max() / 2)
+        count = np.count_nonzero(valid)
+        if count < max(10, length * 0.25):
+            return line
+            
+        us = np.flatnonzero(valid).astype(np.float64)
+        vs = peaks[valid] + 1.5
+        u_mean = us.sum() / count
+        v_mean = vs.sum() / count
+        us -= u_mean
+        spread = us @ us
+        if spread == 0:
+            return line
+        slope = (us @ vs) / spread
+        offset = v_mean - slope * u_mean
+        ends = np.array([[0.0, offset, 1.0], [length, slope * length + offset, 1.0]]) @ band_to_frame.T
+        return (ends[0, 0], ends[0, 1], ends[1, 0], ends[1, 1])
+        
+    def detect_lines_multiscale(self, frame):
+        with metrics.time('grayscale'):
+            gray = self.to_grayscale(frame)
+        with metrics.time('pyramid'):
+            small = gray
+            for _ in range(self.pyramid_levels):
+                small = cv2.pyrDown(small)
+            scale = gray.shape[1] / small.shape[1]
+        with metrics.time('canny'):
+            edges = self.detect_edges(small)
+        with metrics.time('hough'):
+            candidates = self.find_lines(edges, scale)
+        if not len(candidates):
+            return np.empty((0, 4), dtype=np.float32)
+            
+        with metrics.time('refine'):
+            margin = self.refine_margin + int(np.ceil(scale))
+            return self.refine_lines(gray, candidates.astype(np.float64) * scale, margin)
+            
+    def refine_lines(self, gray, candidates, margin):
+        starts = candidates[:, :2]
+        ends = candidates[:, 2:]
+        directions = ends - starts
+        lengths = np.maximum(np.hypot(directions[:, 0], directions[:, 1]), 1e-6)
+        directions = directions / lengths[:, np.newaxis]
+        midpoints = (starts + ends) / 2
+        
+        parallel = np.abs(directions @ directions.T) > np.cos(np.radians(2.0))
+        offsets = midpoints[np.newaxis, :, :] - starts[:, np.newaxis, :]
+        distances = np.abs(offsets[:, :, 0] * directions[:, np.newaxis, 1] - offsets[:, :, 1] * directions[:, np.newaxis, 0])
+        same_edge = parallel & (distances <= margin)
+        
+        refined = np.empty_like(candidates, dtype=np.float32)
+        assigned = np.zeros(len(candidates), dtype=bool)
+        for index in np.argsort(-lengths):
+            if assigned[index]:
+                continue
+            members = np.flatnonzero(same_edge[index] & ~assigned)
+            assigned[members] = True
+            
+            origin = starts[index]
+            direction = directions[index]
+            positions = np.concatenate((starts[members] - origin, ends[members] - origin)) @ direction
+            span = (origin + positions.min() * direction, origin + positions.max() * direction)
+            x1, y1, x2, y2 = self.refine_line(gray, (*span[0], *span[1]), margin)
+            
+            fitted_origin = np.array([x1, y1])
+            fitted_direction = np.array([x2 - x1, y2 - y1])
+            fitted_direction /= max(np.hypot(*fitted_direction), 1e-6)
+            for member in members:
+                for column, point in ((0, starts[member]), (2, ends[member])):
+                    position = (point - fitted_origin) @ fitted_direction
+                    refined[member, column:column + 2] = fitted_origin + position * fitted_direction
+        return refined
+        
+    def detect_lines(self, frame):
+        if self.multiscale_enabled:
+            return self.detect_lines_multiscale(frame)
+        with metrics.time('grayscale'):
+            gray = self.to_grayscale(frame)
+        with metrics.time('blur'):
+            blurred = self.blur(gray)
+        with metrics.time('canny'):
+            edges = self.detect_edges(blurred)
+        with metrics.time('hough'):
+            return self.find_lines(edges)
+        
+    def score_lines(self, lines):
+        dx = (lines[:, 2] - lines[:, 0]).astype(np.float64)
+        dy = (lines[:, 3] - lines[:, 1]).astype(np.float64)
+        angles = np.abs(np.degrees(np.arctan2(dy, dx)))
+        angles = np.where(angles > 90, 180 - angles, angles)
+        deviations = np.abs(angles - self.standard_angle)
+        defect_mask = deviations > self.tolerance
+        return angles, deviations, defect_mask
+        
+    def draw_overlay(self, frame, lines):
+        if len(lines):
+            cv2.polylines(frame, np.round(lines).astype(np.int32).reshape(-1, 2, 2), False, (0, 255, 0), 2)
+        return frame
+        
     def detect_and_draw_lines_with_angles(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        edges = cv2.Canny(blurred, 50, 150)
-        lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=100, minLineLength=100, maxLineGap=10)
-
+        with self.settings_lock:
+            return self.detect_frame(frame)
+            
+    def measure_frame(self, frame):
+        lines = self.detect_lines(frame)
+        if self.board_tracking_enabled:
+            with metrics.time('merging'):
+                lines = merge_segments(lines)
+        with metrics.time('scoring'):
+            angles, deviations, defect_mask = self.score_lines(lines)
+        
+        self.last_lines = lines
+        self.last_angles = angles.tolist()
+        
+        if self.overlay_enabled:
+            with metrics.time('drawing'):
+                self.draw_overlay(frame, lines)
+        return lines, angles, deviations, defect_mask
+        
+    def find_defects(self, lines, angles, deviations, defect_mask):
+        if not self.board_tracking_enabled:
+            defect_indices = np.flatnonzero(defect_mask)
+            return defect_indices, [None] * len(defect_indices)
+        with metrics.time('tracking'):
+            if self.tracking_reset_pending:
+                self.tracking_reset_pending = False
+                self.board_tracker.reset()
+            events = self.board_tracker.update(lines, angles, deviations, defect_mask, self.tracking_min_hits)
+        return [index for index, _ in events], [track['board_id'] for _, track in events]
+        
+    def describe_defects(self, defect_indices, board_ids, angles, deviations, image_path):
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         defects = []
-        if lines is not None:
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                cv2.line(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                
-                angle = np.abs(np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi)
-                if angle > 90:
-                    angle = 180 - angle
-                
-                if abs(angle - self.standard_angle) > self.tolerance:
-                    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    image_path = self.save_defect_frame(frame.copy(), timestamp)
-                    
-                    defect_info = {
-                        'timestamp': timestamp,
-                        'angle': angle,
-                        'image_path': image_path,
-                        'details': f"Board angle {angle:.1f}° deviates from standard {self.standard_angle}° by {abs(angle - self.standard_angle):.1f}°"
-                    }
-                    defects.append(defect_info)
-
-        return frame, defects
+        for index, board_id in zip(defect_indices, board_ids):
+            angle = float(angles[index])
+            deviation = float(deviations[index])
+            board = "Board" if board_id is None else f"Board {board_id}"
+            defects.append({
+                'timestamp': timestamp,
+                'angle': angle,
+                'image_path': image_path,
+                'board_id': board_id,
+                'details': f"{board} angle {angle:.1f}° deviates from standard {self.standard_angle}° by {deviation:.1f}°"
+            })
+        return defects
         
-    def save_defect_frame(self, frame, timestamp):
-        if not os.path.exists("defect_images"):
-            os.makedirs("defect_images")
-
-        filename = f"defect_images/defect_{timestamp.replace(':', '-')}.png"
-        cv2.imwrite(filename, frame)
-        return filename
-        
-    def log_fault_to_database(self, fault_type, image_index, details, measurement=None):
-        conn = sqlite3.connect('faults.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO faults (timestamp, fault_type, image_index, details, measurement)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 
-              fault_type, image_index, details, measurement))
-        conn.commit()
-        conn.close() 
\ No newline at end of file
+    def save_annotated_frame(self, frame, lines):
+        defect_frame = frame.copy()
+        if not self.overlay_enabled:
+            self.draw_overlay(defect_frame, lines)
+        return self.save_defect_frame(defect_frame)
+        
+    def detect_frame(self, frame):
+        lines, angles, deviations, defect_mask = self.measure_frame(frame)
+        defect_indices, board_ids = self.find_defects(lines, angles, deviations, defect_mask)
+        if not len(defect_indices):
+            return frame, []
+        image_path = self.save_annotated_frame(frame, lines) if self.save_defect_images else None
+        return frame, self.describe_defects(defect_indices, board_ids, angles, deviations, image_path)
+        
+    def save_defect_frame(self, frame):
+        with metrics.time('image_submit'):
+            return self.image_writer.submit(frame)
+        
+    def log_fault_to_database(self, fault_type, image_index, details, measurement=None, image_path=None):
+        if self.database_manager is None:
+            self.database_manager = DatabaseManager()
+        self.database_manager.log_fault(fault_type, image_index, details, measurement, image_path)
\ No newline at end of file
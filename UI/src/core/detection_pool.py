@@ -0,0 +1,97 @@
+import os
+import threading
+import cv2
+
+def available_cores():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+class DetectionPool:
+    def __init__(self, worker_count=None):
+        self.cores = available_cores()
+        self.worker_count = worker_count or max(1, self.cores - 1)
+        self.channels = []
+        self.next_index = 0
+        self.condition = threading.Condition()
+        self.workers = []
+        self.running = False
+        
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        for index in range(self.worker_count):
+            worker = threading.Thread(target=self.run_worker, name=f"detection-worker-{index}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+            
+    def add_channel(self, channel):
+        with self.condition:
+            channel.pool = self
+            self.channels.append(channel)
+        self.update_thread_budget()
+        self.start()
+        
+    def remove_channel(self, channel):
+        channel.close()
+        with self.condition:
+            if channel in self.channels:
+                self.channels.remove(channel)
+            while channel.busy:
+                self.condition.wait()
+            channel.pool = None
+        self.update_thread_budget()
+        
+    def update_thread_budget(self):
+        cv2.setNumThreads(max(1, self.cores // max(1, len(self.channels))))
+        
+    def notify(self):
+        with self.condition:
+            self.condition.notify()
+            
+    def next_ready_channel(self):
+        count = len(self.channels)
+        for offset in range(count):
+            index = (self.next_index + offset) % count
+            channel = self.channels[index]
+            if not channel.busy and len(channel.frame_buffer):
+                channel.busy = True
+                self.next_index = index + 1
+                return channel
+        return None
+        
+    def run_worker(self):
+        while True:
+            with self.condition:
+                channel = self.next_ready_channel()
+                while channel is None and self.running:
+                    self.condition.wait(0.1)
+                    channel = self.next_ready_channel()
+                if channel is None:
+                    return
+            try:
+                channel.process_next()
+            except Exception as e:
+                print(f"Error in detection worker: {str(e)}")
+            finally:
+                with self.condition:
+                    channel.busy = False
+                    self.condition.notify_all()
+                    
+    def get_stats(self):
+        with self.condition:
+            channels = list(self.channels)
+        return {channel.name: channel.get_stats() for channel in channels}
+        
+    def stop(self):
+        with self.condition:
+            channels = list(self.channels)
+        for channel in channels:
+            self.remove_channel(channel)
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+        self.workers = []
\ No newline at end of file
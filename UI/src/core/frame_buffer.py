@@ -0,0 +1,79 @@
+import collections
+import threading
+import time
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+class FrameBuffer:
+    def __init__(self, capacity=4, drop_policy=DROP_OLDEST):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.capacity = max(1, int(capacity))
+        self.drop_policy = drop_policy
+        self.frames = collections.deque()
+        self.condition = threading.Condition()
+        self.dropped_count = 0
+        self.closed = False
+        
+    def wait_for_space(self):
+        with self.condition:
+            while len(self.frames) >= self.capacity and not self.closed:
+                self.condition.wait(0.1)
+            return not self.closed
+            
+    def put(self, frame, timestamp=None, block=False):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self.condition:
+            if block:
+                while len(self.frames) >= self.capacity and not self.closed:
+                    self.condition.wait(0.1)
+            if self.closed:
+                return False
+            if len(self.frames) >= self.capacity:
+                self.dropped_count += 1
+                if self.drop_policy == DROP_NEWEST:
+                    return False
+                self.frames.popleft()
+            self.frames.append((frame, timestamp))
+            self.condition.notify()
+            return True
+            
+    def get(self, timeout=None):
+        with self.condition:
+            if not self.frames and not self.closed:
+                self.condition.wait(timeout)
+            if not self.frames:
+                return None
+            item = self.frames.popleft()
+            self.condition.notify_all()
+            return item
+            
+    def set_capacity(self, capacity):
+        with self.condition:
+            self.capacity = max(1, int(capacity))
+            while len(self.frames) > self.capacity:
+                self.frames.popleft()
+                self.dropped_count += 1
+                
+    def set_drop_policy(self, drop_policy):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        with self.condition:
+            self.drop_policy = drop_policy
+            
+    def clear(self):
+        with self.condition:
+            self.frames.clear()
+            
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.frames.clear()
+            self.condition.notify_all()
+            
+    def __len__(self):
+        with self.condition:
+            return len(self.frames)
\ No newline at end of file
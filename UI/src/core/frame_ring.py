@@ -0,0 +1,90 @@
+import threading
+import numpy as np
+
+class FrameRingBuffer:
+    def __init__(self, seconds=5.0, fps=30, max_bytes=512 * 1024 * 1024, source_clock=False):
+        self.seconds = seconds
+        self.fps = fps
+        self.max_bytes = max_bytes
+        self.source_clock = source_clock
+        self.max_frames = max(2, int(round(seconds * fps)))
+        self.capacity = self.max_frames
+        self.lock = threading.Lock()
+        self.frames = None
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.positions = np.zeros(self.capacity, dtype=np.float64)
+        self.next_sequence = 0
+        self.reallocation_count = 0
+        
+    def allocate(self, shape, dtype):
+        frame_bytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        self.capacity = max(2, min(self.max_frames, self.max_bytes // frame_bytes))
+        self.frames = np.empty((self.capacity,) + shape, dtype=dtype)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.positions = np.zeros(self.capacity, dtype=np.float64)
+        self.next_sequence = 0
+        self.reallocation_count += 1
+        
+    def push(self, frame, timestamp):
+        with self.lock:
+            if self.frames is None or self.frames.shape[1:] != frame.shape or self.frames.dtype != frame.dtype:
+                self.allocate(frame.shape, frame.dtype)
+            slot = self.next_sequence % self.capacity
+            np.copyto(self.frames[slot], frame)
+            self.timestamps[slot] = timestamp
+            self.positions[slot] = self.next_sequence / self.fps if self.source_clock else timestamp
+            self.next_sequence += 1
+            
+    def oldest_sequence(self):
+        return max(0, self.next_sequence - self.capacity)
+        
+    def latest_position(self):
+        with self.lock:
+            if not self.next_sequence:
+                return None
+            return float(self.positions[(self.next_sequence - 1) % self.capacity])
+            
+    def position_at(self, timestamp):
+        with self.lock:
+            for sequence in range(self.oldest_sequence(), self.next_sequence):
+                if self.timestamps[sequence % self.capacity] >= timestamp:
+                    return float(self.positions[sequence % self.capacity])
+            return None
+            
+    def find_sequence(self, position):
+        with self.lock:
+            for sequence in range(self.oldest_sequence(), self.next_sequence):
+                if self.positions[sequence % self.capacity] >= position:
+                    return sequence
+            return self.next_sequence
+            
+    def read(self, sequence, out):
+        with self.lock:
+            if self.frames is None or not self.oldest_sequence() <= sequence < self.next_sequence:
+                return None
+            if out.shape != self.frames.shape[1:]:
+                return None
+            slot = sequence % self.capacity
+            np.copyto(out, self.frames[slot])
+            return float(self.positions[slot])
+            
+    def measured_fps(self, start, end):
+        if self.source_clock:
+            return self.fps
+        with self.lock:
+            stamps = [self.positions[sequence % self.capacity]
+                      for sequence in range(self.oldest_sequence(), self.next_sequence)
+                      if start <= self.positions[sequence % self.capacity] <= end]
+        if len(stamps) < 2 or stamps[-1] <= stamps[0]:
+            return self.fps
+        return (len(stamps) - 1) / (stamps[-1] - stamps[0])
+        
+    def frame_shape(self):
+        with self.lock:
+            if self.frames is None:
+                return None
+            return self.frames.shape[1:], self.frames.dtype
+            
+    def memory_bytes(self):
+        frames = self.frames
+        return 0 if frames is None else frames.nbytes
\ No newline at end of file
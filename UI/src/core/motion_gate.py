@@ -0,0 +1,65 @@
+import cv2
+import numpy as np
+
+class MotionGate:
+    def __init__(self, sensitivity=1.0, hold_frames=15, pixel_threshold=25, sample_width=96):
+        self.sensitivity = sensitivity
+        self.hold_frames = hold_frames
+        self.pixel_threshold = pixel_threshold
+        self.sample_width = sample_width
+        self.previous = None
+        self.active = True
+        self.quiet_frames = 0
+        self.last_score = 0.0
+        self.passed_count = 0
+        self.gated_count = 0
+        
+    def reset(self):
+        self.previous = None
+        self.active = True
+        self.quiet_frames = 0
+        
+    def sample(self, frame):
+        height, width = frame.shape[:2]
+        sample_height = max(1, int(round(height * self.sample_width / max(1, width))))
+        small = cv2.resize(frame, (self.sample_width, sample_height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+        
+    def change_score(self, frame):
+        current = self.sample(frame)
+        previous = self.previous
+        self.previous = current
+        if previous is None or previous.shape != current.shape:
+            return 100.0
+        changed = cv2.absdiff(current, previous) > self.pixel_threshold
+        return 100.0 * np.count_nonzero(changed) / changed.size
+        
+    def should_detect(self, frame):
+        score = self.change_score(frame)
+        self.last_score = score
+        if score >= self.sensitivity:
+            self.active = True
+            self.quiet_frames = 0
+        elif self.active:
+            if score < self.sensitivity / 2:
+                self.quiet_frames += 1
+            else:
+                self.quiet_frames = 0
+            if self.quiet_frames > self.hold_frames:
+                self.active = False
+                
+        if self.active:
+            self.passed_count += 1
+        else:
+            self.gated_count += 1
+        return self.active
+        
+    def get_stats(self):
+        return {
+            'passed': self.passed_count,
+            'gated': self.gated_count,
+            'score': self.last_score,
+            'active': self.active
+        }
\ No newline at end of file
@@ -0,0 +1,256 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from src.config.detection_profile import default_profile, load_profile, save_profile, validate_profile
+from src.core.detection_engine import DetectionEngine
+
+SWEEP_FIELDS = ('multiscale_enabled', 'blur_kernel', 'pyramid_levels', 'canny_low', 'canny_high', 'hough_threshold',
+                'min_line_length', 'max_line_gap')
+DEFAULT_GRID = {
+    'multiscale_enabled': [False, True],
+    'blur_kernel': [3, 5, 7],
+    'pyramid_levels': [1, 2],
+    'canny_low': [30, 50],
+    'canny_high': [100, 150],
+    'hough_threshold': [50, 100],
+    'min_line_length': [100, 200]
+}
+OBJECTIVES = ('angle_error', 'false_defects', 'missed_defects', 'ms_per_frame')
+
+_worker_frames = None
+
+def load_dataset(dataset_dir, roi=None, limit=None):
+    with open(os.path.join(dataset_dir, "labels.json"), "r") as file:
+        labels = json.load(file)['frames']
+    if limit:
+        labels = labels[:limit]
+    frames = []
+    for label in labels:
+        frame = cv2.imread(os.path.join(dataset_dir, label['file']))
+        if frame is None:
+            raise RuntimeError(f"Failed to read labelled frame: {label['file']}")
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            frame = frame[y1:y2, x1:x2]
+        frames.append((np.ascontiguousarray(frame), [float(angle) for angle in label['board_angles']]))
+    return frames
+
+def _init_worker(dataset_dir, roi, limit):
+    global _worker_frames
+    cv2.setNumThreads(1)
+    _worker_frames = load_dataset(dataset_dir, roi, limit)
+
+def expand_grid(base_profile, grid):
+    names = sorted(grid)
+    profiles = []
+    seen = set()
+    for values in itertools.product(*(grid[name] for name in names)):
+        profile = dict(base_profile)
+        profile.update(zip(names, values))
+        if profile['multiscale_enabled']:
+            profile['blur_kernel'] = base_profile['blur_kernel']
+        else:
+            profile['pyramid_levels'] = base_profile['pyramid_levels']
+        profile['roi'] = None
+        key = tuple(profile[name] for name in SWEEP_FIELDS)
+        if key in seen:
+            continue
+        try:
+            profiles.append(validate_profile(profile))
+        except ValueError:
+            continue
+        seen.add(key)
+    return profiles
+
+def match_count(angles, targets, tolerance):
+    return sum(1 for angle in angles if any(abs(angle - target) <= tolerance for target in targets))
+
+def evaluate_profile(profile, match_tolerance=2.0, max_angle_error=10.0, warmup=2):
+    engine = DetectionEngine()
+    engine.apply_profile(profile)
+    engine.overlay_enabled = False
+    engine.save_defect_images = False
+    tracking = engine.board_tracking_enabled
+    
+    timings = []
+    angle_errors = []
+    false_defects = 0
+    missed_defects = 0
+    labelled_defects = 0
+    timer = time.perf_counter
+    for index, (source, board_angles) in enumerate(_worker_frames):
+        if tracking:
+            engine.reset_tracking()
+            engine.tracking_min_hits = 1
+        frame = source.copy()
+        start = timer()
+        _, defects = engine.detect_and_draw_lines_with_angles(frame)
+        elapsed = timer() - start
+        if index >= warmup or len(_worker_frames) <= warmup:
+            timings.append(elapsed)
+            
+        detected = np.asarray(engine.last_angles, dtype=np.float64)
+        for angle in board_angles:
+            error = float(np.abs(detected - angle).min()) if detected.size else max_angle_error
+            angle_errors.append(min(error, max_angle_error))
+            
+        expected = [angle for angle in board_angles if abs(angle - profile['standard_angle']) > profile['tolerance']]
+        found = [defect['angle'] for defect in defects]
+        false_defects += len(found) - match_count(found, expected, match_tolerance)
+        missed_defects += len(expected) - match_count(expected, found, match_tolerance)
+        labelled_defects += len(expected)
+        
+    frame_count = len(_worker_frames)
+    timings = np.asarray(timings, dtype=np.float64) * 1000.0
+    return {
+        'profile': profile,
+        'angle_error': float(np.mean(angle_errors)) if angle_errors else max_angle_error,
+        'false_defects': false_defects / frame_count if frame_count else 0.0,
+        'missed_defects': missed_defects / labelled_defects if labelled_defects else 0.0,
+        'ms_per_frame': float(timings.mean()) if timings.size else 0.0,
+        'p99_ms': float(np.percentile(timings, 99)) if timings.size else 0.0
+    }
+
+def dominates(first, second):
+    return (all(first[name] <= second[name] for name in OBJECTIVES) and
+            any(first[name] < second[name] for name in OBJECTIVES))
+
+def pareto_front(results):
+    front = [result for result in results
+             if not any(dominates(other, result) for other in results if other is not result)]
+    return sorted(front, key=lambda result: result['ms_per_frame'])
+
+def choose_winner(results, max_angle_error=1.0, max_false_defects=0.1, max_missed_defects=0.05):
+    accurate = [result for result in results
+                if result['angle_error'] <= max_angle_error and
+                result['false_defects'] <= max_false_defects and
+                result['missed_defects'] <= max_missed_defects]
+    if accurate:
+        return min(accurate, key=lambda result: (result['ms_per_frame'], result['angle_error'],
+                                                 result['false_defects'], result['missed_defects'])), True
+    if not results:
+        return None, False
+    return min(results, key=lambda result: (result['missed_defects'], result['false_defects'],
+                                          result['angle_error'], result['ms_per_frame'])), False
+
+def run_sweep(dataset_dir, profiles, workers=None, roi=None, limit=None, match_tolerance=2.0, progress=None):
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dataset_dir, roi, limit)) as executor:
+        futures = [executor.submit(evaluate_profile, profile, match_tolerance) for profile in profiles]
+        for future in futures:
+            results.append(future.result())
+            if progress is not None:
+                progress(len(results), len(profiles))
+    return results
+
+def describe_profile(profile):
+    if profile['multiscale_enabled']:
+        names = [name for name in SWEEP_FIELDS if name not in ('multiscale_enabled', 'blur_kernel')]
+        return "multiscale " + " ".join(f"{name}={profile[name]}" for name in names)
+    names = [name for name in SWEEP_FIELDS if name not in ('multiscale_enabled', 'pyramid_levels')]
+    return "full-res " + " ".join(f"{name}={profile[name]}" for name in names)
+
+def format_front(front, winner=None):
+    lines = [f"  {'ms/frame':>9} {'p99 ms':>8} {'angle err':>10} {'false/frame':>12} {'missed':>8}  parameters"]
+    for result in front:
+        marker = "*" if result is winner else " "
+        lines.append(f"{marker} {result['ms_per_frame']:>9.2f} {result['p99_ms']:>8.2f} "
+                     f"{result['angle_error']:>10.3f} {result['false_defects']:>12.3f} "
+                     f"{result['missed_defects']:>8.1%}  {describe_profile(result['profile'])}")
+    return "\n".join(lines)
+
+def parse_grid_item(value):
+    try:
+        name, values = value.split('=', 1)
+        values = [int(part) for part in values.split(',') if part]
+        if name == 'multiscale_enabled':
+            values = [bool(part) for part in values]
+    except ValueError:
+        raise argparse.ArgumentTypeError("Grid entries must look like name=v1,v2,...")
+    if name not in SWEEP_FIELDS:
+        raise argparse.ArgumentTypeError(f"Unknown sweep parameter {name} (choose from {', '.join(SWEEP_FIELDS)})")
+    if not values:
+        raise argparse.ArgumentTypeError(f"No values given for {name}")
+    return name, values
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Sweep detection parameters over a labelled frame set and report "
+                                                 "the accuracy/runtime Pareto front.")
+    parser.add_argument('dataset', help="Directory with labels.json and frames (see benchmark.py --save-frames)")
+    parser.add_argument('--template', metavar='JSON', help="Template supplying the fixed settings (angles, ROI)")
+    parser.add_argument('--grid', type=parse_grid_item, action='append', metavar='NAME=V1,V2',
+                        help="Values to sweep for one parameter; repeat per parameter (replaces the default grid). "
+                             "multiscale_enabled takes 0/1; blur_kernel only applies with it off and "
+                             "pyramid_levels only with it on")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument('--limit', type=int, help="Only use the first LIMIT labelled frames")
+    parser.add_argument('--match-tolerance', type=float, default=2.0,
+                        help="Degrees within which a detected defect matches a labelled one")
+    parser.add_argument('--max-angle-error', type=float, default=1.0,
+                        help="Highest mean angle error (degrees) for a configuration to count as accurate")
+    parser.add_argument('--max-false-defects', type=float, default=0.1,
+                        help="Highest false defects per frame for a configuration to count as accurate")
+    parser.add_argument('--max-missed', type=float, default=0.05,
+                        help="Highest fraction of labelled defects missed for a configuration to count as accurate")
+    parser.add_argument('--json', help="Write every configuration's results to this JSON file")
+    parser.add_argument('--export', metavar='JSON', help="Save the winning configuration as a template")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    base_profile = default_profile()
+    if args.template:
+        try:
+            base_profile = load_profile(args.template)
+        except (OSError, ValueError) as e:
+            print(f"Error loading template {args.template}: {str(e)}")
+            return 1
+    grid = dict(args.grid) if args.grid else dict(DEFAULT_GRID)
+    profiles = expand_grid(base_profile, grid)
+    if not profiles:
+        print("No valid configurations in the grid")
+        return 1
+        
+    def progress(done, total):
+        print(f"\rEvaluated {done}/{total} configurations", end="", file=sys.stderr, flush=True)
+        
+    start = time.perf_counter()
+    try:
+        results = run_sweep(args.dataset, profiles, args.workers, base_profile['roi'], args.limit,
+                            args.match_tolerance, progress)
+    except (OSError, RuntimeError, KeyError, ValueError) as e:
+        print(f"\nError running parameter sweep: {str(e)}")
+        return 1
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    
+    front = pareto_front(results)
+    winner, accurate = choose_winner(results, args.max_angle_error, args.max_false_defects, args.max_missed)
+    print(f"Swept {len(results)} configurations in {elapsed:.1f}s; Pareto front ({len(front)}):")
+    print(format_front(front, winner))
+    if not accurate:
+        print("No configuration met the accuracy targets; * marks the most accurate one")
+        
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({'results': results, 'front': [results.index(result) for result in front]}, file, indent=2)
+    if args.export and winner is not None:
+        profile = dict(winner['profile'])
+        profile['roi'] = base_profile['roi']
+        try:
+            save_profile(args.export, profile)
+        except (OSError, ValueError) as e:
+            print(f"Error exporting template: {str(e)}")
+            return 1
+        print(f"Exported winning configuration to {args.export}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,51 @@
+import threading
+import time
+
+class DetectionRateController:
+    def __init__(self, target_rate=0.0, latency_budget=0.25, smoothing=0.2):
+        self.target_rate = target_rate
+        self.latency_budget = latency_budget
+        self.smoothing = smoothing
+        self.detection_time = 0.0
+        self.last_detection_time = None
+        self.analysed_count = 0
+        self.skipped_rate_count = 0
+        self.skipped_latency_count = 0
+        self.lock = threading.Lock()
+        
+    def configure(self, target_rate, latency_budget):
+        with self.lock:
+            self.target_rate = target_rate
+            self.latency_budget = latency_budget
+            
+    def should_detect(self, captured_at, frames_waiting=0, now=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            if (frames_waiting and self.latency_budget
+                    and (now - captured_at) + self.detection_time > self.latency_budget):
+                self.skipped_latency_count += 1
+                return False
+            if self.target_rate and self.last_detection_time is not None:
+                if now - self.last_detection_time < 1.0 / self.target_rate:
+                    self.skipped_rate_count += 1
+                    return False
+            self.last_detection_time = now
+            return True
+            
+    def record(self, elapsed):
+        with self.lock:
+            self.analysed_count += 1
+            if self.detection_time:
+                self.detection_time += self.smoothing * (elapsed - self.detection_time)
+            else:
+                self.detection_time = elapsed
+                
+    def get_stats(self):
+        with self.lock:
+            return {
+                'analysed': self.analysed_count,
+                'skipped': self.skipped_rate_count + self.skipped_latency_count,
+                'skipped_rate': self.skipped_rate_count,
+                'skipped_latency': self.skipped_latency_count,
+                'detection_ms': self.detection_time * 1000.0
+            }
\ No newline at end of file
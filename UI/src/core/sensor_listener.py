@@ -0,0 +1,134 @@
+import socket
+import time
+from PySide6.QtCore import QThread, Signal
+from src.utils.metrics import metrics
+
+HIGH_VALUES = ('1', 'high', 'on', 'true')
+LOW_VALUES = ('0', 'low', 'off', 'false')
+
+def parse_signal_line(line):
+    parts = line.replace(',', ' ').split()
+    if not parts:
+        return None
+    value = parts[0].lower()
+    if value in HIGH_VALUES:
+        level = True
+    elif value in LOW_VALUES:
+        level = False
+    else:
+        return None
+    sent_at = None
+    if len(parts) > 1:
+        try:
+            sent_at = float(parts[1])
+        except ValueError:
+            pass
+    return level, sent_at
+
+class SignalCounter:
+    def __init__(self, low_signal_duration=1.0):
+        self.low_signal_duration = low_signal_duration
+        self.level = False
+        self.low_since = None
+        self.board_count = 0
+        self.pallet_count = 0
+        
+    def feed(self, level, now):
+        events = []
+        if level and not self.level:
+            self.board_count += 1
+            self.low_since = None
+            events.append(('board', self.board_count))
+        elif not level and self.level:
+            self.low_since = now
+            events.append(('board_end', self.board_count))
+        elif not level and self.low_since is None:
+            self.low_since = now
+        self.level = level
+        events.extend(self.check(now))
+        return events
+        
+    def check(self, now):
+        if self.level or self.low_since is None or not self.board_count:
+            return []
+        if now - self.low_since < self.low_signal_duration:
+            return []
+        boards = self.board_count
+        self.board_count = 0
+        self.pallet_count += 1
+        return [('pallet', boards)]
+
+class SensorListener(QThread):
+    board_detected = Signal(int, float)
+    board_cleared = Signal(int, float)
+    pallet_completed = Signal(int, int, float)
+    connection_changed = Signal(bool, str)
+    error_occurred = Signal(str)
+    
+    def __init__(self, host, port, low_signal_duration=1.0, reconnect_interval=2.0, poll_interval=0.02):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.counter = SignalCounter(low_signal_duration)
+        self.reconnect_interval = reconnect_interval
+        self.poll_interval = poll_interval
+        self.running = False
+        self.event_count = 0
+        
+    def set_low_signal_duration(self, duration):
+        self.counter.low_signal_duration = duration
+        
+    def run(self):
+        self.running = True
+        while self.running:
+            try:
+                with socket.create_connection((self.host, self.port), timeout=self.reconnect_interval) as connection:
+                    connection.settimeout(self.poll_interval)
+                    self.connection_changed.emit(True, f"{self.host}:{self.port}")
+                    self.listen(connection)
+            except OSError as e:
+                if self.running:
+                    self.error_occurred.emit(f"Sensor connection to {self.host}:{self.port} failed: {str(e)}")
+            if self.running:
+                self.connection_changed.emit(False, f"{self.host}:{self.port}")
+                deadline = time.monotonic() + self.reconnect_interval
+                while self.running and time.monotonic() < deadline:
+                    self.msleep(50)
+                    
+    def listen(self, connection):
+        pending = b''
+        while self.running:
+            try:
+                data = connection.recv(4096)
+            except socket.timeout:
+                self.dispatch(self.counter.check(time.monotonic()), time.perf_counter())
+                continue
+            if not data:
+                return
+                
+            received_at = time.perf_counter()
+            now = time.monotonic()
+            lines = (pending + data).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                parsed = parse_signal_line(line.decode('ascii', errors='ignore'))
+                if parsed is None:
+                    continue
+                level, sent_at = parsed
+                if sent_at is not None:
+                    metrics.observe('sensor_transport', max(0.0, time.time() - sent_at))
+                self.dispatch(self.counter.feed(level, now), received_at)
+                
+    def dispatch(self, events, received_at):
+        for kind, count in events:
+            self.event_count += 1
+            if kind == 'board':
+                self.board_detected.emit(count, received_at)
+            elif kind == 'board_end':
+                self.board_cleared.emit(count, received_at)
+            else:
+                self.pallet_completed.emit(self.counter.pallet_count, count, received_at)
+                
+    def stop(self):
+        self.running = False
+        self.wait()
\ No newline at end of file
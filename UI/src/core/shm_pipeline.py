@@ -0,0 +1,375 @@
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+from src.config.detection_profile import profile_from_engine
+from src.core.motion_gate import MotionGate
+from src.core.rate_controller import DetectionRateController
+from src.utils.metrics import metrics
+
+CAPTURED = 0
+CAPTURE_DROPPED = 1
+PROCESSED = 2
+DEFECTS = 3
+SKIPPED = 4
+IDLE = 5
+IMAGES_WRITTEN = 6
+IMAGES_DROPPED = 7
+IMAGE_QUEUE_DEPTH = 8
+COUNTER_COUNT = 9
+
+def clamp_roi(roi, shape):
+    if roi is None:
+        return None
+    x1, y1, x2, y2 = roi
+    x1 = max(0, min(x1, shape[1]))
+    y1 = max(0, min(y1, shape[0]))
+    x2 = max(0, min(x2, shape[1]))
+    y2 = max(0, min(y2, shape[0]))
+    if x1 >= x2 or y1 >= y2:
+        return None
+    return x1, y1, x2, y2
+
+class SharedFrameSlots:
+    def __init__(self, shape, slot_count=8, name=None):
+        self.shape = tuple(shape)
+        self.slot_count = slot_count
+        size = int(np.prod(self.shape)) * slot_count
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.frames = np.ndarray((slot_count,) + self.shape, dtype=np.uint8, buffer=self.memory.buf)
+        
+    @property
+    def name(self):
+        return self.memory.name
+        
+    def close(self):
+        self.frames = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+def capture_worker(slots_name, shape, slot_count, video_file, camera_index, camera_settings, paced,
+                   free_slots, detect_slots, stop_event, counters):
+    cv2.setNumThreads(1)
+    slots = SharedFrameSlots(shape, slot_count, slots_name)
+    cap = cv2.VideoCapture(video_file if video_file is not None else int(camera_index))
+    try:
+        if camera_index is not None and camera_settings is not None:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, camera_settings['resolution'][0])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, camera_settings['resolution'][1])
+            cap.set(cv2.CAP_PROP_FPS, camera_settings['fps'])
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        height, width = shape[:2]
+        anchor = time.perf_counter()
+        frame_index = 0
+        while not stop_event.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if paced:
+                delay = anchor + frame_index / fps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            frame_index += 1
+            captured_at = time.monotonic()
+            
+            slot = None
+            while slot is None and not stop_event.is_set():
+                try:
+                    slot = free_slots.get(timeout=0.1)
+                except queue.Empty:
+                    if video_file is None:
+                        break
+            if slot is None:
+                with counters.get_lock():
+                    counters[CAPTURE_DROPPED] += 1
+                continue
+                
+            if frame.shape[:2] != (height, width):
+                cv2.resize(frame, (width, height), dst=slots.frames[slot], interpolation=cv2.INTER_AREA)
+            else:
+                np.copyto(slots.frames[slot], frame)
+            with counters.get_lock():
+                counters[CAPTURED] += 1
+            detect_slots.put((slot, captured_at))
+    finally:
+        cap.release()
+        slots.close()
+        detect_slots.put(None)
+
+def publish_image_stats(image_writer, counters):
+    image_stats = image_writer.get_stats()
+    with counters.get_lock():
+        counters[IMAGES_WRITTEN] = image_stats['written']
+        counters[IMAGES_DROPPED] = image_stats['dropped']
+        counters[IMAGE_QUEUE_DEPTH] = image_stats['queue_depth']
+
+def create_motion_gate(pipeline_settings):
+    if not pipeline_settings['motion_gate']:
+        return None
+    return MotionGate(pipeline_settings['motion_sensitivity'], pipeline_settings['motion_hold_frames'])
+
+def detect_worker(slots_name, shape, slot_count, settings, pipeline_settings, roi, db_path, source_index,
+                  detect_slots, display_slots, control, stop_event, counters):
+    cv2.setNumThreads(1)
+    from src.core.detection_engine import DetectionEngine
+    from src.utils.database_manager import DatabaseManager
+    slots = SharedFrameSlots(shape, slot_count, slots_name)
+    database_manager = DatabaseManager(db_path)
+    engine = DetectionEngine()
+    engine.database_manager = database_manager
+    engine.image_writer.name_prefix = f"defect_cam{source_index}_{multiprocessing.current_process().pid}"
+    engine.apply_profile(settings)
+    rate_controller = DetectionRateController(pipeline_settings['target_rate'],
+                                              pipeline_settings['latency_budget_ms'] / 1000.0)
+    motion_gate = create_motion_gate(pipeline_settings)
+    try:
+        while not stop_event.is_set():
+            try:
+                while True:
+                    command, value = control.get_nowait()
+                    if command == 'roi':
+                        roi = value
+                        engine.reset_tracking()
+                        if motion_gate is not None:
+                            motion_gate.reset()
+                    elif command == 'settings':
+                        engine.apply_profile(value)
+                    elif command == 'pipeline':
+                        rate_controller.configure(value['target_rate'], value['latency_budget_ms'] / 1000.0)
+                        motion_gate = create_motion_gate(value)
+            except queue.Empty:
+                pass
+                
+            try:
+                item = detect_slots.get(timeout=0.1)
+            except queue.Empty:
+                publish_image_stats(engine.image_writer, counters)
+                continue
+            if item is None:
+                detect_slots.put(None)
+                break
+            slot, captured_at = item
+            
+            defects = []
+            elapsed = None
+            outcome = PROCESSED
+            region = clamp_roi(roi, shape)
+            if region is not None:
+                x1, y1, x2, y2 = region
+                frame = slots.frames[slot]
+                with counters.get_lock():
+                    waiting = counters[CAPTURED] - counters[PROCESSED] - counters[SKIPPED] - counters[IDLE] - 1
+                if not rate_controller.should_detect(captured_at, max(0, waiting)):
+                    outcome = SKIPPED
+                elif motion_gate is not None and not motion_gate.should_detect(frame[y1:y2, x1:x2]):
+                    outcome = IDLE
+                else:
+                    start = time.perf_counter()
+                    try:
+                        processed_roi, defects = engine.detect_and_draw_lines_with_angles(frame[y1:y2, x1:x2])
+                        frame[y1:y2, x1:x2] = processed_roi
+                    except Exception as e:
+                        print(f"Error in detection ({multiprocessing.current_process().name}): {str(e)}")
+                    elapsed = time.perf_counter() - start
+                    rate_controller.record(elapsed)
+                if outcome != PROCESSED and engine.last_lines is not None and engine.overlay_enabled:
+                    engine.draw_overlay(frame[y1:y2, x1:x2], engine.last_lines)
+                for defect in defects:
+                    database_manager.log_fault(
+                        fault_type="Board Alignment",
+                        image_index=source_index,
+                        details=defect['details'],
+                        measurement=defect['angle'],
+                        image_path=defect['image_path']
+                    )
+            with counters.get_lock():
+                counters[outcome] += 1
+                counters[DEFECTS] += len(defects)
+            publish_image_stats(engine.image_writer, counters)
+            display_slots.put((slot, captured_at, elapsed, defects))
+    finally:
+        engine.image_writer.stop()
+        publish_image_stats(engine.image_writer, counters)
+        database_manager.close()
+        slots.close()
+
+class SharedMemoryPipeline(QThread):
+    frame_processed = Signal(np.ndarray, float)
+    defects_detected = Signal(list)
+    
+    def __init__(self, name, engine, shape, video_file=None, camera_index=None, camera_settings=None,
+                 paced=True, slot_count=8, db_path='faults.db', source_index=1, pipeline_settings=None):
+        super().__init__()
+        self.name = name
+        self.shape = tuple(shape)
+        self.video_file = video_file
+        self.camera_index = camera_index
+        self.camera_settings = camera_settings
+        self.paced = paced
+        self.slot_count = max(slot_count, 4)
+        self.db_path = db_path
+        self.source_index = source_index
+        self.settings = profile_from_engine(engine)
+        self.pipeline_settings = dict(pipeline_settings or {
+            'target_rate': 0.0,
+            'latency_budget_ms': 250,
+            'motion_gate': False,
+            'motion_sensitivity': 1.0,
+            'motion_hold_frames': 15
+        })
+        self.roi = None
+        self.frame_selector = None
+        self.publisher = None
+        self.context = multiprocessing.get_context('spawn')
+        self.slots = None
+        self.processes = []
+        self.control = None
+        self.running = False
+        self.max_pending_display = 2
+        self.pending_display = 0
+        self.display_lock = threading.Lock()
+        self.display_dropped_count = 0
+        self.rate_time = time.monotonic()
+        self.rate_processed = 0
+        self.detection_fps = 0.0
+        self.detection_time = 0.0
+        
+    def start_workers(self):
+        context = self.context
+        self.slots = SharedFrameSlots(self.shape, self.slot_count)
+        self.free_slots = context.Queue()
+        for slot in range(self.slot_count):
+            self.free_slots.put(slot)
+        self.detect_slots = context.Queue()
+        self.display_slots = context.Queue()
+        self.stop_event = context.Event()
+        self.counters = context.Array('q', COUNTER_COUNT)
+        
+        capture = context.Process(
+            target=capture_worker, name=f"{self.name}-capture", daemon=True,
+            args=(self.slots.name, self.shape, self.slot_count, self.video_file, self.camera_index,
+                  self.camera_settings, self.paced, self.free_slots, self.detect_slots, self.stop_event,
+                  self.counters)
+        )
+        self.processes.append(capture)
+        self.control = context.Queue()
+        self.processes.append(context.Process(
+            target=detect_worker, name=f"{self.name}-detect", daemon=True,
+            args=(self.slots.name, self.shape, self.slot_count, self.settings, self.pipeline_settings, self.roi,
+                  self.db_path,
+                  self.source_index, self.detect_slots, self.display_slots, self.control, self.stop_event,
+                  self.counters)
+        ))
+        for process in self.processes:
+            process.start()
+        self.running = True
+        self.start()
+        
+    def send_control(self, command, value):
+        if self.control is not None:
+            self.control.put((command, value))
+            
+    def set_roi(self, roi):
+        self.roi = roi
+        self.send_control('roi', roi)
+        
+    def update_settings(self, engine):
+        self.settings = profile_from_engine(engine)
+        self.send_control('settings', self.settings)
+        
+    def update_pipeline_settings(self, pipeline_settings):
+        self.pipeline_settings = dict(pipeline_settings)
+        self.send_control('pipeline', self.pipeline_settings)
+        
+    def display_done(self):
+        with self.display_lock:
+            self.pending_display = max(0, self.pending_display - 1)
+            
+    def run(self):
+        while self.running:
+            try:
+                item = self.display_slots.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            slot, captured_at, elapsed, defects = item
+            if elapsed is not None:
+                metrics.observe('detection', elapsed)
+                self.detection_time = elapsed
+            
+            with self.display_lock:
+                show_frame = self.pending_display < self.max_pending_display
+                if show_frame:
+                    self.pending_display += 1
+                else:
+                    self.display_dropped_count += 1
+            frame = self.slots.frames[slot].copy() if show_frame else None
+            self.free_slots.put(slot)
+            
+            if defects:
+                publisher = self.publisher
+                if publisher is not None:
+                    for defect in defects:
+                        publisher.publish(self.source_index, defect['angle'], defect.get('board_id'),
+                                          defect['details'], defect['image_path'])
+                self.defects_detected.emit(defects)
+            if show_frame:
+                self.frame_processed.emit(frame, captured_at)
+                
+    def get_stats(self):
+        counters = self.counters[:] if self.slots is not None else [0] * COUNTER_COUNT
+        processed = counters[PROCESSED]
+        dropped = counters[CAPTURE_DROPPED]
+        skipped = counters[SKIPPED]
+        idle = counters[IDLE]
+        now = time.monotonic()
+        if now - self.rate_time >= 0.5:
+            self.detection_fps = (processed - self.rate_processed) / (now - self.rate_time)
+            self.rate_time = now
+            self.rate_processed = processed
+        in_flight = max(0, counters[CAPTURED] - processed - skipped - idle)
+        return {
+            'processed': processed,
+            'detection_fps': self.detection_fps,
+            'dropped': dropped,
+            'skipped': skipped,
+            'idle': idle,
+            'unanalysed': dropped + skipped,
+            'detection_ms': self.detection_time * 1000,
+            'display_dropped': self.display_dropped_count,
+            'queue_depth': in_flight,
+            'queue_size': self.slot_count,
+            'images_written': counters[IMAGES_WRITTEN],
+            'images_dropped': counters[IMAGES_DROPPED],
+            'image_queue_depth': counters[IMAGE_QUEUE_DEPTH],
+            'frames_scored': None,
+            'best_frames': None
+        }
+        
+    def stop(self):
+        if self.slots is None:
+            return
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.running = False
+        self.wait()
+        for channel in (self.free_slots, self.detect_slots, self.display_slots, self.control):
+            channel.close()
+            channel.cancel_join_thread()
+        self.processes = []
+        self.control = None
+        self.slots.close()
+        self.slots = None
\ No newline at end of file
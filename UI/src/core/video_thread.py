@@ -1,11 +1,27 @@
 import cv2
 import numpy as np
+import queue
+import threading
 import time
 from PySide6.QtCore import QThread, Signal
+from src.utils.metrics import metrics
+
+PLAYBACK_PACED = 'paced'
+PLAYBACK_MAX_THROUGHPUT = 'max_throughput'
+PLAYBACK_MODES = (PLAYBACK_PACED, PLAYBACK_MAX_THROUGHPUT)
+
+def parse_timestamp(text):
+    seconds = 0.0
+    for part in text.strip().split(':'):
+        seconds = seconds * 60 + float(part)
+    if seconds < 0:
+        raise ValueError("Timestamp must not be negative")
+    return seconds
 
 class VideoThread(QThread):
     frame_ready = Signal(np.ndarray)
     error_occurred = Signal(str)
+    position_changed = Signal(float, float)
     
     def __init__(self, camera_index=None):
         super().__init__()
@@ -20,6 +36,15 @@ class VideoThread(QThread):
             'resolution': (1280, 720),
             'global_shutter': True
         }
+        self.playback_mode = PLAYBACK_PACED
+        self.decode_ahead = 8
+        self.decoded_frames = None
+        self.seek_lock = threading.Lock()
+        self.pending_seek = None
+        self.seek_generation = 0
+        self.fps = 0.0
+        self.frame_count = 0
+        self.position = 0.0
         
     def set_camera_settings(self, settings):
         self.camera_settings = settings
@@ -28,31 +53,162 @@ class VideoThread(QThread):
         self.video_file = file_path
         self.camera_index = None
         
+    def source_fps(self):
+        if self.fps:
+            return self.fps
+        if self.video_file is not None:
+            cap = cv2.VideoCapture(self.video_file)
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            cap.release()
+            if fps:
+                return fps
+        return self.camera_settings['fps']
+        
+    def set_playback_mode(self, mode):
+        if mode not in PLAYBACK_MODES:
+            raise ValueError(f"Unknown playback mode: {mode}")
+        self.playback_mode = mode
+        
+    def seek(self, seconds):
+        with self.seek_lock:
+            self.pending_seek = max(0.0, seconds)
+            self.seek_generation += 1
+            
+    def take_seek_request(self):
+        with self.seek_lock:
+            if self.pending_seek is None:
+                return None
+            target = int(round(self.pending_seek * self.fps))
+            if self.frame_count > 0:
+                target = min(target, self.frame_count - 1)
+            self.pending_seek = None
+            return self.seek_generation, target
+            
+    def seek_to_frame(self, index):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if position > index:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, max(0, index - int(self.fps * 10)))
+            position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+            if position > index:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                position = 0
+        while position < index and self.cap.grab():
+            position += 1
+            
+    def put_decoded(self, item, generation):
+        while self.running and generation == self.seek_generation:
+            try:
+                self.decoded_frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+                
+    def decode_frames(self):
+        generation = self.seek_generation
+        index = 0
+        at_end = False
+        while self.running:
+            request = self.take_seek_request()
+            if request is not None:
+                generation, index = request
+                with metrics.time('seek'):
+                    self.seek_to_frame(index)
+                at_end = False
+            if at_end:
+                time.sleep(0.05)
+                continue
+                
+            with metrics.time('capture'):
+                ret, frame = self.cap.read()
+            if not ret:
+                at_end = True
+                self.put_decoded((generation, index, None), generation)
+                continue
+            self.put_decoded((generation, index, frame), generation)
+            index += 1
+            
+    def run_file(self):
+        self.cap = cv2.VideoCapture(self.video_file)
+        if not self.cap.isOpened():
+            self.error_occurred.emit("Error starting: Failed to open video file")
+            return
+            
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        duration = self.frame_count / self.fps
+        self.decoded_frames = queue.Queue(maxsize=self.decode_ahead)
+        self.running = True
+        decoder = threading.Thread(target=self.decode_frames, name="video-decoder", daemon=True)
+        decoder.start()
+        
+        generation = None
+        anchor = None
+        last_position_update = 0.0
+        try:
+            while self.running:
+                try:
+                    item_generation, index, frame = self.decoded_frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item_generation != self.seek_generation:
+                    continue
+                if item_generation != generation:
+                    generation = item_generation
+                    anchor = None
+                if frame is None:
+                    self.error_occurred.emit("End of video file")
+                    continue
+                    
+                position = index / self.fps
+                if self.playback_mode == PLAYBACK_PACED:
+                    now = time.perf_counter()
+                    if anchor is None or anchor + position < now - 0.5:
+                        anchor = now - position
+                    delay = anchor + position - now
+                    if delay > 0:
+                        time.sleep(delay)
+                        if item_generation != self.seek_generation:
+                            continue
+                else:
+                    anchor = None
+                    
+                self.position = position
+                self.frame_ready.emit(frame)
+                
+                now = time.perf_counter()
+                if now - last_position_update >= 0.5:
+                    last_position_update = now
+                    self.position_changed.emit(position, duration)
+        finally:
+            self.running = False
+            decoder.join()
+            self.cap.release()
+            
     def run(self):
         if self.camera_index is None and self.video_file is None:
             return
+        if self.video_file is not None:
+            self.run_file()
+            return
             
         try:
-            if self.video_file is not None:
-                self.cap = cv2.VideoCapture(self.video_file)
-                if not self.cap.isOpened():
-                    raise Exception("Failed to open video file")
-            elif self.camera_index is not None:
-                self.cap = cv2.VideoCapture(int(self.camera_index))
-                if not self.cap.isOpened():
-                    raise Exception("Failed to open camera")
+            self.cap = cv2.VideoCapture(int(self.camera_index))
+            if not self.cap.isOpened():
+                raise Exception("Failed to open camera")
                 
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.camera_settings['resolution'][0])
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.camera_settings['resolution'][1])
-                self.cap.set(cv2.CAP_PROP_FPS, self.camera_settings['fps'])
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.camera_settings['resolution'][0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.camera_settings['resolution'][1])
+            self.cap.set(cv2.CAP_PROP_FPS, self.camera_settings['fps'])
+            
+            if self.camera_settings['global_shutter']:
+                self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)
+                self.cap.set(cv2.CAP_PROP_EXPOSURE, self.camera_settings['exposure'])
+            else:
+                self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)
                 
-                if self.camera_settings['global_shutter']:
-                    self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)
-                    self.cap.set(cv2.CAP_PROP_EXPOSURE, self.camera_settings['exposure'])
-                else:
-                    self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)
-                    
-                self.cap.set(cv2.CAP_PROP_GAIN, self.camera_settings['gain'])
+            self.cap.set(cv2.CAP_PROP_GAIN, self.camera_settings['gain'])
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or self.camera_settings['fps']
             
             self.running = True
             consecutive_failures = 0
@@ -60,10 +216,10 @@ class VideoThread(QThread):
             
             while self.running:
                 try:
-                    ret, frame = self.cap.read()
+                    with metrics.time('capture'):
+                        ret, frame = self.cap.read()
                     if ret:
                         consecutive_failures = 0
-                        frame = cv2.resize(frame, (1280, 720))
                         self.frame_ready.emit(frame)
                     else:
                         consecutive_failures += 1
@@ -79,26 +235,22 @@ class VideoThread(QThread):
                             self.cap.release()
                         time.sleep(1)
                         
-                        if self.video_file is not None:
-                            self.cap = cv2.VideoCapture(self.video_file)
-                        elif self.camera_index is not None:
-                            self.cap = cv2.VideoCapture(int(self.camera_index))
+                        self.cap = cv2.VideoCapture(int(self.camera_index))
                             
                         if not self.cap.isOpened():
                             raise Exception("Failed to reconnect")
                             
-                        if self.camera_index is not None:
-                            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.camera_settings['resolution'][0])
-                            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.camera_settings['resolution'][1])
-                            self.cap.set(cv2.CAP_PROP_FPS, self.camera_settings['fps'])
+                        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.camera_settings['resolution'][0])
+                        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.camera_settings['resolution'][1])
+                        self.cap.set(cv2.CAP_PROP_FPS, self.camera_settings['fps'])
+                        
+                        if self.camera_settings['global_shutter']:
+                            self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)
+                            self.cap.set(cv2.CAP_PROP_EXPOSURE, self.camera_settings['exposure'])
+                        else:
+                            self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)
                             
-                            if self.camera_settings['global_shutter']:
-                                self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)
-                                self.cap.set(cv2.CAP_PROP_EXPOSURE, self.camera_settings['exposure'])
-                            else:
-                                self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.75)
-                                
-                            self.cap.set(cv2.CAP_PROP_GAIN, self.camera_settings['gain'])
+                        self.cap.set(cv2.CAP_PROP_GAIN, self.camera_settings['gain'])
                         
                         self.error_occurred.emit("Reconnected successfully")
                         consecutive_failures = 0
@@ -107,13 +259,11 @@ class VideoThread(QThread):
                         self.error_occurred.emit("Failed to reconnect")
                         break
                         
-                time.sleep(0.01)
-                
         except Exception as e:
             self.error_occurred.emit(f"Error starting: {str(e)}")
             
     def stop(self):
         self.running = False
-        if self.cap is not None:
+        if self.cap is not None and self.video_file is None:
             self.cap.release()
         self.wait() 
\ No newline at end of file
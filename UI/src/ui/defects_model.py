@@ -0,0 +1,114 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from src.utils.database_manager import FAULT_COLUMNS
+
+FAULT_ID = FAULT_COLUMNS.index('id')
+FAULT_TIMESTAMP = FAULT_COLUMNS.index('timestamp')
+FAULT_TYPE = FAULT_COLUMNS.index('fault_type')
+FAULT_DETAILS = FAULT_COLUMNS.index('details')
+FAULT_MEASUREMENT = FAULT_COLUMNS.index('measurement')
+FAULT_IMAGE_PATH = FAULT_COLUMNS.index('image_path')
+FAULT_CLIP_PATH = FAULT_COLUMNS.index('clip_path')
+
+class DefectsTableModel(QAbstractTableModel):
+    COLUMNS = ("Image", "Defect", "Time", "Angle", "Details")
+    IMAGE_COLUMN = 0
+    
+    def __init__(self, database_manager, thumbnail_cache, page_size=200, parent=None):
+        super().__init__(parent)
+        self.database_manager = database_manager
+        self.thumbnail_cache = thumbnail_cache
+        self.page_size = page_size
+        self.rows = []
+        self.has_more = True
+        self.thumbnail_cache.thumbnail_ready.connect(self.on_thumbnail_ready)
+        
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+        
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+        
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+        
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        column = index.column()
+        
+        if role == Qt.ItemDataRole.DecorationRole and column == self.IMAGE_COLUMN:
+            return self.thumbnail_cache.get(self.image_path(row))
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 1:
+                return row[FAULT_ID]
+            if column == 2:
+                return row[FAULT_TIMESTAMP]
+            if column == 3:
+                return f"{row[FAULT_MEASUREMENT]:.2f}°" if row[FAULT_MEASUREMENT] is not None else ""
+            if column == 4:
+                return row[FAULT_DETAILS]
+        if role == Qt.ItemDataRole.ToolTipRole and column == 4:
+            return row[FAULT_DETAILS]
+        return None
+        
+    def image_path(self, row):
+        return row[FAULT_IMAGE_PATH]
+        
+    def image_path_at(self, row_index):
+        if 0 <= row_index < len(self.rows):
+            return self.image_path(self.rows[row_index])
+        return None
+        
+    def clip_path_at(self, row_index):
+        if 0 <= row_index < len(self.rows):
+            row = self.rows[row_index]
+            return row[FAULT_CLIP_PATH]
+        return None
+        
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more
+        
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        before_id = self.rows[-1][FAULT_ID] if self.rows else None
+        page = self.database_manager.get_faults_page(self.page_size, before_id=before_id)
+        if len(page) < self.page_size:
+            self.has_more = False
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+            
+    def refresh(self):
+        if not self.rows:
+            self.has_more = True
+            self.fetchMore()
+            return
+        newer = self.database_manager.get_faults_page(self.page_size, after_id=self.rows[0][FAULT_ID])
+        if len(newer) >= self.page_size:
+            self.reload()
+        elif newer:
+            self.beginInsertRows(QModelIndex(), 0, len(newer) - 1)
+            self.rows[0:0] = newer
+            self.endInsertRows()
+            
+    def reload(self):
+        self.beginResetModel()
+        self.rows = []
+        self.has_more = True
+        self.endResetModel()
+        self.fetchMore()
+        
+    def on_thumbnail_ready(self, image_path):
+        for row_index, row in enumerate(self.rows):
+            if row[FAULT_IMAGE_PATH] == image_path:
+                index = self.index(row_index, self.IMAGE_COLUMN)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
\ No newline at end of file
@@ -1,11 +1,13 @@
-import json
 import os
-import socket
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, 
                                QLabel, QSlider, QComboBox, QCheckBox, QLineEdit, 
                                QSpinBox, QDoubleSpinBox, QMessageBox, QInputDialog,
-                               QGroupBox, QScrollArea, QWidget, QListWidget)
-from PySide6.QtCore import Qt
+                               QGroupBox, QScrollArea, QWidget, QListWidget,
+                               QTableView, QHeaderView, QAbstractItemView)
+from PySide6.QtCore import Qt, QTimer, QSize
+from src.ui.defects_model import DefectsTableModel
+from src.ui.thumbnail_cache import ThumbnailCache
+from src.utils.template_manager import TemplateManager
 
 class CameraSettingsDialog(QDialog):
     def __init__(self, parent=None):
@@ -101,6 +103,125 @@ class DetectionSettingsDialog(QDialog):
         self.max_defect_angle_spin.setValue(100)
         layout.addWidget(self.max_defect_angle_spin)
         
+        self.overlay_check = QCheckBox("Draw Detection Overlay")
+        self.overlay_check.setChecked(True)
+        layout.addWidget(self.overlay_check)
+        
+        self.multiscale_check = QCheckBox("Coarse-to-Fine Detection")
+        layout.addWidget(self.multiscale_check)
+        
+        layout.addWidget(QLabel("Pyramid Levels (coarse-to-fine)"))
+        self.pyramid_levels_spin = QSpinBox()
+        self.pyramid_levels_spin.setRange(1, 3)
+        self.pyramid_levels_spin.setValue(1)
+        layout.addWidget(self.pyramid_levels_spin)
+        
+        self.board_tracking_check = QCheckBox("Report Each Board Once (track across frames)")
+        self.board_tracking_check.setChecked(True)
+        layout.addWidget(self.board_tracking_check)
+        
+        layout.addWidget(QLabel("Board Width (px, 0 = track edges separately)"))
+        self.board_width_spin = QSpinBox()
+        self.board_width_spin.setRange(0, 2000)
+        self.board_width_spin.setValue(0)
+        layout.addWidget(self.board_width_spin)
+        
+        queue_group = QGroupBox("Frame Queue")
+        queue_layout = QVBoxLayout()
+        queue_layout.addWidget(QLabel("Queue Size (frames)"))
+        self.queue_size_spin = QSpinBox()
+        self.queue_size_spin.setRange(1, 120)
+        self.queue_size_spin.setValue(4)
+        queue_layout.addWidget(self.queue_size_spin)
+        
+        queue_layout.addWidget(QLabel("When Full"))
+        self.drop_policy_combo = QComboBox()
+        self.drop_policy_combo.addItem("Drop Oldest Frame", "drop_oldest")
+        self.drop_policy_combo.addItem("Drop Newest Frame", "drop_newest")
+        queue_layout.addWidget(self.drop_policy_combo)
+        queue_group.setLayout(queue_layout)
+        layout.addWidget(queue_group)
+        
+        rate_group = QGroupBox("Detection Rate")
+        rate_layout = QVBoxLayout()
+        rate_layout.addWidget(QLabel("Target Rate (Hz, 0 = every frame)"))
+        self.target_rate_spin = QDoubleSpinBox()
+        self.target_rate_spin.setRange(0, 240)
+        self.target_rate_spin.setValue(0)
+        rate_layout.addWidget(self.target_rate_spin)
+        
+        rate_layout.addWidget(QLabel("Latency Budget (ms, 0 = unlimited)"))
+        self.latency_budget_spin = QSpinBox()
+        self.latency_budget_spin.setRange(0, 10000)
+        self.latency_budget_spin.setValue(250)
+        rate_layout.addWidget(self.latency_budget_spin)
+        rate_group.setLayout(rate_layout)
+        layout.addWidget(rate_group)
+        
+        motion_group = QGroupBox("Motion Gate")
+        motion_layout = QVBoxLayout()
+        self.motion_gate_check = QCheckBox("Only Detect When the ROI Changes")
+        motion_layout.addWidget(self.motion_gate_check)
+        
+        motion_layout.addWidget(QLabel("Sensitivity (% of ROI changed to wake)"))
+        self.motion_sensitivity_spin = QDoubleSpinBox()
+        self.motion_sensitivity_spin.setRange(0.1, 50)
+        self.motion_sensitivity_spin.setSingleStep(0.5)
+        self.motion_sensitivity_spin.setValue(1.0)
+        motion_layout.addWidget(self.motion_sensitivity_spin)
+        
+        motion_layout.addWidget(QLabel("Hold Time (quiet frames before sleeping)"))
+        self.motion_hold_spin = QSpinBox()
+        self.motion_hold_spin.setRange(0, 600)
+        self.motion_hold_spin.setValue(15)
+        motion_layout.addWidget(self.motion_hold_spin)
+        motion_group.setLayout(motion_layout)
+        layout.addWidget(motion_group)
+        
+        image_group = QGroupBox("Defect Images")
+        image_layout = QVBoxLayout()
+        image_layout.addWidget(QLabel("Format"))
+        self.image_format_combo = QComboBox()
+        self.image_format_combo.addItem("JPEG", "jpg")
+        self.image_format_combo.addItem("WebP", "webp")
+        self.image_format_combo.addItem("PNG", "png")
+        image_layout.addWidget(self.image_format_combo)
+        
+        image_layout.addWidget(QLabel("Quality (JPEG/WebP)"))
+        self.image_quality_spin = QSpinBox()
+        self.image_quality_spin.setRange(1, 100)
+        self.image_quality_spin.setValue(90)
+        image_layout.addWidget(self.image_quality_spin)
+        
+        image_layout.addWidget(QLabel("Compression Level (PNG)"))
+        self.png_compression_spin = QSpinBox()
+        self.png_compression_spin.setRange(0, 9)
+        self.png_compression_spin.setValue(3)
+        image_layout.addWidget(self.png_compression_spin)
+        image_group.setLayout(image_layout)
+        layout.addWidget(image_group)
+        
+        clip_group = QGroupBox("Defect Clips")
+        clip_layout = QVBoxLayout()
+        self.clip_export_check = QCheckBox("Save a Video Clip Around Each Defect")
+        clip_layout.addWidget(self.clip_export_check)
+        
+        clip_layout.addWidget(QLabel("Seconds Before Defect"))
+        self.clip_pre_spin = QDoubleSpinBox()
+        self.clip_pre_spin.setRange(0, 30)
+        self.clip_pre_spin.setSingleStep(0.5)
+        self.clip_pre_spin.setValue(2.0)
+        clip_layout.addWidget(self.clip_pre_spin)
+        
+        clip_layout.addWidget(QLabel("Seconds After Defect"))
+        self.clip_post_spin = QDoubleSpinBox()
+        self.clip_post_spin.setRange(0, 30)
+        self.clip_post_spin.setSingleStep(0.5)
+        self.clip_post_spin.setValue(1.0)
+        clip_layout.addWidget(self.clip_post_spin)
+        clip_group.setLayout(clip_layout)
+        layout.addWidget(clip_group)
+        
         button_layout = QHBoxLayout()
         apply_button = QPushButton("Apply")
         apply_button.clicked.connect(self.accept)
@@ -132,10 +253,6 @@ class SocketSetupDialog(QDialog):
         self.port_entry.setText("12345")
         layout.addWidget(self.port_entry)
         
-        self.status_label = QLabel("Status: Disconnected")
-        self.status_label.setStyleSheet("color: red;")
-        layout.addWidget(self.status_label)
-        
         connect_button = QPushButton("Connect")
         connect_button.clicked.connect(self.connect_socket)
         layout.addWidget(connect_button)
@@ -143,33 +260,75 @@ class SocketSetupDialog(QDialog):
         self.setLayout(layout)
         
     def connect_socket(self):
-        host = self.host_entry.text()
+        if not self.host_entry.text().strip():
+            QMessageBox.warning(self, "Invalid Host", "Please enter a host name or address")
+            return
         try:
             port = int(self.port_entry.text())
         except ValueError:
+            port = 0
+        if not 1 <= port <= 65535:
             QMessageBox.warning(self, "Invalid Port", "Please enter a valid port number")
             return
-            
-        if self.ping_host(host, port):
-            self.status_label.setText("Status: Connected")
-            self.status_label.setStyleSheet("color: green;")
-            self.accept()
-        else:
-            self.status_label.setText("Status: Connection Failed")
-            self.status_label.setStyleSheet("color: red;")
-            
-    def ping_host(self, host, port):
-        try:
-            with socket.create_connection((host, port), timeout=5):
-                return True
-        except (socket.timeout, ConnectionRefusedError, OSError):
-            return False
+        self.accept()
+
+class PlcSetupDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("PLC Output Setup")
+        self.setModal(True)
+        self.setup_ui()
+        
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        
+        layout.addWidget(QLabel("Host"))
+        self.host_entry = QLineEdit()
+        self.host_entry.setText("localhost")
+        layout.addWidget(self.host_entry)
+        
+        layout.addWidget(QLabel("Port"))
+        self.port_spin = QSpinBox()
+        self.port_spin.setRange(1, 65535)
+        self.port_spin.setValue(5020)
+        layout.addWidget(self.port_spin)
+        
+        layout.addWidget(QLabel("Transport"))
+        self.transport_combo = QComboBox()
+        self.transport_combo.addItem("TCP", "tcp")
+        self.transport_combo.addItem("UDP", "udp")
+        layout.addWidget(self.transport_combo)
+        
+        layout.addWidget(QLabel("Message Format"))
+        self.format_combo = QComboBox()
+        self.format_combo.addItem("JSON lines", "json")
+        self.format_combo.addItem("Binary", "binary")
+        layout.addWidget(self.format_combo)
+        
+        layout.addWidget(QLabel("Batch Size (events)"))
+        self.batch_size_spin = QSpinBox()
+        self.batch_size_spin.setRange(1, 1000)
+        self.batch_size_spin.setValue(32)
+        layout.addWidget(self.batch_size_spin)
+        
+        button_layout = QHBoxLayout()
+        apply_button = QPushButton("Apply")
+        apply_button.clicked.connect(self.accept)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(apply_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
 
 class PalletSetupDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Pallet Setup")
         self.setModal(True)
+        self.template_manager = None
+        self.base_profile = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -188,6 +347,15 @@ class PalletSetupDialog(QDialog):
         self.target_board_count_spin.setValue(5)
         layout.addWidget(self.target_board_count_spin)
         
+        self.best_frame_check = QCheckBox("Analyse Best Frames per Board (sensor-triggered)")
+        layout.addWidget(self.best_frame_check)
+        
+        layout.addWidget(QLabel("Frames per Board"))
+        self.frames_per_board_spin = QSpinBox()
+        self.frames_per_board_spin.setRange(1, 10)
+        self.frames_per_board_spin.setValue(3)
+        layout.addWidget(self.frames_per_board_spin)
+        
         button_layout = QHBoxLayout()
         save_template_button = QPushButton("Save as Template")
         save_template_button.clicked.connect(self.save_template)
@@ -205,46 +373,87 @@ class PalletSetupDialog(QDialog):
     def save_template(self):
         name, ok = QInputDialog.getText(self, "Template Name", "Enter a name for the template:")
         if ok and name:
-            template = {
+            template = dict(self.base_profile or {})
+            template.update({
                 "low_signal_duration": self.low_signal_duration_spin.value(),
-                "target_board_count": self.target_board_count_spin.value()
-            }
-            with open(f"{name}.json", "w") as file:
-                json.dump(template, file)
-            QMessageBox.information(self, "Success", f"Template saved as {name}.json")
+                "target_board_count": self.target_board_count_spin.value(),
+                "best_frame_selection": self.best_frame_check.isChecked(),
+                "frames_per_board": self.frames_per_board_spin.value()
+            })
+            template_manager = self.template_manager or TemplateManager()
+            if template_manager.save_template(name, template):
+                QMessageBox.information(self, "Success", f"Template saved as {name}.json")
+            else:
+                QMessageBox.warning(self, "Template Error", f"Could not save template {name}.json")
 
 class DefectsWindow(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, database_manager, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Defects")
         self.setModal(False)
-        self.resize(600, 400)
+        self.resize(800, 500)
+        self.database_manager = database_manager
+        self.thumbnail_cache = ThumbnailCache(parent=self)
+        self.model = DefectsTableModel(database_manager, self.thumbnail_cache, parent=self)
         self.setup_ui()
         
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.update_defects)
+        self.refresh_timer.start(1000)
+        
     def setup_ui(self):
         layout = QVBoxLayout()
         
-        scroll_area = QScrollArea()
-        self.defects_widget = QWidget()
-        self.defects_layout = QVBoxLayout(self.defects_widget)
-        scroll_area.setWidget(self.defects_widget)
-        scroll_area.setWidgetResizable(True)
-        layout.addWidget(scroll_area)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_view.setIconSize(QSize(self.thumbnail_cache.width, self.thumbnail_cache.height))
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table_view.verticalHeader().setDefaultSectionSize(self.thumbnail_cache.height + 6)
+        self.table_view.verticalHeader().setVisible(False)
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        self.table_view.setColumnWidth(DefectsTableModel.IMAGE_COLUMN, self.thumbnail_cache.width + 8)
+        self.table_view.doubleClicked.connect(self.on_row_activated)
+        layout.addWidget(self.table_view)
+        
+        button_layout = QHBoxLayout()
+        view_button = QPushButton("View Image")
+        view_button.clicked.connect(self.view_selected_image)
+        button_layout.addWidget(view_button)
+        clip_button = QPushButton("Play Clip")
+        clip_button.clicked.connect(self.play_selected_clip)
+        button_layout.addWidget(clip_button)
+        layout.addLayout(button_layout)
         
         self.setLayout(layout)
         
-    def update_defects(self, defects):
-        for i in reversed(range(self.defects_layout.count())):
-            self.defects_layout.itemAt(i).widget().setParent(None)
+    def update_defects(self):
+        if self.isVisible():
+            self.model.refresh()
             
-        for i, (timestamp, angle, image_path) in enumerate(defects):
-            defect_label = QLabel(f"Defect {i+1}: {angle:.2f}° at {timestamp}")
-            self.defects_layout.addWidget(defect_label)
+    def on_row_activated(self, index):
+        image_path = self.model.image_path_at(index.row())
+        if image_path:
+            self.show_image(image_path)
             
-            view_button = QPushButton("View Image")
-            view_button.clicked.connect(lambda checked, path=image_path: self.show_image(path))
-            self.defects_layout.addWidget(view_button)
+    def view_selected_image(self):
+        index = self.table_view.currentIndex()
+        if index.isValid():
+            self.on_row_activated(index)
             
+    def play_selected_clip(self):
+        index = self.table_view.currentIndex()
+        if not index.isValid():
+            return
+        clip_path = self.model.clip_path_at(index.row())
+        if not clip_path or not os.path.exists(clip_path):
+            QMessageBox.information(self, "No Clip", "No clip was saved for this defect")
+            return
+        from PySide6.QtGui import QDesktopServices
+        from PySide6.QtCore import QUrl
+        QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(clip_path)))
+        
     def show_image(self, image_path):
         if os.path.exists(image_path):
             from PySide6.QtGui import QPixmap
@@ -0,0 +1,89 @@
+import collections
+import os
+import time
+import cv2
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage
+
+class ThumbnailLoader(QRunnable):
+    def __init__(self, cache, image_path, width, height):
+        super().__init__()
+        self.cache = cache
+        self.image_path = image_path
+        self.width = width
+        self.height = height
+        
+    def run(self):
+        image = None
+        try:
+            if os.path.exists(self.image_path):
+                frame = cv2.imread(self.image_path, cv2.IMREAD_REDUCED_COLOR_4)
+                if frame is not None:
+                    scale = min(self.width / frame.shape[1], self.height / frame.shape[0], 1.0)
+                    size = (max(1, int(frame.shape[1] * scale)), max(1, int(frame.shape[0] * scale)))
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                    height, width = frame.shape[:2]
+                    image = QImage(frame.data, width, height, frame.strides[0], QImage.Format.Format_BGR888).copy()
+        except Exception as e:
+            print(f"Error loading thumbnail: {str(e)}")
+        self.cache.loaded.emit(self.image_path, image)
+
+class ThumbnailCache(QObject):
+    loaded = Signal(str, object)
+    thumbnail_ready = Signal(str)
+    
+    def __init__(self, width=96, height=54, max_bytes=32 * 1024 * 1024, max_threads=2, missing_ttl=5.0,
+                 max_missing=4096, parent=None):
+        super().__init__(parent)
+        self.width = width
+        self.height = height
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.images = collections.OrderedDict()
+        self.pending = set()
+        self.missing = collections.OrderedDict()
+        self.missing_ttl = missing_ttl
+        self.max_missing = max_missing
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(max_threads)
+        self.loaded.connect(self.on_loaded)
+        
+    def get(self, image_path):
+        if not image_path:
+            return None
+        image = self.images.get(image_path)
+        if image is not None:
+            self.images.move_to_end(image_path)
+            return image
+        failed_at = self.missing.get(image_path)
+        if failed_at is not None:
+            if time.monotonic() - failed_at < self.missing_ttl:
+                return None
+            del self.missing[image_path]
+        if image_path not in self.pending:
+            self.pending.add(image_path)
+            self.thread_pool.start(ThumbnailLoader(self, image_path, self.width, self.height))
+        return None
+        
+    def on_loaded(self, image_path, image):
+        self.pending.discard(image_path)
+        if image is None:
+            self.missing[image_path] = time.monotonic()
+            self.missing.move_to_end(image_path)
+            while len(self.missing) > self.max_missing:
+                self.missing.popitem(last=False)
+            return
+            
+        self.images[image_path] = image
+        self.current_bytes += image.sizeInBytes()
+        while self.current_bytes > self.max_bytes and len(self.images) > 1:
+            _, evicted = self.images.popitem(last=False)
+            self.current_bytes -= evicted.sizeInBytes()
+        self.thumbnail_ready.emit(image_path)
+        
+    def clear(self):
+        self.thread_pool.clear()
+        self.images.clear()
+        self.pending.clear()
+        self.missing.clear()
+        self.current_bytes = 0
\ No newline at end of file
@@ -3,10 +3,12 @@ import numpy as np
 from PySide6.QtWidgets import QWidget
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QPixmap, QImage, QPainter, QPen, QColor
-from PySide6.QtCore import QRect
+from PySide6.QtCore import QRect, QPoint
+from src.utils.metrics import metrics
 
 class VideoWidget(QWidget):
     roi_selected_signal = Signal()
+    roi_changed = Signal()
     
     def __init__(self):
         super().__init__()
@@ -18,33 +20,75 @@ class VideoWidget(QWidget):
         self.dragging_corner = None
         self.roi_visible = True
         self.current_frame = None
+        self.scaled_pixmap = None
+        self.fast_scaling = False
         
     def set_frame(self, frame):
         self.current_frame = frame
+        self.scaled_pixmap = None
         self.update()
         
+    def set_fast_scaling(self, enabled):
+        self.fast_scaling = enabled
+        self.scaled_pixmap = None
+        self.update()
+        
+    def resizeEvent(self, event):
+        self.scaled_pixmap = None
+        super().resizeEvent(event)
+        
+    def get_scaled_pixmap(self):
+        if self.scaled_pixmap is None and self.current_frame is not None:
+            frame = self.current_frame
+            if not frame.flags['C_CONTIGUOUS']:
+                frame = np.ascontiguousarray(frame)
+                self.current_frame = frame
+            height, width = frame.shape[:2]
+            q_image = QImage(frame.data, width, height, frame.strides[0], QImage.Format.Format_BGR888)
+            if self.fast_scaling:
+                mode = Qt.TransformationMode.FastTransformation
+            else:
+                mode = Qt.TransformationMode.SmoothTransformation
+            scaled_image = q_image.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio, mode)
+            self.scaled_pixmap = QPixmap.fromImage(scaled_image)
+        return self.scaled_pixmap
+        
     def paintEvent(self, event):
         if self.current_frame is not None:
-            painter = QPainter(self)
-            
-            height, width, channel = self.current_frame.shape
-            bytes_per_line = 3 * width
-            q_image = QImage(self.current_frame.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_image)
-            
-            scaled_pixmap = pixmap.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            
-            if self.roi_visible and self.roi_start and self.roi_end:
-                pen = QPen(QColor(0, 255, 0), 2)
-                painter.setPen(pen)
-                painter.drawRect(QRect(self.roi_start, self.roi_end))
+            with metrics.time('display'):
+                painter = QPainter(self)
+                painter.drawPixmap(0, 0, self.get_scaled_pixmap())
+                
+                if self.roi_visible and self.roi_start is not None and self.roi_end is not None:
+                    pen = QPen(QColor(0, 255, 0), 2)
+                    painter.setPen(pen)
+                    painter.drawRect(QRect(self.frame_to_widget(self.roi_start), self.frame_to_widget(self.roi_end)))
                 
+    def display_scale(self):
+        if self.current_frame is None:
+            return 1.0
+        height, width = self.current_frame.shape[:2]
+        return min(self.width() / width, self.height() / height)
+        
+    def widget_to_frame(self, pos):
+        scale = self.display_scale()
+        x = int(round(pos.x() / scale))
+        y = int(round(pos.y() / scale))
+        if self.current_frame is not None:
+            height, width = self.current_frame.shape[:2]
+            x = max(0, min(x, width))
+            y = max(0, min(y, height))
+        return QPoint(x, y)
+        
+    def frame_to_widget(self, point):
+        scale = self.display_scale()
+        return QPoint(int(round(point.x() * scale)), int(round(point.y() * scale)))
+        
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             if self.selecting_roi:
-                self.roi_start = event.pos()
-                self.roi_end = event.pos()
+                self.roi_start = self.widget_to_frame(event.pos())
+                self.roi_end = self.roi_start
                 self.roi_selected = False
             elif self.roi_selected:
                 if self.is_near_corner(event.pos(), self.roi_start):
@@ -54,33 +98,53 @@ class VideoWidget(QWidget):
                     
     def mouseMoveEvent(self, event):
         if self.selecting_roi:
-            self.roi_end = event.pos()
+            self.roi_end = self.widget_to_frame(event.pos())
             self.update()
         elif self.dragging_corner:
             if self.dragging_corner == 'start':
-                self.roi_start = event.pos()
+                self.roi_start = self.widget_to_frame(event.pos())
             elif self.dragging_corner == 'end':
-                self.roi_end = event.pos()
+                self.roi_end = self.widget_to_frame(event.pos())
             self.update()
             
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton and self.selecting_roi:
-            self.roi_end = event.pos()
+            self.roi_end = self.widget_to_frame(event.pos())
             self.roi_selected = True
             self.selecting_roi = False
             if hasattr(self, 'roi_selected_signal'):
                 self.roi_selected_signal.emit()
+            self.roi_changed.emit()
+        elif self.dragging_corner:
+            self.roi_changed.emit()
         self.dragging_corner = None
         
     def is_near_corner(self, pos, corner):
         if corner is None:
             return False
+        corner = self.frame_to_widget(corner)
         return abs(pos.x() - corner.x()) < 10 and abs(pos.y() - corner.y()) < 10
         
+    def get_roi(self):
+        if not self.roi_selected or self.roi_start is None or self.roi_end is None:
+            return None
+        x1, x2 = sorted((self.roi_start.x(), self.roi_end.x()))
+        y1, y2 = sorted((self.roi_start.y(), self.roi_end.y()))
+        return (x1, y1, x2, y2)
+        
+    def set_roi(self, roi):
+        x1, y1, x2, y2 = roi
+        self.roi_start = QPoint(x1, y1)
+        self.roi_end = QPoint(x2, y2)
+        self.roi_selected = True
+        self.roi_changed.emit()
+        self.update()
+        
     def clear_roi(self):
         self.roi_start = None
         self.roi_end = None
         self.roi_selected = False
+        self.roi_changed.emit()
         self.update()
         
     def toggle_roi_visibility(self):
@@ -1,59 +1,238 @@
 import cv2
+import glob
+import os
 import platform
-from PySide6.QtWidgets import QInputDialog, QMessageBox
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QInputDialog, QMessageBox, QProgressDialog
 
 class CameraManager:
-    def __init__(self):
+    def __init__(self, max_probe_index=8, probe_timeout=2.0, probe_workers=4, cache_ttl=30.0):
         self.is_linux = platform.system() == 'Linux'
+        self.max_probe_index = max_probe_index
+        self.probe_timeout = probe_timeout
+        self.cache_ttl = cache_ttl
+        self.executor = ThreadPoolExecutor(max_workers=probe_workers, thread_name_prefix="camera-probe")
+        self.discovery_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="camera-discovery")
+        self.discovery = None
+        self.lock = threading.Lock()
+        self.device_signature = None
+        self.cameras = None
+        self.cameras_time = 0.0
+        self.capabilities = {}
+        self.pending_probes = {}
+        self.busy_cameras = set()
+        
+    def get_device_signature(self):
+        if not self.is_linux:
+            return None
+        entries = []
+        for path in sorted(glob.glob('/dev/video*')):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_rdev, stat.st_ctime))
+        return tuple(entries)
+        
+    def read_sysfs(self, device, attribute):
+        try:
+            with open(f"/sys/class/video4linux/{device}/{attribute}") as file:
+                return file.read().strip()
+        except OSError:
+            return None
+            
+    def enumerate_linux_cameras(self, signature):
+        cameras = []
+        for path, _, _ in signature:
+            device = os.path.basename(path)
+            match = re.fullmatch(r'video(\d+)', device)
+            if match is None:
+                continue
+            if self.read_sysfs(device, 'index') not in (None, '0'):
+                continue
+            index = match.group(1)
+            name = self.read_sysfs(device, 'name') or f"Camera {index}"
+            cameras.append((index, name))
+        return sorted(cameras, key=lambda camera: int(camera[0]))
+        
+    def probe_camera(self, camera_index):
+        cap = cv2.VideoCapture(int(camera_index))
+        try:
+            if not cap.isOpened():
+                return None
+            return {
+                'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                'fps': int(cap.get(cv2.CAP_PROP_FPS)),
+                'index': int(camera_index)
+            }
+        finally:
+            cap.release()
+            
+    def probe_indices(self):
+        with self.lock:
+            busy = set(self.busy_cameras)
+        futures = {index: self.submit_probe(index) for index in range(self.max_probe_index) if index not in busy}
+        wait(futures.values(), timeout=self.probe_timeout)
+        cameras = []
+        for index in range(self.max_probe_index):
+            future = futures.get(index)
+            if future is None or (future.done() and future.exception() is None and future.result() is not None):
+                cameras.append((str(index), f"Camera {index}"))
+        return cameras
+        
+    def is_cache_valid(self, signature):
+        if self.cameras is None:
+            return False
+        if self.is_linux:
+            return signature == self.device_signature
+        return time.monotonic() - self.cameras_time < self.cache_ttl
         
     def list_available_cameras(self):
-        available_cameras = []
+        signature = self.get_device_signature()
+        with self.lock:
+            if self.is_cache_valid(signature):
+                return list(self.cameras)
+            if signature != self.device_signature:
+                self.capabilities.clear()
+                
         try:
-            for i in range(2):
-                cap = cv2.VideoCapture(i)
-                if cap.isOpened():
-                    name = f"Camera {i}"
-                    path = str(i)
-                    available_cameras.append((path, name))
-                    print(f"Found camera: {name} at index {i}")
-                    cap.release()
+            if self.is_linux:
+                cameras = self.enumerate_linux_cameras(signature)
+            else:
+                cameras = self.probe_indices()
         except Exception as e:
             print(f"Error listing cameras: {str(e)}")
+            cameras = []
+            
+        with self.lock:
+            self.device_signature = signature
+            self.cameras = cameras
+            self.cameras_time = time.monotonic()
+        for path, name in cameras:
+            print(f"Found camera: {name} at index {path}")
+        self.prefetch_capabilities(cameras)
+        return list(cameras)
+        
+    def submit_probe(self, camera_index):
+        camera_index = int(camera_index)
+        with self.lock:
+            future = self.pending_probes.get(camera_index)
+            if future is not None:
+                return future
+            future = self.executor.submit(self.probe_camera, camera_index)
+            self.pending_probes[camera_index] = future
+        future.add_done_callback(lambda done, index=camera_index: self.on_probe_done(index, done))
+        return future
         
-        return available_cameras
+    def on_probe_done(self, camera_index, future):
+        with self.lock:
+            self.pending_probes.pop(camera_index, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            info = future.result()
+            if info is not None:
+                self.capabilities[camera_index] = info
+                
+    def prefetch_capabilities(self, cameras):
+        for path, _ in cameras:
+            with self.lock:
+                skip = int(path) in self.capabilities or int(path) in self.busy_cameras
+            if not skip:
+                self.submit_probe(path)
+                
+    def start_discovery(self):
+        with self.lock:
+            if self.discovery is None or self.discovery.done():
+                self.discovery = self.discovery_executor.submit(self.list_available_cameras)
+            return self.discovery
+            
+    def cached_cameras(self):
+        if self.is_linux:
+            return self.list_available_cameras()
+        with self.lock:
+            if self.cameras is None:
+                return None
+            cameras = list(self.cameras)
+            stale = time.monotonic() - self.cameras_time >= self.cache_ttl
+        if stale:
+            self.start_discovery()
+        return cameras
+        
+    def wait_for_discovery(self, parent):
+        discovery = self.start_discovery()
+        if not discovery.done():
+            progress = QProgressDialog("Searching for cameras...", "Cancel", 0, 0, parent)
+            progress.setWindowTitle("Select Camera")
+            progress.setMinimumDuration(0)
+            timer = QTimer(progress)
+            timer.timeout.connect(lambda: discovery.done() and progress.accept())
+            timer.start(50)
+            progress.exec()
+            timer.stop()
+            if not discovery.done():
+                return None
+        try:
+            return discovery.result()
+        except Exception as e:
+            print(f"Error listing cameras: {str(e)}")
+            return []
+            
+    def claim_camera(self, camera_index):
+        with self.lock:
+            self.busy_cameras.add(camera_index)
+            future = self.pending_probes.get(camera_index)
+        if future is not None and not future.cancel():
+            wait([future], timeout=self.probe_timeout)
         
-    def select_camera_dialog(self, parent):
-        available_cameras = self.list_available_cameras()
+    def invalidate(self):
+        with self.lock:
+            self.cameras = None
+            self.capabilities.clear()
+            
+    def select_camera_dialog(self, parent, busy_cameras=()):
+        with self.lock:
+            self.busy_cameras = {int(index) for index in busy_cameras}
+        available_cameras = self.cached_cameras()
+        if available_cameras is None:
+            available_cameras = self.wait_for_discovery(parent)
+            if available_cameras is None:
+                return None
         if available_cameras:
-            camera_index, ok = QInputDialog.getItem(parent, "Select Camera", 
-                                                  "Choose a camera:", 
-                                                  [f"Camera {i}" for i in range(len(available_cameras))], 
-                                                  0, False)
+            labels = [f"Camera {path}: {name}" for path, name in available_cameras]
+            label, ok = QInputDialog.getItem(parent, "Select Camera",
+                                           "Choose a camera:",
+                                           labels,
+                                           0, False)
             if ok:
                 try:
-                    camera_num = int(camera_index.split()[-1])
-                    return camera_num
+                    camera_index = int(available_cameras[labels.index(label)][0])
                 except ValueError:
                     QMessageBox.warning(parent, "Error", "Invalid camera selection")
                     return None
+                self.claim_camera(camera_index)
+                return camera_index
         else:
             QMessageBox.warning(parent, "No Cameras", "No cameras found")
             return None
             
-    def get_camera_info(self, camera_index):
+    def get_camera_info(self, camera_index, timeout=None):
+        self.list_available_cameras()
+        with self.lock:
+            info = self.capabilities.get(int(camera_index))
+        if info is not None:
+            return info
+        future = self.submit_probe(camera_index)
         try:
-            cap = cv2.VideoCapture(camera_index)
-            if cap.isOpened():
-                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                fps = int(cap.get(cv2.CAP_PROP_FPS))
-                cap.release()
-                return {
-                    'width': width,
-                    'height': height,
-                    'fps': fps,
-                    'index': camera_index
-                }
+            return future.result(timeout=self.probe_timeout if timeout is None else timeout)
         except Exception as e:
             print(f"Error getting camera info: {str(e)}")
-        return None 
\ No newline at end of file
+        return None
+        
+    def shutdown(self):
+        self.discovery_executor.shutdown(wait=False, cancel_futures=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -0,0 +1,136 @@
+import datetime
+import itertools
+import os
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+from src.utils.metrics import metrics
+
+class ClipExporter:
+    def __init__(self, frame_ring, output_dir="defect_clips", pre_seconds=2.0, post_seconds=1.0,
+                 fourcc='mp4v', extension='mp4', queue_size=8):
+        self.frame_ring = frame_ring
+        self.output_dir = output_dir
+        self.name_prefix = "clip"
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.fourcc = fourcc
+        self.extension = extension
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.sequence = itertools.count()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.last_clip_path = None
+        self.last_clip_end = None
+        self.requested_count = 0
+        self.written_count = 0
+        self.dropped_count = 0
+        self.failed_count = 0
+        
+    def make_filename(self):
+        now = datetime.datetime.now()
+        stamp = now.strftime("%Y-%m-%d %H-%M-%S")
+        name = f"{self.name_prefix}_{stamp}-{now.microsecond // 1000:03d}_{next(self.sequence)}.{self.extension}"
+        return os.path.join(self.output_dir, name)
+        
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.thread = threading.Thread(target=self.run, name="clip-exporter", daemon=True)
+            self.thread.start()
+            
+    def request(self, event_time):
+        if self.thread is None:
+            self.start()
+        position = self.frame_ring.position_at(event_time)
+        if position is None:
+            position = self.frame_ring.latest_position()
+        if position is not None:
+            event_time = position
+        with self.lock:
+            if self.last_clip_end is not None and event_time <= self.last_clip_end:
+                return self.last_clip_path
+            clip_path = self.make_filename()
+            start = event_time - self.pre_seconds
+            end = event_time + self.post_seconds
+            try:
+                self.queue.put_nowait((clip_path, start, end))
+            except queue.Full:
+                self.dropped_count += 1
+                return None
+            self.requested_count += 1
+            self.last_clip_path = clip_path
+            self.last_clip_end = end
+            return clip_path
+            
+    def wait_for_frames(self, end):
+        deadline = time.monotonic() + self.post_seconds + 1.0
+        while time.monotonic() < deadline:
+            latest = self.frame_ring.latest_position()
+            if latest is not None and latest >= end:
+                return
+            time.sleep(0.05)
+            
+    def write_clip(self, clip_path, start, end):
+        self.wait_for_frames(end)
+        layout = self.frame_ring.frame_shape()
+        if layout is None:
+            return False
+        shape, dtype = layout
+        buffer = np.empty(shape, dtype=dtype)
+        fps = self.frame_ring.measured_fps(start, end)
+        writer = cv2.VideoWriter(clip_path, cv2.VideoWriter_fourcc(*self.fourcc), fps, (shape[1], shape[0]))
+        if not writer.isOpened():
+            return False
+        written = 0
+        try:
+            sequence = self.frame_ring.find_sequence(start)
+            while True:
+                timestamp = self.frame_ring.read(sequence, buffer)
+                if timestamp is None or timestamp > end:
+                    break
+                writer.write(buffer)
+                written += 1
+                sequence += 1
+        finally:
+            writer.release()
+        return written > 0
+        
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            clip_path, start, end = item
+            try:
+                with metrics.time('clip_write'):
+                    written = self.write_clip(clip_path, start, end)
+                if written:
+                    self.written_count += 1
+                else:
+                    self.failed_count += 1
+            except Exception as e:
+                self.failed_count += 1
+                print(f"Error writing defect clip: {str(e)}")
+                
+    def get_stats(self):
+        return {
+            'requested': self.requested_count,
+            'written': self.written_count,
+            'dropped': self.dropped_count,
+            'failed': self.failed_count,
+            'queue_depth': self.queue.qsize(),
+            'buffer_mb': self.frame_ring.memory_bytes() / (1024 * 1024)
+        }
+        
+    def stop(self):
+        with self.lock:
+            thread = self.thread
+            self.thread = None
+        if thread is not None:
+            self.queue.put(None)
+            thread.join()
\ No newline at end of file
@@ -1,14 +1,29 @@
 import sqlite3
 import datetime
 import os
+import queue
+import threading
+import time
+from src.utils.metrics import metrics
+
+SCHEMA_VERSION = 3
+FAULT_COLUMNS = ('id', 'timestamp', 'fault_type', 'image_index', 'details', 'measurement', 'epoch', 'image_path',
+                 'clip_path')
 
 class DatabaseManager:
-    def __init__(self, db_path='faults.db'):
+    def __init__(self, db_path='faults.db', batch_size=100, flush_interval=1.0):
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = queue.Queue()
+        self.writer_thread = None
+        self.writer_lock = threading.Lock()
+        self.written_count = 0
         self.init_database()
         
     def init_database(self):
         conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
         cursor = conn.cursor()
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS faults (
@@ -21,20 +36,112 @@ class DatabaseManager:
             )
         ''')
         conn.commit()
+        self.migrate_database(conn)
         conn.close()
         
-    def log_fault(self, fault_type, image_index, details, measurement=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO faults (timestamp, fault_type, image_index, details, measurement)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 
-              fault_type, image_index, details, measurement))
+    def migrate_database(self, conn):
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(faults)')]
+        if version < 1:
+            if 'epoch' not in columns:
+                conn.execute('ALTER TABLE faults ADD COLUMN epoch REAL')
+            conn.execute('''
+                UPDATE faults SET epoch = CAST(strftime('%s', timestamp, 'utc') AS REAL)
+                WHERE epoch IS NULL
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_faults_timestamp ON faults (timestamp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_faults_epoch ON faults (epoch)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_faults_type_epoch ON faults (fault_type, epoch)')
+        if version < 2:
+            if 'image_path' not in columns:
+                conn.execute('ALTER TABLE faults ADD COLUMN image_path TEXT')
+        if version < 3:
+            if 'clip_path' not in columns:
+                conn.execute('ALTER TABLE faults ADD COLUMN clip_path TEXT')
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
         conn.commit()
-        conn.close()
         
+    def log_fault(self, fault_type, image_index, details, measurement=None, image_path=None, clip_path=None):
+        if self.writer_thread is None:
+            self.start_writer()
+        now = datetime.datetime.now()
+        self.pending.put((now.strftime("%Y-%m-%d %H:%M:%S"), now.timestamp(),
+                          fault_type, image_index, details, measurement, image_path, clip_path))
+                          
+    def start_writer(self):
+        with self.writer_lock:
+            if self.writer_thread is None:
+                self.writer_thread = threading.Thread(target=self.run_writer, daemon=True)
+                self.writer_thread.start()
+                
+    def run_writer(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        batch = []
+        batch_started = None
+        try:
+            while True:
+                timeout = None
+                if batch:
+                    timeout = max(0.0, batch_started + self.flush_interval - time.monotonic())
+                try:
+                    item = self.pending.get(timeout=timeout)
+                except queue.Empty:
+                    item = ()
+                    
+                if item is None or isinstance(item, threading.Event):
+                    self.write_batch(conn, batch)
+                    batch = []
+                    if item is None:
+                        return
+                    item.set()
+                    continue
+                    
+                if item:
+                    if not batch:
+                        batch_started = time.monotonic()
+                    batch.append(item)
+                    
+                if batch and (len(batch) >= self.batch_size or
+                              time.monotonic() - batch_started >= self.flush_interval):
+                    self.write_batch(conn, batch)
+                    batch = []
+        finally:
+            conn.close()
+            
+    def write_batch(self, conn, batch):
+        if not batch:
+            return
+        try:
+            with metrics.time('db_write'):
+                conn.executemany('''
+                    INSERT INTO faults (timestamp, epoch, fault_type, image_index, details, measurement, image_path,
+                                        clip_path)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', batch)
+                conn.commit()
+            self.written_count += len(batch)
+        except sqlite3.Error as e:
+            print(f"Error writing faults: {str(e)}")
+            
+    def flush(self, timeout=5.0):
+        if self.writer_thread is None or not self.writer_thread.is_alive():
+            return
+        done = threading.Event()
+        self.pending.put(done)
+        done.wait(timeout)
+        
+    def close(self):
+        with self.writer_lock:
+            writer_thread = self.writer_thread
+            self.writer_thread = None
+        if writer_thread is not None:
+            self.pending.put(None)
+            writer_thread.join()
+            
     def get_all_faults(self):
+        self.flush()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM faults ORDER BY timestamp DESC')
@@ -43,6 +150,7 @@ class DatabaseManager:
         return faults
         
     def get_faults_by_type(self, fault_type):
+        self.flush()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM faults WHERE fault_type = ? ORDER BY timestamp DESC', (fault_type,))
@@ -50,7 +158,75 @@ class DatabaseManager:
         conn.close()
         return faults
         
+    def build_filters(self, start=None, end=None, fault_type=None):
+        clauses = []
+        params = []
+        if start is not None:
+            clauses.append('epoch >= ?')
+            params.append(start)
+        if end is not None:
+            clauses.append('epoch < ?')
+            params.append(end)
+        if fault_type is not None:
+            clauses.append('fault_type = ?')
+            params.append(fault_type)
+        return clauses, params
+        
+    def query(self, sql, params=(), flush=False):
+        if flush:
+            self.flush()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+            
+    def get_faults_page(self, limit=100, before_id=None, after_id=None, fault_type=None, start=None, end=None):
+        clauses, params = self.build_filters(start, end, fault_type)
+        if before_id is not None:
+            clauses.append('id < ?')
+            params.append(before_id)
+        if after_id is not None:
+            clauses.append('id > ?')
+            params.append(after_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self.query(f'SELECT {", ".join(FAULT_COLUMNS)} FROM faults {where} ORDER BY id DESC LIMIT ?',
+                          params + [limit])
+        
+    def get_faults_between(self, start, end, fault_type=None, limit=None):
+        clauses, params = self.build_filters(start, end, fault_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        sql = f"SELECT {', '.join(FAULT_COLUMNS)} FROM faults {where} ORDER BY epoch DESC"
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return self.query(sql, params)
+        
+    def count_faults(self, start=None, end=None, fault_type=None):
+        clauses, params = self.build_filters(start, end, fault_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self.query(f'SELECT COUNT(*) FROM faults {where}', params)[0][0]
+        
+    def get_fault_counts_per_hour(self, start=None, end=None, fault_type=None):
+        clauses, params = self.build_filters(start, end, fault_type)
+        clauses.append('epoch IS NOT NULL')
+        return self.query(f'''
+            SELECT CAST(epoch / 3600 AS INTEGER) * 3600 AS hour, COUNT(*)
+            FROM faults WHERE {' AND '.join(clauses)}
+            GROUP BY hour ORDER BY hour
+        ''', params)
+        
+    def get_angle_histogram(self, bin_width=1.0, start=None, end=None, fault_type=None):
+        clauses, params = self.build_filters(start, end, fault_type)
+        clauses.append('measurement IS NOT NULL')
+        return self.query(f'''
+            SELECT CAST(measurement / ? AS INTEGER) * ? AS angle_bin, COUNT(*)
+            FROM faults WHERE {' AND '.join(clauses)}
+            GROUP BY angle_bin ORDER BY angle_bin
+        ''', [bin_width, bin_width] + params)
+        
     def clear_faults(self):
+        self.flush()
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute('DELETE FROM faults')
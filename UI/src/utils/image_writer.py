@@ -0,0 +1,138 @@
+import datetime
+import itertools
+import os
+import queue
+import threading
+import time
+import cv2
+from src.utils.metrics import metrics
+
+IMAGE_FORMATS = ('jpg', 'webp', 'png')
+
+class DefectImageWriter:
+    def __init__(self, output_dir="defect_images", image_format='jpg', quality=90, png_compression=3,
+                 workers=2, queue_size=16, drop_when_full=True):
+        self.output_dir = output_dir
+        self.name_prefix = "defect"
+        self.image_format = image_format
+        self.quality = quality
+        self.png_compression = png_compression
+        self.worker_count = max(1, workers)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.drop_when_full = drop_when_full
+        self.threads = []
+        self.lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.sequence = itertools.count()
+        self.submitted_count = 0
+        self.written_count = 0
+        self.dropped_count = 0
+        self.failed_count = 0
+        self.max_queue_depth = 0
+        self.total_write_time = 0.0
+        self.set_format(image_format, quality, png_compression)
+        
+    def set_format(self, image_format, quality=None, png_compression=None):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {image_format}")
+        self.image_format = image_format
+        if quality is not None:
+            self.quality = max(1, min(100, int(quality)))
+        if png_compression is not None:
+            self.png_compression = max(0, min(9, int(png_compression)))
+            
+    def encode_params(self):
+        if self.image_format == 'jpg':
+            return [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        if self.image_format == 'webp':
+            return [cv2.IMWRITE_WEBP_QUALITY, self.quality]
+        return [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        
+    def make_filename(self):
+        now = datetime.datetime.now()
+        stamp = now.strftime("%Y-%m-%d %H-%M-%S")
+        sequence = next(self.sequence)
+        name = f"{self.name_prefix}_{stamp}-{now.microsecond // 1000:03d}_{sequence}.{self.image_format}"
+        return os.path.join(self.output_dir, name)
+        
+    def start(self):
+        with self.lock:
+            if self.threads:
+                return
+            os.makedirs(self.output_dir, exist_ok=True)
+            for _ in range(self.worker_count):
+                thread = threading.Thread(target=self.run, daemon=True)
+                thread.start()
+                self.threads.append(thread)
+                
+    def submit(self, frame):
+        if not self.threads:
+            self.start()
+            
+        filename = self.make_filename()
+        item = (frame, filename, self.encode_params())
+        try:
+            if self.drop_when_full:
+                self.queue.put_nowait(item)
+            else:
+                self.queue.put(item)
+        except queue.Full:
+            with self.stats_lock:
+                self.dropped_count += 1
+            return None
+            
+        with self.stats_lock:
+            self.submitted_count += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return filename
+        
+    def run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                frame, filename, params = item
+                start = time.perf_counter()
+                written = cv2.imwrite(filename, frame, params)
+                elapsed = time.perf_counter() - start
+                metrics.observe('image_write', elapsed)
+                with self.stats_lock:
+                    if written:
+                        self.written_count += 1
+                    else:
+                        self.failed_count += 1
+                    self.total_write_time += elapsed
+            except Exception as e:
+                with self.stats_lock:
+                    self.failed_count += 1
+                print(f"Error writing defect image: {str(e)}")
+            finally:
+                self.queue.task_done()
+                
+    def flush(self):
+        if self.threads:
+            self.queue.join()
+            
+    def get_stats(self):
+        with self.stats_lock:
+            written = self.written_count
+            return {
+                'submitted': self.submitted_count,
+                'written': written,
+                'dropped': self.dropped_count,
+                'failed': self.failed_count,
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'queue_size': self.queue.maxsize,
+                'avg_write_ms': self.total_write_time / written * 1000 if written else 0.0
+            }
+        
+    def stop(self):
+        with self.lock:
+            threads = self.threads
+            self.threads = []
+        for _ in threads:
+            self.queue.put(None)
+        for thread in threads:
+            thread.join()
\ No newline at end of file
@@ -0,0 +1,155 @@
+import bisect
+import collections
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+
+class StageHistogram:
+    def __init__(self, window=512, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        
+    def observe(self, seconds):
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        
+    def percentile(self, fraction):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class StageTimer:
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+        self.start = 0.0
+        
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.registry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+class MetricsRegistry:
+    def __init__(self, window=512):
+        self.window = window
+        self.histograms = {}
+        self.gauges = {}
+        self.lock = threading.Lock()
+        self.enabled = True
+        
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = StageHistogram(self.window)
+            histogram.observe(seconds)
+            
+    def time(self, stage):
+        return StageTimer(self, stage)
+        
+    def set_gauge(self, name, value, labels=None):
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())) if labels else ())] = value
+            
+    def snapshot(self):
+        with self.lock:
+            return {
+                stage: {
+                    'count': histogram.count,
+                    'mean_ms': histogram.total / histogram.count * 1000 if histogram.count else 0.0,
+                    'p50_ms': histogram.percentile(0.5) * 1000,
+                    'p99_ms': histogram.percentile(0.99) * 1000
+                }
+                for stage, histogram in self.histograms.items()
+            }
+            
+    def render_prometheus(self):
+        lines = [
+            "# HELP pallet_stage_seconds Time spent in each pipeline stage.",
+            "# TYPE pallet_stage_seconds histogram"
+        ]
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            for stage, histogram in histograms:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    cumulative += count
+                    lines.append(f'pallet_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'pallet_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'pallet_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}')
+                lines.append(f'pallet_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+                
+            lines.append("# HELP pallet_stage_rolling_seconds Rolling quantiles over the most recent samples.")
+            lines.append("# TYPE pallet_stage_rolling_seconds gauge")
+            for stage, histogram in histograms:
+                for quantile in (0.5, 0.99):
+                    lines.append(f'pallet_stage_rolling_seconds{{stage="{stage}",quantile="{quantile}"}} '
+                                 f'{histogram.percentile(quantile):.6f}')
+                                 
+            last_name = None
+            for (name, labels), value in sorted(self.gauges.items()):
+                if name != last_name:
+                    lines.append(f"# TYPE pallet_{name} gauge")
+                    last_name = name
+                label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f"pallet_{name}{{{label_text}}} {value}" if label_text else f"pallet_{name} {value}")
+        return "\n".join(lines) + "\n"
+        
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.gauges.clear()
+
+metrics = MetricsRegistry()
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry = metrics
+    
+    def do_GET(self):
+        if self.path not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, format, *args):
+        pass
+
+class MetricsServer:
+    def __init__(self, registry=metrics, host='127.0.0.1', port=9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+        
+    def start(self):
+        handler = type('RegistryRequestHandler', (MetricsRequestHandler,), {'registry': self.registry})
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
\ No newline at end of file
@@ -0,0 +1,228 @@
+import itertools
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from src.utils.metrics import metrics
+
+TRANSPORTS = ('tcp', 'udp')
+MESSAGE_FORMATS = ('json', 'binary')
+BATCH_HEADER = struct.Struct('!2sHI')
+BATCH_MAGIC = b'PD'
+BINARY_RECORD = struct.Struct('!IdHif')
+
+def encode_batch(events, message_format, session=0):
+    if message_format == 'json':
+        return b''.join(json.dumps(event, separators=(',', ':')).encode('utf-8') + b'\n' for event in events)
+    records = [BINARY_RECORD.pack(event['sequence'], event['timestamp'], event['source'],
+                                  -1 if event.get('board_id') is None else event['board_id'], event['angle'])
+               for event in events]
+    return BATCH_HEADER.pack(BATCH_MAGIC, len(records), session) + b''.join(records)
+
+def decode_binary_records(data, count, session=0):
+    events = []
+    for offset in range(0, count * BINARY_RECORD.size, BINARY_RECORD.size):
+        sequence, timestamp, source, board_id, angle = BINARY_RECORD.unpack_from(data, offset)
+        events.append({
+            'sequence': sequence,
+            'timestamp': timestamp,
+            'source': source,
+            'board_id': None if board_id < 0 else board_id,
+            'angle': angle,
+            'session': session
+        })
+    return events
+
+def decode_batch(data, message_format):
+    if message_format == 'json':
+        return [json.loads(line) for line in data.splitlines() if line.strip()]
+    magic, count, session = BATCH_HEADER.unpack_from(data)
+    if magic != BATCH_MAGIC:
+        raise ValueError("Not a defect batch")
+    return decode_binary_records(data[BATCH_HEADER.size:], count, session)
+
+class DefectPublisher:
+    def __init__(self, host, port, transport='tcp', message_format='json', batch_size=32, flush_interval=0.02,
+                 queue_size=1024, initial_backoff=0.5, max_backoff=30.0, connect_timeout=1.0, send_timeout=2.0,
+                 drain_timeout=2.0):
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unsupported transport: {transport}")
+        if message_format not in MESSAGE_FORMATS:
+            raise ValueError(f"Unsupported message format: {message_format}")
+        self.host = host
+        self.port = port
+        self.transport = transport
+        self.message_format = message_format
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.connect_timeout = connect_timeout
+        self.send_timeout = send_timeout
+        self.drain_timeout = drain_timeout
+        self.session = int.from_bytes(os.urandom(4), 'big')
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.sequence = itertools.count(1)
+        self.stopped = threading.Event()
+        self.closing = threading.Event()
+        self.thread = None
+        self.sock = None
+        self.backoff = initial_backoff
+        self.connected = False
+        self.published_count = 0
+        self.sent_count = 0
+        self.dropped_count = 0
+        self.batch_count = 0
+        self.failure_count = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stopped.clear()
+        self.closing.clear()
+        self.thread = threading.Thread(target=self.run, name="plc-publisher", daemon=True)
+        self.thread.start()
+        
+    def publish(self, source, angle, board_id=None, details=None, image_path=None):
+        event = {
+            'sequence': next(self.sequence),
+            'session': self.session,
+            'timestamp': time.time(),
+            'source': source,
+            'board_id': board_id,
+            'angle': round(float(angle), 3)
+        }
+        if self.message_format == 'json':
+            event['details'] = details
+            event['image_path'] = image_path
+        try:
+            self.queue.put_nowait((time.perf_counter(), event))
+        except queue.Full:
+            self.dropped_count += 1
+            return False
+        self.published_count += 1
+        return True
+        
+    def collect_batch(self):
+        try:
+            item = self.queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        if item is None:
+            return []
+        batch = [item]
+        deadline = time.perf_counter() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                break
+            batch.append(item)
+        return batch
+        
+    def connect(self):
+        if self.transport == 'udp':
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.connect((self.host, self.port))
+        else:
+            self.sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+            self.sock.settimeout(self.send_timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connected = True
+        
+    def disconnect(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.connected = False
+        
+    def send_batch(self, batch):
+        if self.sock is None:
+            self.connect()
+        start = time.perf_counter()
+        self.sock.sendall(encode_batch([event for _, event in batch], self.message_format, self.session))
+        now = time.perf_counter()
+        metrics.observe('plc_send', now - start)
+        for queued_at, _ in batch:
+            latency = now - queued_at
+            metrics.observe('plc_event', latency)
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+        self.sent_count += len(batch)
+        self.batch_count += 1
+        
+    def run(self):
+        batch = []
+        while not self.stopped.is_set():
+            if not batch:
+                batch = self.collect_batch()
+                if not batch:
+                    if self.closing.is_set() and self.queue.empty():
+                        break
+                    continue
+            try:
+                self.send_batch(batch)
+                batch = []
+                self.backoff = self.initial_backoff
+            except OSError as e:
+                self.failure_count += 1
+                self.disconnect()
+                print(f"Error publishing defects to {self.host}:{self.port}: {str(e)}, "
+                      f"retrying in {self.backoff:.1f}s")
+                self.stopped.wait(self.backoff)
+                self.backoff = min(self.max_backoff, self.backoff * 2)
+        self.discard(batch)
+        self.disconnect()
+        
+    def discard(self, batch):
+        discarded = len(batch)
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                discarded += 1
+        if discarded:
+            self.dropped_count += discarded
+            print(f"Discarded {discarded} unsent defect event(s) for {self.host}:{self.port}")
+            
+            
+    def get_stats(self):
+        sent = self.sent_count
+        return {
+            'published': self.published_count,
+            'sent': sent,
+            'dropped': self.dropped_count,
+            'batches': self.batch_count,
+            'failures': self.failure_count,
+            'queue_depth': self.queue.qsize(),
+            'connected': self.connected,
+            'avg_latency_ms': self.total_latency / sent * 1000 if sent else 0.0,
+            'max_latency_ms': self.max_latency * 1000
+        }
+        
+    def stop(self):
+        thread = self.thread
+        if thread is None:
+            return
+        self.closing.set()
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+        thread.join(timeout=self.drain_timeout)
+        self.stopped.set()
+        thread.join(timeout=self.send_timeout + 1.0)
+        self.thread = None
\ No newline at end of file
@@ -0,0 +1,134 @@
+import argparse
+import socketserver
+import sys
+import threading
+import time
+from src.utils.plc_publisher import BATCH_HEADER, BATCH_MAGIC, BINARY_RECORD, decode_batch, decode_binary_records
+
+def read_exactly(stream, size):
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return data
+
+def read_header(stream):
+    header = read_exactly(stream, BATCH_HEADER.size)
+    while header is not None and header[:len(BATCH_MAGIC)] != BATCH_MAGIC:
+        data = read_exactly(stream, 1)
+        if data is None:
+            return None
+        header = header[1:] + data
+    return header
+
+class DefectStreamHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        simulator = self.server.simulator
+        while not simulator.stopped.is_set():
+            if simulator.message_format == 'json':
+                line = self.rfile.readline()
+                if not line.endswith(b'\n'):
+                    return
+                try:
+                    events = decode_batch(line, 'json')
+                except ValueError:
+                    continue
+            else:
+                header = read_header(self.rfile)
+                if header is None:
+                    return
+                _, count, session = BATCH_HEADER.unpack(header)
+                records = read_exactly(self.rfile, count * BINARY_RECORD.size)
+                if records is None:
+                    return
+                events = decode_binary_records(records, count, session)
+            simulator.receive(events)
+
+class DefectDatagramHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        simulator = self.server.simulator
+        simulator.receive(decode_batch(self.request[0], simulator.message_format))
+
+class PlcSimulator:
+    def __init__(self, host='127.0.0.1', port=5020, transport='tcp', message_format='json', verbose=False):
+        self.host = host
+        self.port = port
+        self.transport = transport
+        self.message_format = message_format
+        self.verbose = verbose
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.events = []
+        self.last_sequences = {}
+        self.duplicate_count = 0
+        self.server = None
+        self.thread = None
+        
+    def receive(self, events):
+        received_at = time.time()
+        with self.lock:
+            fresh = []
+            for event in events:
+                session = event.get('session', 0)
+                if event['sequence'] <= self.last_sequences.get(session, 0):
+                    self.duplicate_count += 1
+                    continue
+                self.last_sequences[session] = event['sequence']
+                fresh.append(event)
+            self.events.extend(fresh)
+            events = fresh
+        if self.verbose:
+            for event in events:
+                print(f"#{event['sequence']} source {event['source']} board {event['board_id']} "
+                      f"angle {event['angle']:.1f} ({(received_at - event['timestamp']) * 1000:.1f} ms)")
+                      
+    def get_events(self):
+        with self.lock:
+            return list(self.events)
+            
+    def start(self):
+        if self.transport == 'udp':
+            self.server = socketserver.ThreadingUDPServer((self.host, self.port), DefectDatagramHandler)
+        else:
+            socketserver.ThreadingTCPServer.allow_reuse_address = True
+            self.server = socketserver.ThreadingTCPServer((self.host, self.port), DefectStreamHandler)
+        self.server.daemon_threads = True
+        self.server.simulator = self
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="plc-simulator", daemon=True)
+        self.thread.start()
+        
+    def stop(self):
+        self.stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Stand-in PLC that receives and prints defect events.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5020)
+    parser.add_argument('--transport', choices=['tcp', 'udp'], default='tcp')
+    parser.add_argument('--format', choices=['json', 'binary'], default='json')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    simulator = PlcSimulator(args.host, args.port, args.transport, args.format, verbose=True)
+    try:
+        simulator.start()
+    except OSError as e:
+        print(f"Error starting PLC simulator: {str(e)}")
+        return 1
+    print(f"PLC simulator listening on {args.transport}://{args.host}:{simulator.port} ({args.format})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,92 @@
+import argparse
+import socketserver
+import sys
+import threading
+import time
+
+class SensorStreamHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        simulator = self.server.simulator
+        try:
+            for level, duration in simulator.schedule():
+                if simulator.stopped.is_set():
+                    return
+                self.request.sendall(f"{int(level)} {time.time():.6f}\n".encode('ascii'))
+                if simulator.stopped.wait(duration):
+                    return
+            while not simulator.stopped.wait(simulator.heartbeat_interval):
+                self.request.sendall(f"0 {time.time():.6f}\n".encode('ascii'))
+        except OSError:
+            pass
+
+class SensorSimulator:
+    def __init__(self, host='127.0.0.1', port=12345, pallets=3, boards_per_pallet=5,
+                 board_time=0.2, gap_time=0.3, pallet_gap=1.5, heartbeat_interval=0.5):
+        self.host = host
+        self.port = port
+        self.pallets = pallets
+        self.boards_per_pallet = boards_per_pallet
+        self.board_time = board_time
+        self.gap_time = gap_time
+        self.pallet_gap = pallet_gap
+        self.heartbeat_interval = heartbeat_interval
+        self.stopped = threading.Event()
+        self.server = None
+        self.thread = None
+        
+    def schedule(self):
+        for _ in range(self.pallets):
+            for board in range(self.boards_per_pallet):
+                yield True, self.board_time
+                last = board == self.boards_per_pallet - 1
+                yield False, self.pallet_gap if last else self.gap_time
+                
+    def start(self):
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((self.host, self.port), SensorStreamHandler)
+        self.server.daemon_threads = True
+        self.server.simulator = self
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="sensor-simulator", daemon=True)
+        self.thread.start()
+        
+    def stop(self):
+        self.stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Stand-in board sensor that streams signal levels over TCP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=12345)
+    parser.add_argument('--pallets', type=int, default=3, help="Pallets to send per connection")
+    parser.add_argument('--boards', type=int, default=5, help="Boards per pallet")
+    parser.add_argument('--board-time', type=float, default=0.2, help="Seconds the signal stays high per board")
+    parser.add_argument('--gap-time', type=float, default=0.3, help="Seconds low between boards")
+    parser.add_argument('--pallet-gap', type=float, default=1.5, help="Seconds low between pallets")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    simulator = SensorSimulator(args.host, args.port, args.pallets, args.boards,
+                                args.board_time, args.gap_time, args.pallet_gap)
+    try:
+        simulator.start()
+    except OSError as e:
+        print(f"Error starting sensor simulator: {str(e)}")
+        return 1
+    print(f"Sensor simulator listening on {args.host}:{simulator.port} "
+          f"({args.pallets} pallets of {args.boards} boards per connection)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,87 @@
+import json
+import os
+import cv2
+import numpy as np
+
+def board_corners(center, angle, length, width):
+    theta = np.radians(angle)
+    direction = np.array([np.cos(theta), -np.sin(theta)])
+    normal = np.array([direction[1], -direction[0]])
+    half_length = direction * length / 2
+    half_width = normal * width / 2
+    center = np.asarray(center, dtype=np.float64)
+    corners = [center + half_length + half_width, center + half_length - half_width,
+               center - half_length - half_width, center - half_length + half_width]
+    return np.round(corners).astype(np.int32)
+
+def generate_pallet_frame(width=1280, height=720, board_angles=None, board_count=5, noise=6.0,
+                          blur=0, brightness=1.0, gradient=0.3, rng=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    if board_angles is None:
+        board_angles = [90.0] * board_count
+    board_count = len(board_angles)
+    
+    background = rng.integers(35, 60)
+    frame = np.full((height, width, 3), background, dtype=np.uint8)
+    
+    board_length = height * 0.8
+    board_width = width / (board_count * 2.5)
+    spacing = width / (board_count + 1)
+    for index, angle in enumerate(board_angles):
+        center = (spacing * (index + 1), height / 2 + rng.uniform(-0.03, 0.03) * height)
+        color = tuple(int(value) for value in rng.integers(150, 220, size=3))
+        cv2.fillPoly(frame, [board_corners(center, angle, board_length, board_width)], color)
+        
+    frame = frame.astype(np.float32)
+    if gradient:
+        ramp = np.linspace(1.0 - gradient / 2, 1.0 + gradient / 2, width, dtype=np.float32)
+        if rng.random() < 0.5:
+            ramp = ramp[::-1]
+        frame *= ramp[np.newaxis, :, np.newaxis]
+    frame *= brightness
+    if noise:
+        frame += rng.normal(0.0, noise, size=frame.shape).astype(np.float32)
+    frame = np.clip(frame, 0, 255).astype(np.uint8)
+    
+    if blur:
+        kernel = int(blur) | 1
+        frame = cv2.GaussianBlur(frame, (kernel, kernel), 0)
+        
+    return frame, [float(angle) for angle in board_angles]
+
+def generate_pallet_frames(count, width=1280, height=720, board_count=5, standard_angle=90.0,
+                           max_deviation=12.0, defect_rate=0.3, noise=6.0, blur=(0, 5),
+                           brightness=(0.7, 1.2), gradient=0.3, seed=None):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        board_angles = []
+        for _ in range(board_count):
+            if rng.random() < defect_rate:
+                deviation = rng.uniform(3.0, max_deviation) * rng.choice((-1.0, 1.0))
+            else:
+                deviation = rng.uniform(-1.0, 1.0)
+            board_angles.append(standard_angle + deviation)
+        frame, angles = generate_pallet_frame(
+            width, height, board_angles,
+            noise=noise,
+            blur=rng.integers(blur[0], blur[1] + 1),
+            brightness=rng.uniform(brightness[0], brightness[1]),
+            gradient=gradient,
+            rng=rng
+        )
+        yield frame, angles
+
+def fold_angle(angle):
+    angle = abs(angle) % 180
+    return 180 - angle if angle > 90 else angle
+
+def save_dataset(output_dir, count, **kwargs):
+    os.makedirs(output_dir, exist_ok=True)
+    labels = []
+    for index, (frame, angles) in enumerate(generate_pallet_frames(count, **kwargs)):
+        filename = f"frame_{index:05d}.png"
+        cv2.imwrite(os.path.join(output_dir, filename), frame)
+        labels.append({'file': filename, 'board_angles': [fold_angle(angle) for angle in angles]})
+    with open(os.path.join(output_dir, "labels.json"), "w") as file:
+        json.dump({'frames': labels}, file, indent=2)
+    return labels
\ No newline at end of file
@@ -1,44 +1,123 @@
 import json
 import os
+import threading
 from PySide6.QtWidgets import QComboBox
+from src.config.detection_profile import validate_profile, save_profile
 
 class TemplateManager:
-    def __init__(self):
-        self.template_dir = "."
+    def __init__(self, template_dir="."):
+        self.template_dir = template_dir
+        self.lock = threading.Lock()
+        self.cache = {}
+        self.errors = {}
+        self.pending_changes = {}
         
-    def get_template_names(self):
-        return [f for f in os.listdir(self.template_dir) if f.endswith('.json')]
+    def template_path(self, template_name):
+        return os.path.join(self.template_dir, template_name)
+        
+    def read_template(self, path):
+        with open(path, "r") as file:
+            return validate_profile(json.load(file))
+            
+    def refresh(self):
+        changed = []
+        try:
+            entries = {entry.name: entry.stat() for entry in os.scandir(self.template_dir)
+                       if entry.is_file() and entry.name.endswith('.json')}
+        except OSError as e:
+            print(f"Error scanning templates: {str(e)}")
+            return changed
+            
+        with self.lock:
+            for name in list(self.cache):
+                if name not in entries:
+                    del self.cache[name]
+                    changed.append(name)
+            for name in list(self.errors):
+                if name not in entries:
+                    del self.errors[name]
+                    
+            for name, stat in entries.items():
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                cached = self.cache.get(name)
+                if cached is not None and cached[0] == stamp:
+                    continue
+                if name in self.errors and self.errors[name][0] == stamp:
+                    continue
+                try:
+                    profile = self.read_template(self.template_path(name))
+                except (OSError, ValueError) as e:
+                    self.errors[name] = (stamp, str(e))
+                    if self.cache.pop(name, None) is not None:
+                        changed.append(name)
+                    continue
+                self.errors.pop(name, None)
+                self.cache[name] = (stamp, profile)
+                changed.append(name)
+            for pending in self.pending_changes.values():
+                pending.update(changed)
+        return changed
+        
+    def watch(self, consumer):
+        with self.lock:
+            self.pending_changes.setdefault(consumer, set())
+            
+    def take_changes(self, consumer):
+        self.refresh()
+        with self.lock:
+            changes = self.pending_changes.get(consumer, set())
+            self.pending_changes[consumer] = set()
+        return changes
         
+    def get_template_names(self):
+        self.refresh()
+        with self.lock:
+            return sorted(self.cache)
+            
+    def get_template_errors(self):
+        with self.lock:
+            return {name: message for name, (_, message) in self.errors.items()}
+            
     def load_template(self, template_name):
         if template_name and template_name != "Select Template":
-            try:
-                with open(template_name, "r") as file:
-                    template = json.load(file)
-                    return template
-            except Exception as e:
-                print(f"Error loading template: {str(e)}")
+            self.refresh()
+            with self.lock:
+                cached = self.cache.get(template_name)
+                if cached is not None:
+                    return dict(cached[1])
+                error = self.errors.get(template_name)
+            if error is not None:
+                print(f"Error loading template: {error[1]}")
+            else:
+                print(f"Error loading template: {template_name} not found")
         return None
         
     def save_template(self, name, template_data):
         try:
-            with open(f"{name}.json", "w") as file:
-                json.dump(template_data, file)
-            return True
-        except Exception as e:
+            save_profile(self.template_path(f"{name}.json"), template_data)
+        except (OSError, ValueError) as e:
             print(f"Error saving template: {str(e)}")
             return False
-            
+        self.refresh()
+        return True
+        
     def delete_template(self, template_name):
         try:
-            os.remove(template_name)
-            return True
+            os.remove(self.template_path(template_name))
         except Exception as e:
             print(f"Error deleting template: {str(e)}")
             return False
-            
+        self.refresh()
+        return True
+        
     def update_template_combo(self, combo_box):
+        current = combo_box.currentText()
+        combo_box.blockSignals(True)
         combo_box.clear()
         combo_box.addItem("Select Template")
         
         for template_name in self.get_template_names():
-            combo_box.addItem(template_name) 
\ No newline at end of file
+            combo_box.addItem(template_name)
+        index = combo_box.findText(current)
+        combo_box.setCurrentIndex(max(0, index))
+        combo_box.blockSignals(False)
\ No newline at end of file
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+from src.core.batch_analyzer import JsonlResultWriter, run_batch
+
+SETTINGS = {
+    'standard_angle': 90.0,
+    'tolerance': 5.0,
+    'min_defect_angle': 80.0,
+    'max_defect_angle': 100.0,
+    'pyramid_levels': None,
+    'board_tracking': True,
+    'board_width': 0.0,
+    'motion_sensitivity': None,
+    'motion_hold_frames': 15,
+    'profile': None
+}
+
+def write_moving_boards(path, frame_count=60, size=(480, 270)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), 30, size)
+    angles = [90, 78, 90, 101, 90, 83, 90, 97, 90, 76]
+    for index in range(frame_count):
+        frame = np.full((size[1], size[0], 3), 40, np.uint8)
+        for board, angle in enumerate(angles):
+            center_x = board * 60 - 300 + index * 8
+            theta = np.radians(angle)
+            dx, dy = 100 * np.cos(theta), 100 * np.sin(theta)
+            start = (int(center_x - dx), int(size[1] / 2 - dy))
+            end = (int(center_x + dx), int(size[1] / 2 + dy))
+            cv2.line(frame, start, end, (220, 220, 220), 10)
+        writer.write(frame)
+    writer.release()
+
+def analyse(video_path, output_path, chunk_size):
+    writer = JsonlResultWriter(str(output_path))
+    try:
+        summary = run_batch([str(video_path)], writer, SETTINGS, workers=2, chunk_size=chunk_size)
+    finally:
+        writer.close()
+    return summary, output_path.read_text()
+
+def test_defects_do_not_depend_on_chunk_size(tmp_path):
+    video_path = tmp_path / "boards.avi"
+    write_moving_boards(video_path)
+    whole_summary, whole = analyse(video_path, tmp_path / "whole.jsonl", 60)
+    assert whole_summary['frames'] == 60
+    assert whole_summary['defects'] > 0
+    for chunk_size in (7, 25):
+        summary, output = analyse(video_path, tmp_path / f"chunks_{chunk_size}.jsonl", chunk_size)
+        assert summary['defects'] == whole_summary['defects']
+        assert output == whole
\ No newline at end of file
@@ -0,0 +1,123 @@
+import socket
+import time
+import pytest
+from src.utils.plc_publisher import DefectPublisher, decode_batch, encode_batch
+from src.utils.plc_simulator import PlcSimulator
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+@pytest.mark.parametrize('message_format', ['json', 'binary'])
+def test_encode_decode_round_trip(message_format):
+    events = [
+        {'sequence': 1, 'timestamp': 1700000000.25, 'source': 1, 'board_id': 7, 'angle': 82.5, 'session': 42},
+        {'sequence': 2, 'timestamp': 1700000000.5, 'source': 2, 'board_id': None, 'angle': 97.25, 'session': 42}
+    ]
+    assert decode_batch(encode_batch(events, message_format, 42), message_format) == events
+
+@pytest.mark.parametrize('transport', ['tcp', 'udp'])
+@pytest.mark.parametrize('message_format', ['json', 'binary'])
+def test_publisher_round_trip(transport, message_format):
+    simulator = PlcSimulator(port=0, transport=transport, message_format=message_format)
+    simulator.start()
+    publisher = DefectPublisher('127.0.0.1', simulator.port, transport, message_format, batch_size=4)
+    publisher.start()
+    try:
+        for index in range(10):
+            assert publisher.publish(1, 80.0 + index, board_id=index, details=f"defect {index}")
+        assert wait_until(lambda: len(simulator.get_events()) == 10)
+    finally:
+        publisher.stop()
+        simulator.stop()
+        
+    events = simulator.get_events()
+    assert [event['sequence'] for event in events] == list(range(1, 11))
+    assert [event['board_id'] for event in events] == list(range(10))
+    assert [event['angle'] for event in events] == pytest.approx([80.0 + index for index in range(10)])
+    if message_format == 'json':
+        assert events[3]['details'] == "defect 3"
+    stats = publisher.get_stats()
+    assert stats['sent'] == 10
+    assert stats['dropped'] == 0
+    assert stats['batches'] <= 10
+
+def test_publisher_reconnects_with_backoff():
+    port = free_port()
+    publisher = DefectPublisher('127.0.0.1', port, initial_backoff=0.05, max_backoff=0.2, connect_timeout=0.2)
+    publisher.start()
+    simulator = None
+    try:
+        publisher.publish(1, 85.0, board_id=1)
+        assert wait_until(lambda: publisher.failure_count >= 4)
+        assert not publisher.connected
+        assert publisher.backoff == pytest.approx(0.2)
+        
+        simulator = PlcSimulator(port=port)
+        simulator.start()
+        assert wait_until(lambda: len(simulator.get_events()) == 1)
+        assert publisher.connected
+        assert publisher.backoff == pytest.approx(0.05)
+        
+        publisher.publish(1, 86.0, board_id=2)
+        assert wait_until(lambda: len(simulator.get_events()) == 2)
+    finally:
+        publisher.stop()
+        if simulator is not None:
+            simulator.stop()
+    assert [event['board_id'] for event in simulator.get_events()] == [1, 2]
+    assert publisher.get_stats()['dropped'] == 0
+
+def test_simulator_drops_duplicates_and_resyncs():
+    simulator = PlcSimulator(port=0, message_format='binary')
+    simulator.start()
+    first = [{'sequence': 1, 'timestamp': 1.0, 'source': 1, 'board_id': 1, 'angle': 81.0}]
+    second = [{'sequence': 2, 'timestamp': 2.0, 'source': 1, 'board_id': 2, 'angle': 82.0}]
+    try:
+        with socket.create_connection(('127.0.0.1', simulator.port)) as sock:
+            torn = encode_batch(first + second, 'binary', 7)
+            sock.sendall(torn[:-5])
+        with socket.create_connection(('127.0.0.1', simulator.port)) as sock:
+            sock.sendall(encode_batch(first, 'binary', 7) + b'\x00garbage' + encode_batch(first + second, 'binary', 7))
+            assert wait_until(lambda: len(simulator.get_events()) == 2)
+    finally:
+        simulator.stop()
+    assert [event['sequence'] for event in simulator.get_events()] == [1, 2]
+    assert simulator.duplicate_count == 1
+
+def test_stop_drains_queued_events():
+    simulator = PlcSimulator(port=0)
+    simulator.start()
+    publisher = DefectPublisher('127.0.0.1', simulator.port, batch_size=1)
+    publisher.start()
+    try:
+        for index in range(50):
+            publisher.publish(1, 80.0, board_id=index)
+        publisher.stop()
+        assert wait_until(lambda: len(simulator.get_events()) == 50)
+    finally:
+        simulator.stop()
+    assert publisher.get_stats()['dropped'] == 0
+
+def test_stop_counts_unsent_events_as_dropped():
+    publisher = DefectPublisher('127.0.0.1', free_port(), initial_backoff=0.05, connect_timeout=0.2,
+                                drain_timeout=0.3)
+    publisher.start()
+    for index in range(5):
+        publisher.publish(1, 80.0, board_id=index)
+    start = time.monotonic()
+    publisher.stop()
+    assert time.monotonic() - start < 2.0
+    stats = publisher.get_stats()
+    assert stats['sent'] == 0
+    assert stats['dropped'] == 5
+    assert stats['queue_depth'] == 0
\ No newline at end of file
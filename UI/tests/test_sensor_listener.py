@@ -0,0 +1,74 @@
+import time
+import pytest
+from PySide6.QtCore import QCoreApplication
+from src.core.sensor_listener import SensorListener, SignalCounter, parse_signal_line
+from src.utils.sensor_simulator import SensorSimulator
+
+@pytest.fixture(scope='module')
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        if condition():
+            return True
+        time.sleep(0.01)
+    QCoreApplication.processEvents()
+    return condition()
+
+def test_parse_signal_line():
+    assert parse_signal_line("1 1700000000.5") == (True, 1700000000.5)
+    assert parse_signal_line("LOW") == (False, None)
+    assert parse_signal_line("off,abc") == (False, None)
+    assert parse_signal_line("maybe") is None
+    assert parse_signal_line("") is None
+
+def test_signal_counter_pallet_boundary():
+    counter = SignalCounter(low_signal_duration=1.0)
+    events = []
+    for level, now in [(True, 0.0), (False, 0.2), (True, 0.5), (False, 0.7), (False, 1.5)]:
+        events.extend(counter.feed(level, now))
+    assert events == [('board', 1), ('board_end', 1), ('board', 2), ('board_end', 2)]
+    assert counter.check(1.7) == [('pallet', 2)]
+    assert counter.check(5.0) == []
+    assert counter.pallet_count == 1
+
+def test_listener_counts_pallets_from_simulator(app):
+    simulator = SensorSimulator(port=0, pallets=2, boards_per_pallet=3, board_time=0.05, gap_time=0.05,
+                                pallet_gap=0.5, heartbeat_interval=0.1)
+    simulator.start()
+    listener = SensorListener('127.0.0.1', simulator.port, low_signal_duration=0.25)
+    events = []
+    listener.connection_changed.connect(lambda connected, address: events.append(('connected', connected)))
+    listener.board_detected.connect(lambda count, received_at: events.append(('board', count)))
+    listener.pallet_completed.connect(lambda pallets, boards, received_at: events.append(('pallet', pallets, boards)))
+    listener.start()
+    try:
+        assert wait_until(lambda: sum(1 for event in events if event[0] == 'pallet') == 2)
+    finally:
+        listener.stop()
+        simulator.stop()
+    QCoreApplication.processEvents()
+    
+    assert events[0] == ('connected', True)
+    sequence = [event for event in events if event[0] in ('board', 'pallet')]
+    assert sequence == [('board', 1), ('board', 2), ('board', 3), ('pallet', 1, 3),
+                        ('board', 1), ('board', 2), ('board', 3), ('pallet', 2, 3)]
+
+def test_listener_reports_unreachable_sensor(app):
+    simulator = SensorSimulator(port=0)
+    simulator.start()
+    port = simulator.port
+    simulator.stop()
+    listener = SensorListener('127.0.0.1', port, reconnect_interval=0.1)
+    states = []
+    listener.connection_changed.connect(lambda connected, address: states.append(connected))
+    listener.start()
+    try:
+        assert wait_until(lambda: len(states) >= 2)
+    finally:
+        listener.stop()
+    QCoreApplication.processEvents()
+    assert not any(states)
\ No newline at end of file
@@ -0,0 +1,31 @@
+import json
+import pytest
+from src.config.detection_profile import default_profile, validate_profile
+from src.utils.template_manager import TemplateManager
+
+@pytest.mark.parametrize('name, value', [('hough_threshold', float('inf')), ('tolerance', float('nan')),
+                                         ('roi', [0, 0, float('inf'), 10])])
+def test_validate_profile_rejects_non_finite_numbers(name, value):
+    with pytest.raises(ValueError):
+        validate_profile({name: value})
+
+def test_refresh_skips_non_finite_template(tmp_path):
+    (tmp_path / "bad.json").write_text('{"hough_threshold": Infinity}')
+    manager = TemplateManager(str(tmp_path))
+    assert manager.get_template_names() == []
+    assert 'bad.json' in manager.get_template_errors()
+
+def test_changes_are_kept_per_consumer(tmp_path):
+    manager = TemplateManager(str(tmp_path))
+    manager.watch('main')
+    assert manager.save_template("active", default_profile())
+    assert manager.get_template_names() == ['active.json']
+    assert manager.take_changes('main') == {'active.json'}
+    assert manager.take_changes('main') == set()
+    
+    profile = default_profile()
+    profile['tolerance'] = 3.0
+    assert manager.save_template("active", profile)
+    assert manager.load_template('active.json')['tolerance'] == 3.0
+    assert manager.take_changes('main') == {'active.json'}
+    assert json.loads((tmp_path / "active.json").read_text())['tolerance'] == 3.0
\ No newline at end of file